@@ -4,69 +4,19 @@ from server.firestore import FirestoreDB
 from datetime import datetime
 import uuid
 import logging
-from geopy.distance import geodesic
 from config import db
 
+from server.app_config import app_config_cache, geofence_index, get_app_config, normalize_offices
+from utils.metrics import storage_operation, track_storage
 from utils.response_wrapper import response_wrapper
 
 # Initialize database
 db_instance = FirestoreDB()
 
-# App Config Collection
-APP_CONFIG_COLLECTION = "app_configs"
-DEFAULT_CONFIG_ID = "default_config"
-
-# Default configuration values (used as fallback)
-DEFAULT_OFFICE_LOCATION = (12.956203, 80.195962)  # Office latitude & longitude
-DEFAULT_ALLOWED_RADIUS_KM = 0.1  # Allowed radius (100 meters)
-
 # Attendance logs for rejected attempts
 ATTENDANCE_LOGS_COLLECTION = "attendance_logs"
 
-def get_app_config():
-    """Get application configuration for office location and geofence settings"""
-    try:
-        # Try to get existing configuration
-        config_ref = db.collection(APP_CONFIG_COLLECTION).document(DEFAULT_CONFIG_ID)
-        config = config_ref.get()
-        
-        # If config exists, return it
-        if config.exists:
-            config_data = config.to_dict()
-            logging.info(f"Retrieved configuration from Firestore: {config_data}")
-            return config_data
-            
-        # If no config found, create default
-        default_config = {
-            "id": DEFAULT_CONFIG_ID,
-            "office_location": {
-                "latitude": DEFAULT_OFFICE_LOCATION[0],
-                "longitude": DEFAULT_OFFICE_LOCATION[1]
-            },
-            "allowed_radius_km": DEFAULT_ALLOWED_RADIUS_KM,
-            "enforce_geofence": True,
-            "created_at": datetime.utcnow().isoformat(),
-            "last_modified": datetime.utcnow().isoformat(),
-            "last_modified_by": "system"
-        }
-        
-        # Store default configuration
-        config_ref.set(default_config)
-        logging.info(f"Created default configuration in Firestore: {default_config}")
-        return default_config
-        
-    except Exception as e:
-        logging.error(f"Error retrieving app configuration: {str(e)}")
-        # Return default config if there's an error
-        return {
-            "office_location": {
-                "latitude": DEFAULT_OFFICE_LOCATION[0],
-                "longitude": DEFAULT_OFFICE_LOCATION[1]
-            },
-            "allowed_radius_km": DEFAULT_ALLOWED_RADIUS_KM,
-            "enforce_geofence": True
-        }
-
+@track_storage("write")
 def add_attendance_log(log_data):
     """Add a rejected attendance attempt to logs"""
     try:
@@ -97,34 +47,21 @@ class AttendanceAPI(Resource):
             timestamp = datetime.utcnow().isoformat()
             date_str = datetime.utcnow().date().isoformat()
 
-            # Get application configuration
+            # Application configuration comes from the in-process cache, so this does no read
             app_config = get_app_config()
-            logging.info(f"Using app config for validation: {app_config}")
-            
-            # Extract configuration values with fallbacks
-            office_location = (
-                float(app_config.get("office_location", {}).get("latitude", DEFAULT_OFFICE_LOCATION[0])),
-                float(app_config.get("office_location", {}).get("longitude", DEFAULT_OFFICE_LOCATION[1]))
-            )
-            allowed_radius_km = float(app_config.get("allowed_radius_km", DEFAULT_ALLOWED_RADIUS_KM))
+
             enforce_geofence = app_config.get("enforce_geofence", True)
 
-            # Add detailed logging
-            logging.info(f"Office location: {office_location}")
-            logging.info(f"User location: {user_location}")
-            logging.info(f"Allowed radius: {allowed_radius_km} km")
-            logging.info(f"Enforce geofence: {enforce_geofence}")
+            # Validate geofence location against the configured offices
+            attendance_status, office, distance = geofence_index(app_config).locate(*user_location)
+            allowed_radius_km = office.radius_km
+            # Lazy %-formatting: nothing is formatted on the hot path unless debug logging is on
+            logging.debug("Geofence check for %s: config v%s, office %s, user %s, radius %s km, enforce %s, "
+                          "distance %.4f km", employee_id, app_config.get("version", 0), office.id,
+                          user_location, allowed_radius_km, enforce_geofence, distance)
 
-            # Validate geofence location
-            distance = geodesic(office_location, user_location).km
-            logging.info(f"Calculated distance: {distance:.4f} km")
-            
-            # Determine attendance status
-            if distance <= allowed_radius_km:
-                attendance_status = "VALID"
-            else:
-                attendance_status = "INVALID_LOCATION"
-                logging.info(f"Employee {employee_id} outside location: {distance:.2f} km away")
+            if attendance_status != "VALID":
+                logging.info(f"Employee {employee_id} outside location: {distance:.2f} km from {office.name}")
                 
                 # If geofence is enforced, reject the attendance record
                 if enforce_geofence:
@@ -138,17 +75,18 @@ class AttendanceAPI(Resource):
                         "location": {
                             "latitude": latitude,
                             "longitude": longitude,
-                            "distance_km": distance
+                            "distance_km": distance,
+                            "office_id": office.id
                         },
                         "status": "REJECTED",
-                        "reason": f"Outside permitted radius ({distance:.2f} km from office)"
+                        "reason": f"Outside permitted radius ({distance:.2f} km from {office.name})"
                     }
                     
                     # Store the log entry
                     add_attendance_log(log_entry)
                     
                     return response_wrapper(403, 
-                        f"Attendance rejected: You are {distance:.2f} km from the office, which exceeds the allowed radius of {allowed_radius_km} km",
+                        f"Attendance rejected: You are {distance:.2f} km from {office.name}, which exceeds the allowed radius of {allowed_radius_km} km",
                         log_entry)
 
             # Generate a unique ID for this attendance record
@@ -165,6 +103,7 @@ class AttendanceAPI(Resource):
                         "latitude": latitude,
                         "longitude": longitude,
                         "distance_km": distance,
+                        "office_id": office.id,
                         "type": "clock_in"
                     },
                     "status": attendance_status,
@@ -186,6 +125,7 @@ class AttendanceAPI(Resource):
                     "latitude": latitude,
                     "longitude": longitude,
                     "distance_km": distance,
+                    "office_id": office.id,
                     "type": "clock_out"
                 }
                 entry["clock_out_status"] = attendance_status
@@ -280,7 +220,9 @@ class AttendanceLogsAPI(Resource):
             query = query.order_by("timestamp", direction="DESCENDING").limit(limit)
             
             # Execute query
-            logs = [doc.to_dict() for doc in query.stream()]
+            with storage_operation("get_attendance_logs", "read") as operation:
+                logs = [doc.to_dict() for doc in query.stream()]
+                operation.documents = len(logs)
             
             return response_wrapper(200, "Attendance logs retrieved", logs)
             
@@ -335,35 +277,25 @@ class AppConfigAPI(Resource):
                 except ValueError:
                     return response_wrapper(400, "Allowed radius must be a valid number", None)
             
-            # Get current configuration
-            config_ref = db.collection(APP_CONFIG_COLLECTION).document(DEFAULT_CONFIG_ID)
-            config = config_ref.get()
-            
-            # If no config exists, create default first
-            if not config.exists:
-                current_config = get_app_config()  # This will create the default
-            else:
-                current_config = config.to_dict()
-            
-            # Update fields
-            updated_config = current_config.copy()
-            
+            changes = {}
+            if "offices" in data:
+                try:
+                    changes["offices"] = normalize_offices(data["offices"])
+                except ValueError as e:
+                    return response_wrapper(400, str(e), None)
             if "office_location" in data:
-                updated_config["office_location"] = data["office_location"]
-                
+                changes["office_location"] = data["office_location"]
             if "allowed_radius_km" in data:
-                updated_config["allowed_radius_km"] = float(data["allowed_radius_km"])
-                
+                changes["allowed_radius_km"] = float(data["allowed_radius_km"])
             if "enforce_geofence" in data:
-                updated_config["enforce_geofence"] = bool(data["enforce_geofence"])
-            
-            # Add metadata
-            updated_config["last_modified"] = datetime.utcnow().isoformat()
-            updated_config["last_modified_by"] = admin_id
-            
-            # Save the updated configuration
-            config_ref.set(updated_config)
-            
+                changes["enforce_geofence"] = bool(data["enforce_geofence"])
+
+            # Written through the cache so this worker serves the new configuration immediately
+            try:
+                updated_config = app_config_cache.update_app_config(changes, admin_id)
+            except ValueError as e:
+                return response_wrapper(400, str(e), None)
+
             return response_wrapper(200, "Application configuration updated successfully", updated_config)
             
         except Exception as e:
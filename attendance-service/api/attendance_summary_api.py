@@ -3,12 +3,11 @@ from flask_restful import Resource
 from server.firestore import FirestoreDB
 from datetime import datetime, timedelta
 import logging
-import requests
-import os
 from utils.response_wrapper import response_wrapper
+from utils.employee_client import EmployeeServiceError, ROSTER_FIELDS
+from server.employee_replica import get_employee_roster
 
 db = FirestoreDB()
-EMPLOYEE_API_URL = os.environ.get('EMPLOYEE_SERVICE_URL', 'http://localhost:5002')
 
 
 class AttendanceSummaryAPI(Resource):
@@ -31,17 +30,12 @@ class AttendanceSummaryAPI(Resource):
             # Get all attendance records for the date
             attendance_records = db.get_all_records_by_date(date_str)
             
-            # Get all employees from the employee service
+            # Get all employees from the local replica, or the employee service while it is cold
+            # (only the roster fields unless detailed)
             try:
-                response = requests.get(f"{EMPLOYEE_API_URL}/api/employee/all")
-                if response.status_code != 200:
-                    return response_wrapper(500, f"Failed to fetch employees: {response.status_code}", None)
-                
-                employees_data = response.json()
-                if employees_data.get("status") != 200:
-                    return response_wrapper(500, f"Employee API error: {employees_data.get('message')}", None)
-                
-                all_employees = employees_data.get("data", [])
+                all_employees = get_employee_roster(None if detailed else ROSTER_FIELDS)
+            except EmployeeServiceError as e:
+                return response_wrapper(500, str(e), None)
             except Exception as e:
                 logging.error(f"Error fetching employees: {str(e)}")
                 return response_wrapper(500, f"Error fetching employees: {str(e)}", None)
@@ -53,13 +47,14 @@ class AttendanceSummaryAPI(Resource):
             absent_count = total_employees - present_count
             
             # Create lists of present and absent employees with details
+            employees_by_id = {emp.get("id"): emp for emp in all_employees}
             present_employees = []
             absent_employees = []
             
             # Process present employees
             for record in attendance_records:
                 employee_id = record.get("employee_id")
-                employee_info = next((emp for emp in all_employees if emp.get("id") == employee_id), {})
+                employee_info = employees_by_id.get(employee_id, {})
                 
                 present_data = {
                     "employee_id": employee_id,
@@ -152,18 +147,12 @@ class AttendanceRangeAPI(Resource):
             if start_date_obj > end_date_obj:
                 return response_wrapper(400, "start_date must be before or equal to end_date", None)
             
-            # Get all employees from the employee service
+            # Get all employees from the local replica or the employee service (only the headcount is needed)
             try:
-                response = requests.get(f"{EMPLOYEE_API_URL}/api/employee/all")
-                if response.status_code != 200:
-                    return response_wrapper(500, f"Failed to fetch employees: {response.status_code}", None)
-                
-                employees_data = response.json()
-                if employees_data.get("status") != 200:
-                    return response_wrapper(500, f"Employee API error: {employees_data.get('message')}", None)
-                
-                all_employees = employees_data.get("data", [])
+                all_employees = get_employee_roster(["id"])
                 total_employees = len(all_employees)
+            except EmployeeServiceError as e:
+                return response_wrapper(500, str(e), None)
             except Exception as e:
                 logging.error(f"Error fetching employees: {str(e)}")
                 return response_wrapper(500, f"Error fetching employees: {str(e)}", None)
@@ -175,12 +164,15 @@ class AttendanceRangeAPI(Resource):
                 date_list.append(current_date.isoformat())
                 current_date += timedelta(days=1)
             
+            # Fetch every day's records concurrently
+            records_by_date = db.get_all_records_by_dates(date_list)
+            
             # Create daily summaries
             daily_summaries = []
             
             for date_str in date_list:
                 # Get attendance records for this date
-                attendance_records = db.get_all_records_by_date(date_str)
+                attendance_records = records_by_date[date_str]
                 
                 # Calculate summary statistics
                 present_employee_ids = set(record.get("employee_id") for record in attendance_records)
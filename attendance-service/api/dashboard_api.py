@@ -1,15 +1,12 @@
 from flask import request
 from flask_restful import Resource
 from datetime import datetime, timedelta
-import requests
 import logging
-import os
 from utils.response_wrapper import response_wrapper
+from utils.employee_client import EmployeeServiceError, ROSTER_FIELDS
+from server.employee_replica import get_employee_roster
 from server.firestore import FirestoreDB
 
-# API endpoints
-EMPLOYEE_SERVICE_URL = os.environ.get('EMPLOYEE_SERVICE_URL', 'http://localhost:5002')
-
 # Create db instance
 db = FirestoreDB()
 
@@ -31,17 +28,9 @@ class DashboardAPI(Resource):
             if not date_str:
                 date_str = datetime.utcnow().date().isoformat()
                 
-            # Get employees from employee service
+            # Get employees from the local replica, or the employee service while it is cold
             try:
-                response = requests.get(f"{EMPLOYEE_SERVICE_URL}/api/employee/all")
-                if response.status_code != 200:
-                    return response_wrapper(500, f"Failed to fetch employees: {response.status_code}", None)
-                
-                employees_data = response.json()
-                if employees_data.get("status") != 200:
-                    return response_wrapper(500, f"Employee API error: {employees_data.get('message')}", None)
-                
-                all_employees = employees_data.get("data", [])
+                all_employees = get_employee_roster(ROSTER_FIELDS)
                 total_employees = len(all_employees)
                 
                 if total_employees == 0:
@@ -60,12 +49,18 @@ class DashboardAPI(Resource):
                         "weekly_overview": []
                     })
                 
+            except EmployeeServiceError as e:
+                return response_wrapper(500, str(e), None)
             except Exception as e:
                 logging.error(f"Error fetching employees: {str(e)}")
                 return response_wrapper(500, f"Error fetching employees: {str(e)}", None)
             
-            # Get today's attendance records directly from database
-            today_records = db.get_all_records_by_date(date_str)
+            # Fetch the past 7 days (today included) concurrently; today's records drive the summary
+            end_date = datetime.strptime(date_str, "%Y-%m-%d").date()
+            start_date = end_date - timedelta(days=6)  # 7 days including today
+            week_dates = [(start_date + timedelta(days=offset)).isoformat() for offset in range(7)]
+            records_by_date = db.get_all_records_by_dates(week_dates)
+            today_records = records_by_date[end_date.isoformat()]
             
             # Calculate attendance stats
             on_time_count = 0
@@ -108,12 +103,13 @@ class DashboardAPI(Resource):
                 on_time_count = present_count - late_count
             
             # Get recent activity (last 5 clock events)
+            employees_by_id = {e.get("id"): e for e in all_employees}
             recent_activity = []
             sorted_records = sorted(today_records, key=lambda x: x.get("last_modified_date", ""), reverse=True)
             
             for record in sorted_records[:5]:
                 employee_id = record.get("employee_id")
-                employee_info = next((e for e in all_employees if e.get("id") == employee_id), {})
+                employee_info = employees_by_id.get(employee_id, {})
                 
                 has_clock_in = record.get("clock_in") is not None
                 has_clock_out = record.get("clock_out") is not None
@@ -147,14 +143,12 @@ class DashboardAPI(Resource):
             
             # Get weekly attendance overview (for the past 7 days)
             weekly_data = []
-            end_date = datetime.strptime(date_str, "%Y-%m-%d").date()
-            start_date = end_date - timedelta(days=6)  # 7 days including today
             
             # Process each day in the range manually
             current_date = start_date
             while current_date <= end_date:
                 current_date_str = current_date.isoformat()
-                day_records = db.get_all_records_by_date(current_date_str)
+                day_records = records_by_date[current_date_str]
                 
                 # Count present employees for this day
                 day_present_count = len(set(record.get("employee_id") for record in day_records))
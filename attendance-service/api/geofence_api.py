@@ -0,0 +1,68 @@
+from flask import request
+from flask_restful import Resource
+import logging
+import numpy as np
+from config import GEOFENCE_BATCH_MAX_POINTS
+from server.app_config import get_app_config, validate_locations
+from utils.response_wrapper import response_wrapper
+
+
+def parse_coordinates(data):
+    """
+    Latitude and longitude arrays from a batch request body.
+
+    Raises:
+        ValueError: If the arrays are missing, of different lengths, too long or out of range
+    """
+    if not isinstance(data, dict) or "latitude" not in data or "longitude" not in data:
+        raise ValueError("latitude and longitude arrays are required")
+    try:
+        latitudes = np.asarray(data["latitude"], dtype=np.float64)
+        longitudes = np.asarray(data["longitude"], dtype=np.float64)
+    except (TypeError, ValueError):
+        raise ValueError("latitude and longitude must be arrays of numbers")
+    if latitudes.ndim != 1 or longitudes.ndim != 1 or len(latitudes) != len(longitudes):
+        raise ValueError("latitude and longitude must be flat arrays of the same length")
+    if len(latitudes) > GEOFENCE_BATCH_MAX_POINTS:
+        raise ValueError(f"At most {GEOFENCE_BATCH_MAX_POINTS} points can be validated per request")
+    if not (np.isfinite(latitudes).all() and np.isfinite(longitudes).all()):
+        raise ValueError("latitude and longitude must be finite numbers")
+    if (np.abs(latitudes) > 90).any():
+        raise ValueError("Invalid latitude value. Must be between -90 and 90")
+    if (np.abs(longitudes) > 180).any():
+        raise ValueError("Invalid longitude value. Must be between -180 and 180")
+    return latitudes, longitudes
+
+
+class GeofenceBatchAPI(Resource):
+    def post(self):
+        """
+        Validate a batch of locations against the configured offices, as clock-in would.
+
+        Request body:
+            latitude (list): Point latitudes
+            longitude (list): Point longitudes, same length
+
+        Returns:
+            status (VALID / INVALID_LOCATION), office_id and distance_km per point, in request order
+        """
+        try:
+            try:
+                latitudes, longitudes = parse_coordinates(request.get_json(silent=True))
+            except ValueError as e:
+                return response_wrapper(400, str(e), None)
+
+            app_config = get_app_config()
+            results = validate_locations(app_config, latitudes, longitudes)
+            valid = results["status"].count("VALID")
+            return response_wrapper(200, "Locations validated", {
+                "config_version": app_config.get("version", 0),
+                "count": len(latitudes),
+                "valid": valid,
+                "invalid": len(latitudes) - valid,
+                **results
+            })
+
+        except Exception as e:
+            logging.error(f"Error validating locations: {str(e)}")
+            return response_wrapper(500, str(e), None)
@@ -4,12 +4,26 @@ from api.attendance_controller import AttendanceAPI, AttendanceByDateAPI, Employ
 from api.employee_status_api import EmployeeStatusAPI  # Import the new API
 from api.attendance_summary_api import AttendanceSummaryAPI, AttendanceRangeAPI
 from api.dashboard_api import DashboardAPI
+from api.geofence_api import GeofenceBatchAPI
 from flask_cors import CORS
+from config import COMPRESS_MIN_BYTES, COMPRESS_LEVEL, METRICS_DIR, METRICS_FLUSH_SECONDS, QUERY_TRACE_ENABLED, QUERY_TRACE_REPEAT_THRESHOLD
+from config import PROFILE_DIR, PROFILE_SAMPLE_RATE, PROFILE_MIN_DURATION_MS, PROFILE_INTERVAL_MS, PROFILE_ADMIN_TOKEN
+from utils.compression import response_compressor
+from utils.metrics import init_metrics
+from utils.query_trace import init_query_trace
+from utils.profiler import init_profiler
+from utils.response_wrapper import output_json
 import os
 
 app = Flask(__name__)
 CORS(app)  # Enable CORS for all routes
 api = Api(app)
+api.representations["application/json"] = output_json  # Fast encoder instead of the stdlib one
+app.after_request(response_compressor(COMPRESS_MIN_BYTES, COMPRESS_LEVEL))  # gzip/deflate large bodies
+init_metrics(app, METRICS_DIR, METRICS_FLUSH_SECONDS)  # Per-route latency/status metrics on /metrics
+init_query_trace(app, QUERY_TRACE_ENABLED, QUERY_TRACE_REPEAT_THRESHOLD)  # Storage cost per request when debugging
+init_profiler(app, PROFILE_DIR, PROFILE_SAMPLE_RATE, PROFILE_MIN_DURATION_MS, PROFILE_INTERVAL_MS,
+              PROFILE_ADMIN_TOKEN)  # Opt-in sampling profiles of slow or flagged requests
 
 # API Routes
 api.add_resource(AttendanceAPI, "/api/attendance")  # Clock-In/Out API
@@ -17,6 +31,7 @@ api.add_resource(AttendanceByDateAPI, "/api/attendance/date")  # Fetch records b
 api.add_resource(EmployeeAttendanceAPI, "/api/attendance/employee/<string:employee_id>")  # Fetch employee's attendance history
 api.add_resource(AttendanceLogsAPI, "/api/attendance/logs")  # Fetch rejected attendance logs
 api.add_resource(EmployeeStatusAPI, "/api/attendance/status")  # NEW: Get employee's current status
+api.add_resource(GeofenceBatchAPI, "/api/attendance/geofence/validate-batch")  # Validate many locations at once
 
 # Summary APIs
 api.add_resource(AttendanceSummaryAPI, "/api/attendance/summary")  # Get attendance summary for a specific date
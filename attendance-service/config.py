@@ -1,7 +1,7 @@
 import os
 import json
-import firebase_admin
-from firebase_admin import credentials, firestore
+import itertools
+import threading
 
 # Path for local development (when running with Docker)
 FIREBASE_CREDENTIALS_PATH = "/serviceAccountKey.json"
@@ -9,20 +9,140 @@ FIREBASE_CREDENTIALS_PATH = "/serviceAccountKey.json"
 # Check if credentials are provided as environment variable (for Render.com)
 FIREBASE_CREDENTIALS_JSON = os.environ.get("FIREBASE_CREDENTIALS_JSON")
 
-try:
-    # Try to use environment variable first
-    if FIREBASE_CREDENTIALS_JSON:
-        cred_dict = json.loads(FIREBASE_CREDENTIALS_JSON)
-        cred = credentials.Certificate(cred_dict)
-        firebase_admin.initialize_app(cred)
-    # Fall back to file if environment variable is not set
-    elif os.path.exists(FIREBASE_CREDENTIALS_PATH):
-        cred = credentials.Certificate(FIREBASE_CREDENTIALS_PATH)
-        firebase_admin.initialize_app(cred)
-    else:
-        raise FileNotFoundError(f"Firebase credentials file not found: {FIREBASE_CREDENTIALS_PATH}")
-
-    db = firestore.client()
-except Exception as e:
-    print(f"Error initializing Firebase: {e}")
-    raise
\ No newline at end of file
+# Response encoding: JSON encoder (auto, orjson, ujson or stdlib) and gzip/deflate above a size threshold
+JSON_ENCODER = os.environ.get("JSON_ENCODER", "auto")
+COMPRESS_MIN_BYTES = int(os.environ.get("COMPRESS_MIN_BYTES", 1024))
+COMPRESS_LEVEL = int(os.environ.get("COMPRESS_LEVEL", 6))
+
+# Local employee replica used by the reporting endpoints: listen (on_snapshot), poll or off
+EMPLOYEE_REPLICA_MODE = os.environ.get("EMPLOYEE_REPLICA_MODE", "listen").lower()
+EMPLOYEE_REPLICA_FIELDS = [field.strip() for field in
+                           os.environ.get("EMPLOYEE_REPLICA_FIELDS", "id,name,designation").split(",") if field.strip()]
+EMPLOYEE_REPLICA_POLL_SECONDS = float(os.environ.get("EMPLOYEE_REPLICA_POLL_SECONDS", 30))
+EMPLOYEE_REPLICA_REBUILD_SECONDS = float(os.environ.get("EMPLOYEE_REPLICA_REBUILD_SECONDS", 600))
+
+# App config cache for the clock-in path: listen (on_snapshot) or ttl, and the longest a ttl copy is served
+APP_CONFIG_CACHE_MODE = os.environ.get("APP_CONFIG_CACHE_MODE", "listen").lower()
+APP_CONFIG_TTL_SECONDS = float(os.environ.get("APP_CONFIG_TTL_SECONDS", 10))
+
+# Most points accepted by POST /api/attendance/geofence/validate-batch
+GEOFENCE_BATCH_MAX_POINTS = int(os.environ.get("GEOFENCE_BATCH_MAX_POINTS", 50000))
+
+# Async data access: most concurrent queries per request and how long a request waits for them
+ASYNC_MAX_CONCURRENCY = int(os.environ.get("ASYNC_MAX_CONCURRENCY", 10))
+ASYNC_QUERY_TIMEOUT_SECONDS = float(os.environ.get("ASYNC_QUERY_TIMEOUT_SECONDS", 30))
+
+# Storage backend: firestore, memory (per process, not persisted) or sqlite (a local file shared by processes)
+STORAGE_BACKEND = os.environ.get("STORAGE_BACKEND", "firestore").lower()
+STORAGE_SQLITE_PATH = os.environ.get("STORAGE_SQLITE_PATH", "people-pilot.db")
+
+# Production serving (gunicorn.conf.py): worker processes, threads per worker and shutdown grace period
+WEB_WORKERS = int(os.environ.get("WEB_WORKERS", (os.cpu_count() or 1) * 2 + 1))
+WEB_THREADS = int(os.environ.get("WEB_THREADS", 8))
+WEB_TIMEOUT_SECONDS = int(os.environ.get("WEB_TIMEOUT_SECONDS", 60))
+WEB_GRACEFUL_TIMEOUT_SECONDS = int(os.environ.get("WEB_GRACEFUL_TIMEOUT_SECONDS", 30))
+
+# Firestore clients (each with its own gRPC channel) per worker process; request threads are spread over them
+FIRESTORE_CHANNEL_POOL_SIZE = max(1, int(os.environ.get("FIRESTORE_CHANNEL_POOL_SIZE", 2)))
+
+# Prometheus /metrics: directory where each gunicorn worker publishes its metrics (per process when empty)
+METRICS_DIR = os.environ.get("METRICS_DIR", "")
+METRICS_FLUSH_SECONDS = float(os.environ.get("METRICS_FLUSH_SECONDS", 5))
+
+# Per-request storage tracing: X-Query-Trace headers, N+1 warnings and /debug/query-budget (off in production)
+QUERY_TRACE_ENABLED = os.environ.get("QUERY_TRACE_ENABLED", "false").lower() == "true"
+QUERY_TRACE_REPEAT_THRESHOLD = int(os.environ.get("QUERY_TRACE_REPEAT_THRESHOLD", 3))
+
+# Request profiling: requests sent with X-Profile: PROFILE_ADMIN_TOKEN, or a PROFILE_SAMPLE_RATE fraction of requests
+# (kept when slower than PROFILE_MIN_DURATION_MS), are sampled every PROFILE_INTERVAL_MS and written to PROFILE_DIR
+PROFILE_DIR = os.environ.get("PROFILE_DIR", "profiles")
+PROFILE_SAMPLE_RATE = float(os.environ.get("PROFILE_SAMPLE_RATE", 0))
+PROFILE_MIN_DURATION_MS = float(os.environ.get("PROFILE_MIN_DURATION_MS", 500))
+PROFILE_INTERVAL_MS = float(os.environ.get("PROFILE_INTERVAL_MS", 5))
+PROFILE_ADMIN_TOKEN = os.environ.get("PROFILE_ADMIN_TOKEN") or None
+
+_firebase_lock = threading.Lock()
+_clients = []
+_clients_pid = None
+_next_client = itertools.count()
+_thread_client = threading.local()
+_local_client = None
+
+
+def get_firebase_app():
+    """Initialize the Firebase app on first use and return it"""
+    # Firebase libraries are only loaded when the firestore backend is in use
+    import firebase_admin
+    from firebase_admin import credentials
+    with _firebase_lock:
+        try:
+            return firebase_admin.get_app()
+        except ValueError:
+            pass
+        try:
+            # Try to use environment variable first
+            if FIREBASE_CREDENTIALS_JSON:
+                cred_dict = json.loads(FIREBASE_CREDENTIALS_JSON)
+                cred = credentials.Certificate(cred_dict)
+            # Fall back to file if environment variable is not set
+            elif os.path.exists(FIREBASE_CREDENTIALS_PATH):
+                cred = credentials.Certificate(FIREBASE_CREDENTIALS_PATH)
+            else:
+                raise FileNotFoundError(f"Firebase credentials file not found: {FIREBASE_CREDENTIALS_PATH}")
+            return firebase_admin.initialize_app(cred)
+        except Exception as e:
+            print(f"Error initializing Firebase: {e}")
+            raise
+
+
+def get_db():
+    """
+    Return a Firestore client for the calling thread.
+
+    Clients are created lazily in each process, so no gRPC channel is opened
+    before gunicorn forks its workers, and they are recreated if the process
+    has forked since. Each thread sticks to one client of the pool.
+    With a local STORAGE_BACKEND every thread shares one local client instead.
+    """
+    global _clients, _clients_pid, _local_client
+    if STORAGE_BACKEND != "firestore":
+        if _local_client is None:
+            from storage import create_local_client
+            with _firebase_lock:
+                if _local_client is None:
+                    _local_client = create_local_client(STORAGE_BACKEND, STORAGE_SQLITE_PATH)
+        return _local_client
+    if _clients_pid != os.getpid():
+        from google.cloud import firestore
+        app = get_firebase_app()
+        with _firebase_lock:
+            if _clients_pid != os.getpid():
+                credential = app.credential.get_credential()
+                _clients = [firestore.Client(project=app.project_id, credentials=credential)
+                            for _ in range(FIRESTORE_CHANNEL_POOL_SIZE)]
+                _clients_pid = os.getpid()
+    client = getattr(_thread_client, "client", None)
+    if client is None or getattr(_thread_client, "pid", None) != _clients_pid:
+        client = _clients[next(_next_client) % len(_clients)]
+        _thread_client.client, _thread_client.pid = client, _clients_pid
+    return client
+
+
+class _LazyClient:
+    """Stands in for a Firestore client and forwards to get_db(), so modules can keep "from config import db\""""
+
+    def __getattr__(self, name):
+        return getattr(get_db(), name)
+
+
+db = _LazyClient()
+
+
+def create_async_client():
+    """Firestore AsyncClient for the Firebase app; create it on the event loop that will use it"""
+    if STORAGE_BACKEND != "firestore":
+        from storage import AsyncLocalClient
+        return AsyncLocalClient(get_db())
+    from google.cloud import firestore
+    app = get_firebase_app()
+    return firestore.AsyncClient(project=app.project_id, credentials=app.credential.get_credential())
@@ -1 +1,2 @@
 ATTENDANCE_COLLECTION = "attendance"
+EMPLOYEE_COLLECTION = "employees"
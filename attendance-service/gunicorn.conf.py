@@ -0,0 +1,38 @@
+# Production server settings: gunicorn -c gunicorn.conf.py app:app
+import os
+import tempfile
+
+# Workers publish their metrics to a shared directory so /metrics covers the whole server, whichever worker
+# answers the scrape. Set before config is imported: the workers inherit the master's imported modules.
+os.environ.setdefault("METRICS_DIR", os.path.join(tempfile.gettempdir(), f"attendance-service-metrics-{os.environ.get('PORT', 5003)}"))
+
+from config import METRICS_DIR, WEB_WORKERS, WEB_THREADS, WEB_TIMEOUT_SECONDS, WEB_GRACEFUL_TIMEOUT_SECONDS
+
+bind = f"0.0.0.0:{os.environ.get('PORT', 5003)}"
+workers = WEB_WORKERS
+threads = WEB_THREADS
+worker_class = "gthread"
+timeout = WEB_TIMEOUT_SECONDS
+# SIGTERM stops accepting connections and gives in-flight requests this long to finish
+graceful_timeout = WEB_GRACEFUL_TIMEOUT_SECONDS
+keepalive = 5
+# The app is imported in each worker, so Firestore clients, listeners and background threads are created after fork
+preload_app = False
+accesslog = "-"
+
+
+def on_starting(server):
+    """Start the metrics from zero rather than adding to the previous run's workers"""
+    from utils.metrics import clear_snapshots
+    os.makedirs(METRICS_DIR, exist_ok=True)
+    clear_snapshots(METRICS_DIR)
+
+
+def worker_exit(server, worker):
+    """Close the snapshot listeners and write the final metrics before the worker goes away"""
+    from server.app_config import app_config_cache
+    from server.employee_replica import employee_replica
+    from utils.metrics import exporter
+    app_config_cache.stop()
+    employee_replica.stop()
+    exporter.flush()
@@ -0,0 +1,391 @@
+import logging
+import os
+import threading
+import time
+from datetime import datetime
+from config import db, APP_CONFIG_CACHE_MODE, APP_CONFIG_TTL_SECONDS
+from storage import supports_listeners, transactional
+from utils.geofence import GeofenceIndex, Office, validate_batch
+from utils.metrics import track_storage
+
+# App Config Collection
+APP_CONFIG_COLLECTION = "app_configs"
+DEFAULT_CONFIG_ID = "default_config"
+
+# Default configuration values (used as fallback)
+DEFAULT_OFFICE_ID = "default"
+DEFAULT_OFFICE_LOCATION = (12.956203, 80.195962)  # Office latitude & longitude
+DEFAULT_ALLOWED_RADIUS_KM = 0.1  # Allowed radius (100 meters)
+
+# While a listener is running it pushes every change, so the document is only re-read this many TTLs apart
+LISTEN_RESYNC_TTLS = 10
+# After a failed read with nothing cached, the built-in default is served for this long before the next attempt
+FAILED_READ_RETRY_SECONDS = 1.0
+
+
+def default_app_config():
+    """Configuration used when none is stored yet"""
+    now = datetime.utcnow().isoformat()
+    return {
+        "id": DEFAULT_CONFIG_ID,
+        "office_location": {
+            "latitude": DEFAULT_OFFICE_LOCATION[0],
+            "longitude": DEFAULT_OFFICE_LOCATION[1]
+        },
+        "allowed_radius_km": DEFAULT_ALLOWED_RADIUS_KM,
+        "enforce_geofence": True,
+        "version": 1,
+        "created_at": now,
+        "last_modified": now,
+        "last_modified_by": "system"
+    }
+
+
+def normalize_offices(offices):
+    """
+    Validate the offices list of a configuration update and give every office an id.
+
+    Args:
+        offices (list): [{"id" (optional), "name" (optional), "latitude", "longitude", "allowed_radius_km"}]
+
+    Returns:
+        list: Offices as they are stored
+
+    Raises:
+        ValueError: If an office is malformed or an id is repeated
+    """
+    if not isinstance(offices, list):
+        raise ValueError("offices must be a list")
+    normalized, seen = [], set()
+    for number, office in enumerate(offices, start=1):
+        if not isinstance(office, dict) or "latitude" not in office or "longitude" not in office:
+            raise ValueError(f"Office {number} must include latitude and longitude")
+        try:
+            latitude = float(office["latitude"])
+            longitude = float(office["longitude"])
+            radius = float(office.get("allowed_radius_km", DEFAULT_ALLOWED_RADIUS_KM))
+        except (TypeError, ValueError):
+            raise ValueError(f"Office {number}: latitude, longitude and allowed_radius_km must be valid numbers")
+        if latitude < -90 or latitude > 90:
+            raise ValueError(f"Office {number}: invalid latitude value. Must be between -90 and 90")
+        if longitude < -180 or longitude > 180:
+            raise ValueError(f"Office {number}: invalid longitude value. Must be between -180 and 180")
+        if radius <= 0:
+            raise ValueError(f"Office {number}: allowed radius must be greater than 0")
+        office_id = str(office.get("id") or f"office-{number}")
+        if office_id in seen:
+            raise ValueError(f"Duplicate office id: {office_id}")
+        seen.add(office_id)
+        normalized.append({"id": office_id, "name": office.get("name") or office_id, "latitude": latitude,
+                           "longitude": longitude, "allowed_radius_km": radius})
+    return normalized
+
+
+def offices_from_config(config):
+    """
+    Office fences of a configuration: its offices list, or the single office_location when that is empty.
+
+    Returns:
+        list: Office tuples
+    """
+    if config.get("offices"):
+        return [Office(office["id"], office.get("name"), float(office["latitude"]), float(office["longitude"]),
+                       float(office.get("allowed_radius_km", DEFAULT_ALLOWED_RADIUS_KM)))
+                for office in config["offices"]]
+    location = config.get("office_location") or {}
+    return [Office(DEFAULT_OFFICE_ID, "the office",
+                   float(location.get("latitude", DEFAULT_OFFICE_LOCATION[0])),
+                   float(location.get("longitude", DEFAULT_OFFICE_LOCATION[1])),
+                   float(config.get("allowed_radius_km", DEFAULT_ALLOWED_RADIUS_KM)))]
+
+
+def merge_config_changes(current, changes):
+    """
+    Apply an update to a stored configuration.
+
+    Once the configuration lists offices, office_location and allowed_radius_km
+    no longer define a fence by themselves; they are applied to the office
+    with id DEFAULT_OFFICE_ID instead, so updates from older admin clients are
+    not silently ignored.
+
+    Returns:
+        dict: The merged configuration (without version or modification stamps)
+
+    Raises:
+        ValueError: If offices and the single-office fields are sent together, or there is no default office
+    """
+    legacy_fields = [field for field in ("office_location", "allowed_radius_km") if field in changes]
+    updated = {**current, **changes}
+    if not legacy_fields or not updated.get("offices"):
+        return updated
+    if "offices" in changes:
+        raise ValueError(f"Send either offices or {' and '.join(legacy_fields)}, not both")
+    if not any(office["id"] == DEFAULT_OFFICE_ID for office in updated["offices"]):
+        raise ValueError(f"This configuration lists offices and none has the id '{DEFAULT_OFFICE_ID}'; "
+                         "update the offices field instead")
+
+    def apply(office):
+        if office["id"] != DEFAULT_OFFICE_ID:
+            return office
+        office = dict(office)
+        if "office_location" in changes:
+            office["latitude"] = float(changes["office_location"]["latitude"])
+            office["longitude"] = float(changes["office_location"]["longitude"])
+        if "allowed_radius_km" in changes:
+            office["allowed_radius_km"] = float(changes["allowed_radius_km"])
+        return office
+
+    updated["offices"] = [apply(office) for office in updated["offices"]]
+    return updated
+
+
+def config_version(config):
+    """Version stamp of a stored configuration (documents written before versioning count as 0)"""
+    try:
+        return int((config or {}).get("version", 0))
+    except (TypeError, ValueError):
+        return 0
+
+
+class AppConfigCache:
+    """
+    In-process copy of app_configs/default_config for the clock-in path.
+
+    In "listen" mode an on_snapshot listener on the document applies every
+    change as it happens. In "ttl" mode, or when the storage backend has no
+    listeners, the document is re-read once the copy is older than
+    ttl_seconds; requests keep getting the current copy while one thread
+    re-reads it. update_app_config() writes through and applies the result at once.
+
+    Every write increments the document's version, and the cache never
+    replaces its copy with a lower version, so a slow re-read or a late
+    snapshot cannot roll back a newer configuration.
+
+    Args:
+        client: Firestore client
+        mode (str): "listen" or "ttl"
+        ttl_seconds (float): Maximum age of the copy in ttl mode
+    """
+
+    def __init__(self, client, mode="listen", ttl_seconds=10):
+        self.client = client
+        self.mode = mode
+        self.ttl_seconds = max(0.0, float(ttl_seconds))
+        self._config = None
+        self._fallback = None
+        self._loaded_at = None
+        self._lock = threading.Lock()
+        self._load_lock = threading.Lock()
+        self._start_lock = threading.Lock()
+        self._pid = None
+        self._watch = None
+        self.active_mode = None
+        self.reads = 0
+        self.snapshots = 0
+        self.errors = 0
+
+    def _reference(self):
+        return self.client.collection(APP_CONFIG_COLLECTION).document(DEFAULT_CONFIG_ID)
+
+    def start(self):
+        """Start the listener for this process if it is not running"""
+        if self._pid == os.getpid() and not self._needs_restart():
+            return
+        with self._start_lock:
+            if self._pid == os.getpid() and not self._needs_restart():
+                return
+            if self._pid != os.getpid():
+                # A forked worker inherits the copy but not the listener keeping it current
+                self._loaded_at = None
+            self._pid = os.getpid()
+            self._watch = None
+            if self.mode == "listen" and not supports_listeners(self.client):
+                logging.info(f"The storage backend has no listeners; app config is re-read every {self.ttl_seconds}s")
+            elif self.mode == "listen":
+                try:
+                    self._watch = self._reference().on_snapshot(self._on_snapshot)
+                    self.active_mode = "listen"
+                    return
+                except Exception as e:
+                    self.errors += 1
+                    logging.error(f"App config listener failed to start, using the TTL instead: {str(e)}")
+            self.active_mode = "ttl"
+
+    def stop(self):
+        """Close the snapshot listener"""
+        watch, self._watch = self._watch, None
+        if watch is not None:
+            try:
+                watch.unsubscribe()
+            except Exception as e:
+                logging.error(f"Error closing app config listener: {str(e)}")
+
+    def _needs_restart(self):
+        if self.active_mode == "listen":
+            return self._watch is None or not getattr(self._watch, "is_active", True)
+        return False
+
+    def _on_snapshot(self, snapshots, changes, read_time):
+        for snapshot in snapshots:
+            if snapshot.exists:
+                self._apply(snapshot.to_dict())
+            else:
+                # Deleted: the next get() re-reads the document and recreates the default
+                with self._lock:
+                    self._config = None
+        self.snapshots += 1
+
+    def _apply(self, config):
+        """Keep config unless the cached copy is newer; returns the copy now cached"""
+        with self._lock:
+            if self._config is None or config_version(config) >= config_version(self._config):
+                self._config = config
+            self._loaded_at = time.monotonic()
+            return self._config
+
+    def _max_age(self):
+        if self.active_mode == "listen":
+            return self.ttl_seconds * LISTEN_RESYNC_TTLS
+        return self.ttl_seconds
+
+    def get(self):
+        """
+        Current configuration, read from storage only when the copy is missing or stale.
+
+        The dict is shared with the cache; do not mutate it.
+        """
+        self.start()
+        config = self._config
+        if config is not None and self._is_fresh():
+            return config
+        # One thread re-reads the document; while there is a copy the others keep using it
+        if not self._load_lock.acquire(blocking=config is None):
+            return config
+        try:
+            if self._config is not None and self._is_fresh():
+                return self._config
+            return self.read_app_config()
+        finally:
+            self._load_lock.release()
+
+    def _is_fresh(self):
+        loaded_at = self._loaded_at
+        return loaded_at is not None and time.monotonic() - loaded_at < self._max_age()
+
+    @track_storage("read")
+    def read_app_config(self):
+        """Read the document (creating the default if there is none) into the cache"""
+        try:
+            reference = self._reference()
+
+            @transactional
+            def _read(transaction):
+                snapshot = reference.get(transaction=transaction)
+                if snapshot.exists:
+                    return snapshot.to_dict()
+                config = default_app_config()
+                transaction.set(reference, config)
+                logging.info(f"Created default configuration in Firestore: {config}")
+                return config
+
+            self.reads += 1
+            return self._apply(_read(self.client.transaction()))
+        except Exception as e:
+            self.errors += 1
+            logging.error(f"Error retrieving app configuration: {str(e)}")
+            with self._lock:
+                if self._config is not None and self._config is not self._fallback:
+                    # Keep serving the last known configuration and retry after another TTL
+                    self._loaded_at = time.monotonic()
+                    return self._config
+                # Serve the built-in default (version 0, so any stored configuration replaces it)
+                # and retry shortly, rather than making every request wait on storage again
+                if self._fallback is None:
+                    self._fallback = default_app_config()
+                    self._fallback.pop("id")
+                    self._fallback["version"] = 0
+                self._config = self._fallback
+                max_age = self._max_age()
+                self._loaded_at = time.monotonic() - max_age + min(FAILED_READ_RETRY_SECONDS, max_age)
+                return self._config
+
+    @track_storage("write")
+    def update_app_config(self, changes, modified_by):
+        """
+        Merge changes into the stored configuration, bump its version and cache the result.
+
+        Args:
+            changes (dict): Fields to replace (see merge_config_changes)
+            modified_by (str): Recorded as last_modified_by
+
+        Returns:
+            dict: The configuration as written
+
+        Raises:
+            ValueError: If the changes conflict with the stored offices; nothing is written
+        """
+        reference = self._reference()
+
+        @transactional
+        def _update(transaction):
+            snapshot = reference.get(transaction=transaction)
+            current = snapshot.to_dict() if snapshot.exists else default_app_config()
+            updated = merge_config_changes(current, changes)
+            updated["version"] = config_version(current) + 1
+            updated["last_modified"] = datetime.utcnow().isoformat()
+            updated["last_modified_by"] = modified_by
+            transaction.set(reference, updated)
+            return updated
+
+        updated = _update(self.client.transaction())
+        self._apply(updated)
+        return updated
+
+    def stats(self):
+        """Mode, version and age of the cached configuration"""
+        return {
+            "mode": self.active_mode or self.mode,
+            "version": config_version(self._config) if self._config is not None else None,
+            "age_seconds": round(time.monotonic() - self._loaded_at, 1) if self._loaded_at is not None else None,
+            "reads": self.reads,
+            "snapshots": self.snapshots,
+            "errors": self.errors
+        }
+
+
+_geofence = (None, None)  # (configuration, its GeofenceIndex)
+
+
+def geofence_index(config):
+    """GeofenceIndex for a configuration, rebuilt only when the cached configuration is replaced"""
+    global _geofence
+    indexed_config, index = _geofence
+    if indexed_config is not config:
+        index = GeofenceIndex(offices_from_config(config))
+        _geofence = (config, index)
+    return index
+
+
+def validate_locations(config, latitudes, longitudes):
+    """
+    Geofence a batch of points against a configuration's offices in one vectorized pass.
+
+    Returns:
+        dict: "status", "office_id" and "distance_km" lists with one entry per point
+    """
+    offices = offices_from_config(config)
+    result = validate_batch(offices, latitudes, longitudes)
+    office_ids = [office.id for office in offices]
+    return {
+        "status": result["status"].tolist(),
+        "office_id": [office_ids[index] for index in result["office_index"].tolist()],
+        "distance_km": result["distance_km"].tolist()
+    }
+
+
+app_config_cache = AppConfigCache(db, APP_CONFIG_CACHE_MODE, APP_CONFIG_TTL_SECONDS)
+
+
+def get_app_config():
+    """Application configuration for office location and geofence settings, from the in-process cache"""
+    return app_config_cache.get()
@@ -0,0 +1,216 @@
+import logging
+import os
+import threading
+import time
+from datetime import datetime, timedelta
+from config import (db, EMPLOYEE_REPLICA_MODE, EMPLOYEE_REPLICA_FIELDS,
+                    EMPLOYEE_REPLICA_POLL_SECONDS, EMPLOYEE_REPLICA_REBUILD_SECONDS)
+from constants.firestore_collections import EMPLOYEE_COLLECTION
+from storage import supports_listeners
+from utils.employee_client import fetch_all_employees
+
+# Timestamp fields used to find employees changed since the last poll
+CHANGE_FIELDS = ("created_at", "updated_at")
+
+
+class EmployeeReplica:
+    """
+    Read-only, in-memory copy of the employees collection for the reporting endpoints.
+
+    In "listen" mode an on_snapshot listener delivers the whole collection once
+    and then every change as it happens. In "poll" mode the collection is read
+    once and refreshed with a created_at/updated_at delta query every
+    poll_seconds, plus a full rebuild every rebuild_seconds to drop deleted
+    employees. Only the configured fields are kept.
+
+    The replica is started lazily (and again after a fork), and reports itself
+    cold until the first full load has landed so callers can fall back to HTTP.
+
+    Args:
+        client: Firestore client
+        fields (list): Employee fields to keep
+        mode (str): "listen", "poll" or "off"
+        poll_seconds (float): Interval between delta polls
+        rebuild_seconds (float): Interval between full reloads in poll mode
+    """
+
+    def __init__(self, client, fields, mode="listen", poll_seconds=30, rebuild_seconds=600):
+        self.client = client
+        self.fields = list(dict.fromkeys(["id"] + list(fields)))
+        self.mode = mode
+        self.poll_seconds = max(1.0, float(poll_seconds))
+        self.rebuild_seconds = max(self.poll_seconds, float(rebuild_seconds))
+        self._records = {}  # employee id -> projected record
+        self._lock = threading.Lock()
+        self._start_lock = threading.Lock()
+        self._ready = threading.Event()
+        self._pid = None
+        self._watch = None
+        self._thread = None
+        self._watermark = None
+        self._built_at = None
+        self.active_mode = None
+        self.snapshots = 0
+        self.changes_applied = 0
+        self.polls = 0
+        self.errors = 0
+        self.last_change_at = None
+
+    def _project(self, doc_id, data):
+        record = {field: data[field] for field in self.fields if field in data}
+        record.setdefault("id", doc_id)
+        return record
+
+    def start(self):
+        """Start the listener or poller for this process if it is not running"""
+        if self.mode == "off":
+            return
+        if self._pid == os.getpid() and not self._needs_restart():
+            return
+        with self._start_lock:
+            if self._pid == os.getpid() and not self._needs_restart():
+                return
+            if self._pid != os.getpid() or self.active_mode == "listen":
+                # A forked worker inherits the records but not the threads feeding them, and a
+                # restarted listener resends every document, so start again from empty
+                self._ready.clear()
+                with self._lock:
+                    self._records = {}
+            self._pid = os.getpid()
+            if self.mode == "listen" and not supports_listeners(self.client):
+                logging.info("The storage backend has no listeners; employee replica is polling instead")
+            elif self.mode == "listen":
+                try:
+                    self._watch = self.client.collection(EMPLOYEE_COLLECTION).on_snapshot(self._on_snapshot)
+                    self.active_mode = "listen"
+                    return
+                except Exception as e:
+                    self.errors += 1
+                    logging.error(f"Employee replica listener failed to start, polling instead: {str(e)}")
+            self.active_mode = "poll"
+            self._thread = threading.Thread(target=self._poll_loop, name="employee-replica", daemon=True)
+            self._thread.start()
+
+    def stop(self):
+        """Close the snapshot listener (the poller is a daemon thread and ends with the process)"""
+        watch, self._watch = self._watch, None
+        if watch is not None:
+            try:
+                watch.unsubscribe()
+            except Exception as e:
+                logging.error(f"Error closing employee replica listener: {str(e)}")
+
+    def _needs_restart(self):
+        if self.active_mode == "listen":
+            return self._watch is None or not getattr(self._watch, "is_active", True)
+        return self._thread is None or not self._thread.is_alive()
+
+    def _on_snapshot(self, snapshot, changes, read_time):
+        # The first callback carries every document as ADDED, which doubles as the bootstrap
+        with self._lock:
+            for change in changes:
+                document = change.document
+                if change.type.name == "REMOVED":
+                    self._records.pop(document.id, None)
+                else:
+                    self._records[document.id] = self._project(document.id, document.to_dict())
+            self.snapshots += 1
+            self.changes_applied += len(changes)
+            self.last_change_at = time.time()
+        self._ready.set()
+
+    def _select(self, query):
+        return query.select(self.fields).stream()
+
+    def _rebuild(self):
+        started = datetime.utcnow()
+        records = {doc.id: self._project(doc.id, doc.to_dict())
+                   for doc in self._select(self.client.collection(EMPLOYEE_COLLECTION))}
+        with self._lock:
+            self._records = records
+            self.last_change_at = time.time()
+        self._built_at = time.monotonic()
+        # Overlap deltas a little so writes committed while we were reading are not missed
+        self._watermark = (started - timedelta(seconds=5)).isoformat()
+        self._ready.set()
+
+    def _refresh(self):
+        started = datetime.utcnow()
+        changed = {}
+        collection = self.client.collection(EMPLOYEE_COLLECTION)
+        for field in CHANGE_FIELDS:
+            for doc in self._select(collection.where(field, ">", self._watermark)):
+                changed[doc.id] = self._project(doc.id, doc.to_dict())
+        with self._lock:
+            self._records.update(changed)
+            self.changes_applied += len(changed)
+            if changed:
+                self.last_change_at = time.time()
+        self._watermark = (started - timedelta(seconds=5)).isoformat()
+
+    def _poll_loop(self):
+        while True:
+            try:
+                if self._built_at is None or time.monotonic() - self._built_at >= self.rebuild_seconds:
+                    self._rebuild()
+                else:
+                    self._refresh()
+                self.polls += 1
+            except Exception as e:
+                self.errors += 1
+                logging.error(f"Error refreshing employee replica: {str(e)}")
+            time.sleep(self.poll_seconds)
+
+    def is_ready(self):
+        """True once the first full load has been applied"""
+        return self._ready.is_set()
+
+    def covers(self, fields):
+        """True if the replica holds every requested field (None means all fields, which it never does)"""
+        return fields is not None and set(fields) <= set(self.fields)
+
+    def employees(self, fields=None):
+        """
+        Current roster, or None if the replica is cold or does not hold the requested fields.
+
+        Records are shared with the replica; do not mutate them.
+        """
+        self.start()
+        if not self.is_ready() or not self.covers(fields):
+            return None
+        with self._lock:
+            return list(self._records.values())
+
+    def stats(self):
+        """Replica size, mode and change counters"""
+        return {
+            "mode": self.active_mode or self.mode,
+            "ready": self.is_ready(),
+            "size": len(self._records),
+            "fields": self.fields,
+            "snapshots": self.snapshots,
+            "changes_applied": self.changes_applied,
+            "polls": self.polls,
+            "errors": self.errors,
+            "seconds_since_change": round(time.time() - self.last_change_at, 1) if self.last_change_at else None
+        }
+
+
+employee_replica = EmployeeReplica(db, EMPLOYEE_REPLICA_FIELDS, EMPLOYEE_REPLICA_MODE,
+                                   EMPLOYEE_REPLICA_POLL_SECONDS, EMPLOYEE_REPLICA_REBUILD_SECONDS)
+
+
+def get_employee_roster(fields=None):
+    """
+    Employee roster for the reporting endpoints.
+
+    Served from the local replica when it is warm and holds the requested fields,
+    otherwise fetched from the employee service.
+
+    Raises:
+        EmployeeServiceError: If the HTTP fallback fails
+    """
+    employees = employee_replica.employees(fields)
+    if employees is not None:
+        return employees
+    return fetch_all_employees(fields)
@@ -1,30 +1,73 @@
-from config import db
+from config import db, ASYNC_QUERY_TIMEOUT_SECONDS
 from datetime import datetime, timedelta
+from server.firestore_async import AsyncFirestoreDB
+from utils.async_bridge import run_async
+from utils.metrics import track_storage
+
+# Firestore commits at most 500 writes per batch
+BATCH_WRITE_LIMIT = 500
 
 class FirestoreDB:
     def __init__(self):
-        self.collection = db.collection("attendance")
+        self.async_db = AsyncFirestoreDB()
+
+    @property
+    def collection(self):
+        # Resolved per call so the client is created after fork, in the worker that uses it
+        return db.collection("attendance")
 
+    @track_storage("write")
     def add_record(self, data):
         """Add attendance record."""
         self.collection.document(data["id"]).set(data)
         return True
 
+    @track_storage("write")
+    def update_records(self, updates):
+        """
+        Merge fields into several attendance records, committed in batches.
+
+        Args:
+            updates (dict): {record id: fields to merge}
+
+        Returns:
+            int: Number of records written
+        """
+        items = list(updates.items())
+        for start in range(0, len(items), BATCH_WRITE_LIMIT):
+            batch = db.batch()
+            for record_id, fields in items[start:start + BATCH_WRITE_LIMIT]:
+                batch.set(self.collection.document(record_id), fields, merge=True)
+            batch.commit()
+        return len(items)
+
+    @track_storage("read")
     def get_records(self, employee_id):
         """Fetch records by employee ID."""
         docs = self.collection.where("employee_id", "==", employee_id).stream()
         return [doc.to_dict() for doc in docs]
 
+    @track_storage("read")
     def get_records_by_date(self, employee_id, date_str):
         """Fetch attendance records by date for a specific employee."""
         docs = self.collection.where("employee_id", "==", employee_id).where("date", "==", date_str).stream()
         return [doc.to_dict() for doc in docs]
     
+    @track_storage("read")
     def get_all_records_by_date(self, date_str):
         """Fetch all attendance records for a specific date."""
         docs = self.collection.where("date", "==", date_str).stream()
         return [doc.to_dict() for doc in docs]
+
+    def get_all_records_by_dates(self, dates):
+        """
+        Fetch all attendance records for several dates, querying them concurrently. Returns {date: records}.
+
+        Not decorated: each date's query is counted as a get_all_records_by_date read where it runs.
+        """
+        return run_async(self.async_db.get_all_records_by_dates(dates), ASYNC_QUERY_TIMEOUT_SECONDS)
     
+    @track_storage("read")
     def get_employee_attendance_history(self, employee_id, start_date=None, end_date=None):
         """
         Fetch attendance history for a specific employee with optional date range filtering.
@@ -59,6 +102,7 @@ class FirestoreDB:
                 
         return filtered_records
     
+    @track_storage("read")
     def get_records_by_date_range(self, start_date, end_date=None):
         """
         Fetch all attendance records within a date range.
@@ -0,0 +1,137 @@
+import os
+from datetime import datetime
+from config import create_async_client, ASYNC_MAX_CONCURRENCY
+from utils.async_bridge import gather_limited
+from utils.metrics import storage_operation
+
+class AsyncFirestoreDB:
+    """
+    Async counterpart of FirestoreDB built on Firestore's AsyncClient.
+
+    Methods mirror FirestoreDB but are coroutines, so independent queries can be
+    awaited together with asyncio.gather. Run them on the background loop from
+    Flask handlers with utils.async_bridge.run_async.
+    """
+
+    def __init__(self):
+        self._client = None
+        self._client_pid = None
+
+    @property
+    def collection(self):
+        # The client binds to the event loop it is first used on, so create it lazily (once per process)
+        if self._client is None or self._client_pid != os.getpid():
+            self._client = create_async_client()
+            self._client_pid = os.getpid()
+        return self._client.collection("attendance")
+
+    async def _fetch(self, query):
+        return [doc.to_dict() async for doc in query.stream()]
+
+    async def add_record(self, data):
+        """Add attendance record."""
+        await self.collection.document(data["id"]).set(data)
+        return True
+
+    async def get_records(self, employee_id):
+        """Fetch records by employee ID."""
+        return await self._fetch(self.collection.where("employee_id", "==", employee_id))
+
+    async def get_records_by_date(self, employee_id, date_str):
+        """Fetch attendance records by date for a specific employee."""
+        return await self._fetch(self.collection.where("employee_id", "==", employee_id).where("date", "==", date_str))
+
+    async def get_all_records_by_date(self, date_str):
+        """Fetch all attendance records for a specific date."""
+        # Counted like FirestoreDB.get_all_records_by_date; the caller's context (route, trace) reaches the loop
+        with storage_operation("get_all_records_by_date", "read") as call:
+            records = await self._fetch(self.collection.where("date", "==", date_str))
+            call.documents = len(records)
+        return records
+
+    async def get_all_records_by_dates(self, dates, limit=ASYNC_MAX_CONCURRENCY):
+        """
+        Fetch all attendance records for several dates concurrently.
+
+        Args:
+            dates (list): Dates in ISO format (YYYY-MM-DD)
+            limit (int): Most queries in flight at once
+
+        Returns:
+            dict: {date: records}
+        """
+        dates = list(dict.fromkeys(dates))
+        results = await gather_limited((self.get_all_records_by_date(date_str) for date_str in dates), limit)
+        return dict(zip(dates, results))
+
+    async def get_employee_attendance_history(self, employee_id, start_date=None, end_date=None):
+        """
+        Fetch attendance history for a specific employee with optional date range filtering.
+
+        Args:
+            employee_id (str): The employee ID
+            start_date (str, optional): Start date in ISO format (YYYY-MM-DD)
+            end_date (str, optional): End date in ISO format (YYYY-MM-DD)
+        """
+        records = await self.get_records(employee_id)
+        # Firestore can only use one range operator per query, so the dates are filtered here
+        return [record for record in records
+                if record.get("date")
+                and not (start_date and record["date"] < start_date)
+                and not (end_date and record["date"] > end_date)]
+
+    async def get_records_by_date_range(self, start_date, end_date=None):
+        """
+        Fetch all attendance records within a date range.
+
+        Args:
+            start_date (str): Start date in ISO format (YYYY-MM-DD)
+            end_date (str, optional): End date in ISO format (YYYY-MM-DD), defaults to today
+        """
+        if not end_date:
+            end_date = datetime.utcnow().date().isoformat()
+        return await self._fetch(self.collection.where("date", ">=", start_date).where("date", "<=", end_date))
+
+    async def get_attendance_stats_by_date(self, date_str):
+        """
+        Get attendance statistics for a specific date.
+
+        Args:
+            date_str (str): Date in ISO format (YYYY-MM-DD)
+
+        Returns:
+            dict: Dictionary containing attendance statistics
+        """
+        records = await self.get_all_records_by_date(date_str)
+        present_employee_ids = {record.get("employee_id") for record in records if record.get("employee_id")}
+        return {
+            "date": date_str,
+            "present_count": len(present_employee_ids),
+            "within_office_count": sum(1 for record in records if record.get("status") == "VALID"),
+            "outside_office_count": sum(1 for record in records if record.get("status") == "INVALID_LOCATION"),
+            "present_employee_ids": list(present_employee_ids)
+        }
+
+    async def get_employee_attendance_count(self, employee_id, start_date=None, end_date=None):
+        """
+        Get attendance count for a specific employee in a date range.
+
+        Args:
+            employee_id (str): The employee ID
+            start_date (str, optional): Start date in ISO format (YYYY-MM-DD)
+            end_date (str, optional): End date in ISO format (YYYY-MM-DD)
+
+        Returns:
+            dict: Dictionary containing attendance counts
+        """
+        records = await self.get_employee_attendance_history(employee_id, start_date, end_date)
+        total_days = len(records)
+        valid_days = sum(1 for r in records if r.get("status") == "VALID")
+        return {
+            "employee_id": employee_id,
+            "total_days": total_days,
+            "valid_days": valid_days,
+            "invalid_days": total_days - valid_days,
+            "start_date": start_date,
+            "end_date": end_date
+        }
@@ -0,0 +1,133 @@
+"""
+Re-validate stored attendance records against the current geofence configuration.
+
+Run after an office moves or its radius changes. Clock-in and clock-out
+locations in the date range are validated in one vectorized batch each, and
+records whose status or office changed are rewritten (only with --apply;
+otherwise the changes are just counted).
+
+Records written before offices existed store no office_id, and their distance
+came from a different formula, so neither counts as a change. Storing the
+current office and distance on every record is a separate step, requested
+with --backfill-distances.
+
+Usage (from attendance-service):
+    python -m server.geofence_revalidation --start-date 2024-06-01 [--end-date 2024-06-30]
+        [--backfill-distances] [--apply]
+"""
+import argparse
+import json
+import logging
+from server.app_config import get_app_config, validate_locations
+from server.firestore import FirestoreDB
+
+# (location field, status field) of each validated point in an attendance record
+LOCATION_FIELDS = (("location", "status"), ("clock_out_location", "clock_out_status"))
+# Distance changes smaller than this (km) are not worth a write when backfilling
+DISTANCE_EPSILON_KM = 1e-6
+
+
+def _coordinates(location):
+    try:
+        return float(location["latitude"]), float(location["longitude"])
+    except (KeyError, TypeError, ValueError):
+        return None
+
+
+def revalidate_records(records, config, backfill=False):
+    """
+    Geofence results that differ from what the records store.
+
+    A record changes when its status differs, or when it names an office other
+    than the one now matched. A missing office_id or a different distance is not
+    a change unless backfill is set.
+
+    Args:
+        records (list): Attendance records
+        config (dict): App configuration to validate against
+        backfill (bool): Also store the office and distance on records where they are missing or differ
+
+    Returns:
+        dict: {record id: fields to merge}
+    """
+    updates = {}
+    for location_field, status_field in LOCATION_FIELDS:
+        points = []
+        for record in records:
+            location = record.get(location_field)
+            coordinates = _coordinates(location) if isinstance(location, dict) else None
+            if coordinates is not None:
+                points.append((record, location, coordinates))
+        if not points:
+            continue
+        results = validate_locations(config, [point[2][0] for point in points], [point[2][1] for point in points])
+        for (record, location, _), status, office_id, distance in zip(points, results["status"],
+                                                                       results["office_id"], results["distance_km"]):
+            previous_office = location.get("office_id")
+            changed = record.get(status_field) != status or previous_office not in (None, office_id)
+            if not changed and backfill:
+                previous_distance = location.get("distance_km")
+                changed = (previous_office is None or not isinstance(previous_distance, (int, float))
+                           or abs(previous_distance - distance) >= DISTANCE_EPSILON_KM)
+            if not changed:
+                continue
+            fields = updates.setdefault(record["id"], {})
+            fields[status_field] = status
+            fields[location_field] = {**location, "distance_km": distance, "office_id": office_id}
+    return updates
+
+
+def revalidate(start_date, end_date=None, apply=False, db_instance=None, backfill=False):
+    """
+    Re-validate the attendance records in a date range.
+
+    Args:
+        start_date (str): First date (YYYY-MM-DD)
+        end_date (str, optional): Last date, defaults to today
+        apply (bool): Write the changed records; otherwise only count them
+        db_instance (FirestoreDB, optional): Storage to use
+        backfill (bool): Also store the current office and distance on every record
+
+    Returns:
+        dict: Records checked, records changed and the resulting status changes
+    """
+    db_instance = db_instance or FirestoreDB()
+    config = get_app_config()
+    records = [record for record in db_instance.get_records_by_date_range(start_date, end_date) if record.get("id")]
+    updates = revalidate_records(records, config, backfill)
+
+    by_id = {record["id"]: record for record in records}
+    transitions = {}
+    for record_id, fields in updates.items():
+        for _, status_field in LOCATION_FIELDS:
+            if status_field in fields and fields[status_field] != by_id[record_id].get(status_field):
+                key = f"{status_field}: {by_id[record_id].get(status_field)} -> {fields[status_field]}"
+                transitions[key] = transitions.get(key, 0) + 1
+
+    written = db_instance.update_records(updates) if apply and updates else 0
+    logging.info(f"Re-validated {len(records)} attendance records from {start_date}: "
+                 f"{len(updates)} changed, {written} written")
+    return {
+        "config_version": config.get("version", 0),
+        "records": len(records),
+        "changed": len(updates),
+        "written": written,
+        "status_changes": transitions
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--start-date", required=True, help="First date (YYYY-MM-DD)")
+    parser.add_argument("--end-date", help="Last date (YYYY-MM-DD), defaults to today")
+    parser.add_argument("--backfill-distances", action="store_true",
+                        help="Also store the current office and distance on records missing them or differing")
+    parser.add_argument("--apply", action="store_true", help="Write the changes (default is a dry run)")
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.INFO)
+    print(json.dumps(revalidate(args.start_date, args.end_date, args.apply, backfill=args.backfill_distances), indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,140 @@
+# Shared with the other service: edit common/storage/query.py and run tools/sync_common.py
+import datetime
+
+ASCENDING = "ASCENDING"
+DESCENDING = "DESCENDING"
+
+# Sort rank of each value type, following Firestore's cross-type ordering
+_TYPE_RANKS = ((type(None), 0), (bool, 1), (int, 2), (float, 2), (datetime.datetime, 3), (datetime.date, 3),
+               (str, 4), (bytes, 5), (list, 8), (tuple, 8), (dict, 9))
+
+MISSING = object()
+
+
+def type_rank(value):
+    for value_type, rank in _TYPE_RANKS:
+        if isinstance(value, value_type):
+            return rank
+    return 10
+
+
+def sort_key(value):
+    """Key that orders mixed-type values the way Firestore does"""
+    if isinstance(value, (list, tuple)):
+        return type_rank(value), tuple(sort_key(item) for item in value)
+    if isinstance(value, dict):
+        return type_rank(value), tuple(sorted((key, sort_key(item)) for key, item in value.items()))
+    return type_rank(value), value
+
+
+def get_path(data, field_path):
+    """Read a dotted field path from a document, or MISSING"""
+    value = data
+    for part in field_path.split("."):
+        if not isinstance(value, dict) or part not in value:
+            return MISSING
+        value = value[part]
+    return value
+
+
+def set_path(data, field_path, value):
+    """Write a dotted field path into a document, creating intermediate maps"""
+    parts = field_path.split(".")
+    target = data
+    for part in parts[:-1]:
+        if not isinstance(target.get(part), dict):
+            target[part] = {}
+        target = target[part]
+    target[parts[-1]] = value
+
+
+def project(data, field_paths):
+    """Keep only the given field paths, as Query.select does"""
+    projected = {}
+    for field_path in field_paths:
+        value = get_path(data, field_path)
+        if value is not MISSING:
+            set_path(projected, field_path, value)
+    return projected
+
+
+def _compare(value, op, operand):
+    if op == "==":
+        return type_rank(value) == type_rank(operand) and value == operand
+    if op == "!=":
+        return value is not None and not (type_rank(value) == type_rank(operand) and value == operand)
+    if op in ("<", "<=", ">", ">="):
+        # Range filters only match values of the same type as the operand
+        if type_rank(value) != type_rank(operand):
+            return False
+        left, right = sort_key(value), sort_key(operand)
+        return {"<": left < right, "<=": left <= right, ">": left > right, ">=": left >= right}[op]
+    if op == "in":
+        return any(_compare(value, "==", item) for item in operand)
+    if op == "not-in":
+        return value is not None and not any(_compare(value, "==", item) for item in operand)
+    if op == "array_contains":
+        return isinstance(value, list) and any(_compare(item, "==", operand) for item in value)
+    if op == "array_contains_any":
+        return isinstance(value, list) and any(_compare(item, "==", candidate) for item in value for candidate in operand)
+    raise ValueError(f"Unsupported filter operator: {op}")
+
+
+def matches(data, filters):
+    """True if the document satisfies every (field, op, value) filter"""
+    for field_path, op, operand in filters:
+        value = get_path(data, field_path)
+        if value is MISSING or not _compare(value, op, operand):
+            return False
+    return True
+
+
+def _order_fields(orders):
+    # Documents are finally ordered by ID, in the direction of the last explicit ordering
+    last_direction = orders[-1][1] if orders else ASCENDING
+    return list(orders) + [("__name__", last_direction)]
+
+
+def _key(doc_id, data, field_path):
+    return sort_key(doc_id if field_path == "__name__" else get_path(data, field_path))
+
+
+def run_query(items, filters=(), orders=(), start_after=None, limit=None):
+    """
+    Evaluate a query over (doc_id, data) pairs.
+
+    Args:
+        items (iterable): (doc_id, data) candidates
+        filters (list): (field, op, value) conditions
+        orders (list): (field, direction) orderings
+        start_after (tuple, optional): (doc_id, data) of the document to resume after
+        limit (int, optional): Maximum number of results
+
+    Returns:
+        list: Matching (doc_id, data) pairs in query order
+    """
+    orders = list(orders)
+    # Ordering by a field excludes documents that do not have it
+    required = [field_path for field_path, _ in orders]
+    results = [(doc_id, data) for doc_id, data in items
+               if matches(data, filters) and all(get_path(data, field) is not MISSING for field in required)]
+    order_fields = _order_fields(orders)
+    for field_path, direction in reversed(order_fields):
+        results.sort(key=lambda item: _key(item[0], item[1], field_path), reverse=(direction == DESCENDING))
+
+    if start_after is not None:
+        cursor_id, cursor_data = start_after
+        cursor = [(_key(cursor_id, cursor_data, field), direction) for field, direction in order_fields]
+
+        def after_cursor(item):
+            for (cursor_key, direction), field in zip(cursor, (field for field, _ in order_fields)):
+                key = _key(item[0], item[1], field)
+                if key != cursor_key:
+                    return key > cursor_key if direction == ASCENDING else key < cursor_key
+            return False
+
+        results = [item for item in results if after_cursor(item)]
+
+    if limit is not None:
+        results = results[:limit]
+    return results
@@ -0,0 +1,190 @@
+# Shared with the other service: edit common/storage/sqlite.py and run tools/sync_common.py
+import datetime
+import json
+import os
+import sqlite3
+import threading
+from contextlib import contextmanager
+from storage.client import apply_write
+from storage.query import DESCENDING
+
+# Filters whose operand is one of these types are pushed down into SQL
+_SQL_SCALARS = (str, int, float)
+_SQL_OPERATORS = ("==", "<", "<=", ">", ">=")
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS documents (
+    collection TEXT NOT NULL,
+    id TEXT NOT NULL,
+    data TEXT NOT NULL,
+    PRIMARY KEY (collection, id)
+) WITHOUT ROWID
+"""
+
+
+def _encode_default(value):
+    if isinstance(value, datetime.datetime):
+        return {"$datetime": value.isoformat()}
+    if isinstance(value, datetime.date):
+        return {"$date": value.isoformat()}
+    raise TypeError(f"Object of type {type(value).__name__} cannot be stored")
+
+
+def _decode_object(value):
+    if len(value) == 1:
+        if "$datetime" in value:
+            return datetime.datetime.fromisoformat(value["$datetime"])
+        if "$date" in value:
+            return datetime.date.fromisoformat(value["$date"])
+    return value
+
+
+def encode(data):
+    return json.dumps(data, default=_encode_default, separators=(",", ":"))
+
+
+def decode(text):
+    return json.loads(text, object_hook=_decode_object)
+
+
+def _json_path(field_path):
+    return "$" + "".join('."' + part.replace('"', '""') + '"' for part in field_path.split("."))
+
+
+def _is_scalar(value):
+    return isinstance(value, _SQL_SCALARS) and not isinstance(value, bool)
+
+
+def _json_types(values):
+    """
+    json_type() names a pushed-down filter may match. Without them SQLite compares text
+    with numbers (and JSON true with 1), and rows Firestore never matches take up the LIMIT.
+    """
+    types = set()
+    for value in values:
+        types.update(("text",) if isinstance(value, str) else ("integer", "real"))
+    return sorted(types)
+
+
+class SQLiteStore:
+    """
+    Documents stored as JSON rows in a SQLite file.
+
+    The file can be shared by several processes (gunicorn workers, or both
+    services in a local load test). Simple filters and orderings are pushed
+    down into SQL with json_extract; the caller re-applies the exact
+    Firestore semantics to the rows that come back.
+
+    Args:
+        path (str): Database file, created if it does not exist
+    """
+
+    name = "sqlite"
+    shares_data = False  # Every read decodes fresh dicts
+
+    def __init__(self, path):
+        self.path = path
+        self._local = threading.local()
+
+    def _connection(self):
+        # One connection per thread, reopened after a fork
+        connection = getattr(self._local, "connection", None)
+        if connection is None or self._local.pid != os.getpid():
+            connection = sqlite3.connect(self.path, timeout=30, isolation_level=None, check_same_thread=False)
+            connection.execute("PRAGMA journal_mode=WAL")
+            connection.execute("PRAGMA synchronous=NORMAL")
+            connection.execute(SCHEMA)
+            self._local.connection, self._local.pid, self._local.depth = connection, os.getpid(), 0
+        return connection
+
+    def get(self, collection, doc_id):
+        row = self._connection().execute(
+            "SELECT data FROM documents WHERE collection = ? AND id = ?", (collection, doc_id)).fetchone()
+        return decode(row[0]) if row else None
+
+    def query(self, collection, filters, orders, limit):
+        """Candidate (doc_id, data) pairs, narrowed in SQL where the filters allow it"""
+        clauses, params = ["collection = ?"], [collection]
+        pushed_all = True
+        for field_path, op, operand in filters:
+            path = _json_path(field_path)
+            if op in _SQL_OPERATORS and _is_scalar(operand):
+                types = _json_types([operand])
+                clauses.append(f"json_extract(data, ?) {'=' if op == '==' else op} ? "
+                               f"AND json_type(data, ?) IN ({', '.join('?' * len(types))})")
+                params += [path, operand, path, *types]
+            elif op == "in" and operand and all(_is_scalar(item) for item in operand):
+                types = _json_types(operand)
+                clauses.append(f"json_extract(data, ?) IN ({', '.join('?' * len(operand))}) "
+                               f"AND json_type(data, ?) IN ({', '.join('?' * len(types))})")
+                params += [path, *operand, path, *types]
+            elif op == "array_contains" and _is_scalar(operand):
+                types = _json_types([operand])
+                clauses.append("EXISTS (SELECT 1 FROM json_each(data, ?) WHERE json_each.value = ? "
+                               f"AND json_each.type IN ({', '.join('?' * len(types))}))")
+                params += [path, operand, *types]
+            else:
+                pushed_all = False
+
+        sql = f"SELECT id, data FROM documents WHERE {' AND '.join(clauses)}"
+        if limit is not None and pushed_all:
+            # Only safe to cut the result short when SQL evaluated every filter
+            order_terms = []
+            for field_path, direction in orders:
+                sql += " AND json_type(data, ?) IS NOT NULL"
+                params.append(_json_path(field_path))
+                order_terms.append(f"json_extract(data, ?) {'DESC' if direction == DESCENDING else 'ASC'}")
+            last_direction = "DESC" if orders and orders[-1][1] == DESCENDING else "ASC"
+            order_terms.append(f"id {last_direction}")
+            sql += " ORDER BY " + ", ".join(order_terms) + " LIMIT ?"
+            params += [_json_path(field_path) for field_path, _ in orders] + [limit]
+        rows = self._connection().execute(sql, params).fetchall()
+        return [(doc_id, decode(data)) for doc_id, data in rows]
+
+    @contextmanager
+    def atomic(self):
+        """Hold the database write lock for the duration of the block"""
+        connection = self._connection()
+        if self._local.depth:
+            self._local.depth += 1
+            try:
+                yield
+            finally:
+                self._local.depth -= 1
+            return
+        connection.execute("BEGIN IMMEDIATE")
+        self._local.depth = 1
+        try:
+            yield
+        except BaseException:
+            connection.execute("ROLLBACK")
+            raise
+        else:
+            connection.execute("COMMIT")
+        finally:
+            self._local.depth = 0
+
+    def commit(self, writes):
+        """Apply (kind, collection, doc_id, data, merge) writes all or nothing"""
+        if not writes:
+            return
+        connection = self._connection()
+        with self.atomic():
+            staged = {}
+            for write in writes:
+                _, collection, doc_id, _, _ = write
+                key = (collection, doc_id)
+                current = staged[key] if key in staged else self.get(collection, doc_id)
+                staged[key] = apply_write(current, write)
+            for (collection, doc_id), data in staged.items():
+                if data is None:
+                    connection.execute("DELETE FROM documents WHERE collection = ? AND id = ?", (collection, doc_id))
+                else:
+                    connection.execute("INSERT OR REPLACE INTO documents (collection, id, data) VALUES (?, ?, ?)",
+                                       (collection, doc_id, encode(data)))
+
+    def close(self):
+        connection = getattr(self._local, "connection", None)
+        if connection is not None and self._local.pid == os.getpid():
+            connection.close()
+            self._local.connection = None
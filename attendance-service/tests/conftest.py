@@ -0,0 +1,19 @@
+import os
+import sys
+import pytest
+
+SERVICE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# The suite runs on the in-process storage backend, which has no snapshot listeners
+os.environ["STORAGE_BACKEND"] = "memory"
+os.environ["EMPLOYEE_REPLICA_MODE"] = "poll"
+os.environ["APP_CONFIG_CACHE_MODE"] = "ttl"
+os.environ["METRICS_DIR"] = ""
+sys.path.insert(0, SERVICE_DIR)
+
+from app import app  # noqa: E402
+
+
+@pytest.fixture
+def client():
+    return app.test_client()
@@ -0,0 +1,155 @@
+import time
+import pytest
+import server.app_config as app_config
+from config import db
+from server.app_config import AppConfigCache, DEFAULT_OFFICE_ID, app_config_cache, config_version
+
+OFFICES = [
+    {"id": DEFAULT_OFFICE_ID, "latitude": 12.95, "longitude": 80.19, "allowed_radius_km": 0.1},
+    {"id": "annex", "latitude": 13.05, "longitude": 80.25, "allowed_radius_km": 0.2}
+]
+
+
+@pytest.fixture
+def offices(client):
+    response = client.put("/api/config", json={"offices": OFFICES})
+    assert response.status_code == 200, response.get_json()
+    yield
+    client.put("/api/config", json={"offices": []})
+
+
+def _office(config, office_id):
+    return next(office for office in config["offices"] if office["id"] == office_id)
+
+
+def test_single_office_fields_apply_to_the_default_office(client, offices):
+    response = client.put("/api/config", json={"office_location": {"latitude": 12.9, "longitude": 80.1},
+                                               "allowed_radius_km": 0.5})
+    assert response.status_code == 200, response.get_json()
+    config = client.get("/api/config").get_json()["data"]
+    assert _office(config, DEFAULT_OFFICE_ID) == {"id": DEFAULT_OFFICE_ID, "name": DEFAULT_OFFICE_ID,
+                                                  "latitude": 12.9, "longitude": 80.1, "allowed_radius_km": 0.5}
+    assert _office(config, "annex")["allowed_radius_km"] == 0.2
+
+
+def test_offices_and_single_office_fields_together_are_rejected(client, offices):
+    before = client.get("/api/config").get_json()["data"]
+    response = client.put("/api/config", json={"offices": OFFICES, "allowed_radius_km": 0.5})
+    assert response.status_code == 400
+    assert client.get("/api/config").get_json()["data"]["version"] == before["version"]
+
+
+def test_single_office_fields_without_a_default_office_are_rejected(client, offices):
+    client.put("/api/config", json={"offices": OFFICES[1:]})
+    response = client.put("/api/config", json={"allowed_radius_km": 0.5})
+    assert response.status_code == 400
+    assert "offices" in response.get_json()["message"]
+
+
+def test_every_write_increments_the_version(client):
+    versions = []
+    for radius in (0.2, 0.3, 0.4):
+        response = client.put("/api/config", json={"allowed_radius_km": radius})
+        versions.append(response.get_json()["data"]["version"])
+    assert versions == list(range(versions[0], versions[0] + 3))
+    assert config_version(app_config_cache.get()) == versions[-1]
+
+
+def test_cache_never_goes_back_to_an_older_version():
+    cache = AppConfigCache(db, mode="ttl", ttl_seconds=60)
+    current = cache.get()
+    newer = {**current, "version": config_version(current) + 5}
+    cache._apply(newer)
+
+    # A late snapshot or a slow re-read carrying the older document is ignored
+    cache._on_snapshot([_Snapshot(current)], [], None)
+    assert cache.get() is newer
+    cache._loaded_at = None
+    assert config_version(cache.get()) == config_version(newer)
+
+
+class _Snapshot:
+    exists = True
+
+    def __init__(self, data):
+        self._data = data
+
+    def to_dict(self):
+        return self._data
+
+
+class _FlakyClient:
+    """Storage client whose reads fail while down is set"""
+
+    def __init__(self, client):
+        self.client = client
+        self.down = True
+        self.attempts = 0
+
+    def collection(self, path):
+        self.attempts += 1
+        if self.down:
+            raise ConnectionError("storage unavailable")
+        return self.client.collection(path)
+
+    def transaction(self):
+        return self.client.transaction()
+
+
+def test_failed_first_read_serves_the_default_and_retries_shortly(monkeypatch):
+    monkeypatch.setattr(app_config, "FAILED_READ_RETRY_SECONDS", 0.05)
+    client = _FlakyClient(db)
+    cache = AppConfigCache(client, mode="ttl", ttl_seconds=60)
+
+    fallback = cache.get()
+    assert fallback["version"] == 0 and fallback["enforce_geofence"] is True
+    for _ in range(10):
+        assert cache.get() is fallback
+    assert client.attempts == 1
+
+    time.sleep(0.06)
+    assert cache.get() is fallback
+    assert client.attempts == 2
+
+    client.down = False
+    time.sleep(0.06)
+    stored = cache.get()
+    assert stored is not fallback and config_version(stored) >= 1
+
+    # A failure once a stored configuration is cached keeps it for a whole TTL
+    client.down = True
+    cache._loaded_at = None
+    assert cache.get() is stored
+    assert cache._is_fresh()
+
+
+class _ListeningClient:
+    """Storage client that only accepts listeners, and records them"""
+
+    def __init__(self):
+        self.listeners = []
+
+    def collection(self, path):
+        return self
+
+    def document(self, doc_id):
+        return self
+
+    def on_snapshot(self, callback):
+        self.listeners.append(callback)
+        return object()
+
+
+def test_listen_mode_uses_the_ttl_on_a_backend_without_listeners():
+    cache = AppConfigCache(db, mode="listen", ttl_seconds=5)
+    cache.start()
+    assert cache.active_mode == "ttl"
+    assert cache.get()["version"] >= 1
+
+
+def test_listen_mode_subscribes_when_the_backend_has_listeners():
+    client = _ListeningClient()
+    cache = AppConfigCache(client, mode="listen", ttl_seconds=5)
+    cache.start()
+    assert cache.active_mode == "listen"
+    assert cache._on_snapshot in client.listeners
@@ -0,0 +1,104 @@
+from types import SimpleNamespace
+import pytest
+import server.employee_replica as replica_module
+import utils.employee_client as employee_client
+from constants.firestore_collections import EMPLOYEE_COLLECTION
+from server.employee_replica import EmployeeReplica
+from storage import create_local_client
+
+
+@pytest.fixture
+def store():
+    client = create_local_client("memory")
+    employees = client.collection(EMPLOYEE_COLLECTION)
+    employees.document("EMP001").set({"id": "EMP001", "name": "Asha", "designation": "QA", "ctc": 1,
+                                      "created_at": "2024-01-01T00:00:00"})
+    employees.document("EMP002").set({"id": "EMP002", "name": "Bala", "designation": "Dev", "ctc": 2,
+                                      "created_at": "2024-01-02T00:00:00"})
+    return client
+
+
+def _names(replica, fields=("name",)):
+    return {record["id"]: record.get("name") for record in replica.employees(list(fields))}
+
+
+def test_poll_mode_loads_projected_records_and_applies_deltas(store):
+    replica = EmployeeReplica(store, ["name", "designation"], mode="poll", poll_seconds=3600)
+    replica.start()
+    assert replica._ready.wait(5)
+    assert _names(replica) == {"EMP001": "Asha", "EMP002": "Bala"}
+    # Only the configured fields are kept
+    assert all("ctc" not in record for record in replica.employees(["name"]))
+
+    store.collection(EMPLOYEE_COLLECTION).document("EMP001").update({"name": "Asha R", "updated_at": "2999-01-01T00:00:00"})
+    replica._refresh()
+    assert _names(replica)["EMP001"] == "Asha R"
+
+
+def test_listen_mode_applies_snapshot_changes(store):
+    watches = []
+
+    class ListeningClient:
+        supports_listeners = True
+
+        def collection(self, name):
+            return SimpleNamespace(on_snapshot=lambda callback: watches.append(callback) or SimpleNamespace())
+
+    replica = EmployeeReplica(ListeningClient(), ["name"], mode="listen")
+    replica.start()
+    assert replica.active_mode == "listen" and not replica.is_ready()
+
+    def change(kind, doc_id, data=None):
+        document = SimpleNamespace(id=doc_id, to_dict=lambda: data)
+        return SimpleNamespace(type=SimpleNamespace(name=kind), document=document)
+
+    callback = watches[0]
+    callback(None, [change("ADDED", "EMP001", {"name": "Asha"}), change("ADDED", "EMP002", {"name": "Bala"})], None)
+    callback(None, [change("MODIFIED", "EMP001", {"name": "Asha R"}), change("REMOVED", "EMP002")], None)
+    assert _names(replica) == {"EMP001": "Asha R"}
+
+
+def test_backends_without_listeners_are_polled(store):
+    replica = EmployeeReplica(store, ["name"], mode="listen", poll_seconds=3600)
+    replica.start()
+    assert replica.active_mode == "poll"
+    assert replica._ready.wait(5)
+
+
+def test_roster_falls_back_to_http_when_the_replica_cannot_answer(store, monkeypatch):
+    replica = EmployeeReplica(store, ["name"], mode="off")
+    monkeypatch.setattr(replica_module, "employee_replica", replica)
+    monkeypatch.setattr(replica_module, "fetch_all_employees", lambda fields=None: [{"id": "from-http"}])
+
+    # Cold, then warm but missing a requested field, then warm and covering it
+    assert replica_module.get_employee_roster(["name"]) == [{"id": "from-http"}]
+    replica._rebuild()
+    assert replica_module.get_employee_roster(["name", "ctc"]) == [{"id": "from-http"}]
+    assert replica_module.get_employee_roster(None) == [{"id": "from-http"}]
+    assert {emp["id"] for emp in replica_module.get_employee_roster(["name"])} == {"EMP001", "EMP002"}
+
+
+def test_client_revalidates_its_last_roster_with_if_none_match(monkeypatch):
+    monkeypatch.setattr(employee_client, "_roster_cache", {})
+    sent = []
+
+    def fake_get(url, params=None, headers=None):
+        sent.append(headers)
+        if headers and headers.get("If-None-Match") == '"v1"':
+            return SimpleNamespace(status_code=304, headers={}, json=lambda: None)
+        body = {"status": 200, "data": [{"id": "EMP001", "name": "Asha"}]}
+        return SimpleNamespace(status_code=200, headers={"ETag": '"v1"'}, json=lambda: body)
+    monkeypatch.setattr(employee_client.requests, "get", fake_get)
+
+    first = employee_client.fetch_all_employees(["id", "name"])
+    second = employee_client.fetch_all_employees(["id", "name"])
+    assert second is first
+    assert sent == [None, {"If-None-Match": '"v1"'}]
+
+
+def test_client_raises_on_employee_service_errors(monkeypatch):
+    monkeypatch.setattr(employee_client, "_roster_cache", {})
+    monkeypatch.setattr(employee_client.requests, "get",
+                        lambda url, params=None, headers=None: SimpleNamespace(status_code=503, headers={}))
+    with pytest.raises(employee_client.EmployeeServiceError):
+        employee_client.fetch_all_employees()
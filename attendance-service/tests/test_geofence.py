@@ -0,0 +1,60 @@
+import math
+import random
+import pytest
+from geopy.distance import geodesic
+from utils.geofence import (HAVERSINE_TOLERANCE, INVALID_LOCATION, VALID, GeofenceIndex, Office,
+                            validate_batch)
+
+OFFICES = [
+    Office("chennai", "Chennai", 12.956203, 80.195962, 0.1),
+    Office("guindy", "Guindy", 13.0067, 80.2206, 0.5),
+    # Overlaps guindy, so points between them pick the closer office
+    Office("guindy-annex", "Guindy annex", 13.0100, 80.2240, 0.4),
+    Office("oslo", "Oslo", 59.9139, 10.7522, 2.0),
+    Office("quito", "Quito", -0.1807, -78.4678, 1.0),
+]
+
+
+def _point(office, distance_km, bearing):
+    point = geodesic(kilometers=distance_km).destination((office.latitude, office.longitude), bearing)
+    return point.latitude, point.longitude
+
+
+def _agree(latitudes, longitudes):
+    index = GeofenceIndex(OFFICES)
+    batch = validate_batch(OFFICES, latitudes, longitudes)
+    for position, (latitude, longitude) in enumerate(zip(latitudes, longitudes)):
+        match = index.locate(latitude, longitude)
+        assert batch["status"][position] == match.status, (latitude, longitude)
+        assert OFFICES[batch["office_index"][position]] == match.office, (latitude, longitude)
+        assert math.isclose(batch["distance_km"][position], match.distance_km, rel_tol=1e-9, abs_tol=1e-12)
+    return batch
+
+
+def test_batch_agrees_with_locate_on_scattered_points():
+    rng = random.Random(7)
+    points = [_point(rng.choice(OFFICES), rng.uniform(0, 5), rng.uniform(0, 360)) for _ in range(2000)]
+    points += [(rng.uniform(-80, 80), rng.uniform(-179, 179)) for _ in range(200)]
+    batch = _agree([point[0] for point in points], [point[1] for point in points])
+    assert VALID in batch["status"] and INVALID_LOCATION in batch["status"]
+
+
+@pytest.mark.parametrize("office", OFFICES, ids=[office.id for office in OFFICES])
+def test_points_near_the_radius_are_settled_by_geodesic(office):
+    rng = random.Random(office.id)
+    # Inside the band where haversine alone could be wrong, on both sides of the fence
+    fractions = [1 + rng.uniform(-HAVERSINE_TOLERANCE, HAVERSINE_TOLERANCE) for _ in range(200)]
+    fractions += [1 - 1e-6, 1 + 1e-6]
+    points = [_point(office, office.radius_km * fraction, rng.uniform(0, 360)) for fraction in fractions]
+    batch = _agree([point[0] for point in points], [point[1] for point in points])
+
+    single = validate_batch([office], [point[0] for point in points], [point[1] for point in points])
+    for point, status in zip(points, single["status"]):
+        inside = geodesic((office.latitude, office.longitude), point).km <= office.radius_km
+        assert status == (VALID if inside else INVALID_LOCATION)
+    assert len(set(batch["status"])) == 2
+
+
+def test_no_offices_rejects_every_point():
+    match = GeofenceIndex([]).locate(12.95, 80.19)
+    assert match.status == INVALID_LOCATION and match.office is None and match.distance_km is None
@@ -0,0 +1,45 @@
+from geopy.distance import geodesic
+from server.geofence_revalidation import revalidate_records
+from utils.geofence import INVALID_LOCATION, VALID
+
+CONFIG = {"offices": [
+    {"id": "hq", "name": "HQ", "latitude": 12.956203, "longitude": 80.195962, "allowed_radius_km": 0.5},
+    {"id": "annex", "name": "Annex", "latitude": 13.0067, "longitude": 80.2206, "allowed_radius_km": 0.5},
+]}
+HQ = (12.956203, 80.195962)
+
+
+def _record(record_id, distance_km, status=VALID, office_id=None):
+    point = geodesic(kilometers=distance_km).destination(HQ, 45)
+    location = {"latitude": point.latitude, "longitude": point.longitude,
+                # Records written before offices stored a geodesic distance and no office
+                "distance_km": geodesic(HQ, (point.latitude, point.longitude)).km}
+    if office_id is not None:
+        location["office_id"] = office_id
+    return {"id": record_id, "status": status, "location": location}
+
+
+def test_only_status_and_office_changes_count():
+    records = [
+        _record("legacy", 0.3),
+        _record("same-office", 0.3, office_id="hq"),
+        _record("moved-out", 2.0, status=VALID),
+        _record("other-office", 0.3, office_id="annex"),
+    ]
+    updates = revalidate_records(records, CONFIG)
+    assert set(updates) == {"moved-out", "other-office"}
+    assert updates["moved-out"]["status"] == INVALID_LOCATION
+    assert updates["other-office"]["location"]["office_id"] == "hq"
+
+
+def test_backfill_stores_office_and_distance_on_unchanged_records():
+    records = [_record("legacy", 0.3), _record("moved-out", 2.0)]
+    updates = revalidate_records(records, CONFIG, backfill=True)
+    assert set(updates) == {"legacy", "moved-out"}
+    legacy = updates["legacy"]
+    assert legacy["status"] == VALID and legacy["location"]["office_id"] == "hq"
+    assert abs(legacy["location"]["distance_km"] - records[0]["location"]["distance_km"]) < 0.01
+
+    # Once backfilled, a second pass finds nothing to write
+    backfilled = [{**records[0], **legacy}]
+    assert revalidate_records(backfilled, CONFIG, backfill=True) == {}
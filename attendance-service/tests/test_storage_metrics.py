@@ -0,0 +1,22 @@
+from flask import g
+import utils.query_trace as query_trace
+from app import app
+from server.firestore import FirestoreDB
+from utils.query_trace import QueryTrace
+
+
+def test_concurrent_date_queries_are_each_counted_in_the_request(monkeypatch):
+    db = FirestoreDB()
+    for number, date_str in enumerate(["2031-01-01", "2031-01-01", "2031-01-02"]):
+        db.add_record({"id": f"metrics-{number}", "employee_id": f"EMP{number}", "date": date_str})
+    monkeypatch.setitem(query_trace._settings, "enabled", True)
+
+    with app.test_request_context("/api/attendance/range"):
+        g.query_trace = QueryTrace("GET /api/attendance/range")
+        records_by_date = db.get_all_records_by_dates(["2031-01-01", "2031-01-02", "2031-01-03"])
+        operations = g.query_trace.operations
+
+    assert {date_str: len(records) for date_str, records in records_by_date.items()} == {
+        "2031-01-01": 2, "2031-01-02": 1, "2031-01-03": 0}
+    assert [operation[0] for operation in operations] == ["get_all_records_by_date"] * 3
+    assert sorted(operation[4] for operation in operations) == [0, 1, 2]
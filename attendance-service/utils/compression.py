@@ -0,0 +1,52 @@
+# Shared with the other service: edit common/utils/compression.py and run tools/sync_common.py
+import gzip
+import zlib
+from flask import request
+
+# Encodings we can produce, in order of preference when the client accepts several equally
+SUPPORTED_ENCODINGS = ("gzip", "deflate")
+COMPRESSIBLE_MIMETYPES = ("application/json", "application/x-ndjson", "text/plain", "text/csv")
+
+
+def compress_body(body, encoding, level=6):
+    """Compress a response body with gzip or deflate (zlib stream, as HTTP deflate expects)"""
+    if encoding == "gzip":
+        return gzip.compress(body, compresslevel=level, mtime=0)
+    return zlib.compress(body, level)
+
+
+def response_compressor(min_bytes=1024, level=6):
+    """
+    Build an after_request hook that gzip/deflate-compresses responses above min_bytes.
+
+    The encoding is negotiated from Accept-Encoding. Streamed responses, error
+    responses and bodies that are already encoded are left alone. A compressed
+    response's ETag is made weak, since its bytes differ from the identity encoding.
+
+    Args:
+        min_bytes (int): Smallest body worth compressing
+        level (int): zlib compression level, 1 (fastest) to 9 (smallest)
+    """
+    def compress_response(response):
+        response.vary.add("Accept-Encoding")
+        if (response.direct_passthrough or response.is_streamed
+                or not 200 <= response.status_code < 300 or response.status_code == 204
+                or "Content-Encoding" in response.headers
+                or response.mimetype not in COMPRESSIBLE_MIMETYPES):
+            return response
+
+        encoding = request.accept_encodings.best_match(SUPPORTED_ENCODINGS)
+        if not encoding:
+            return response
+        body = response.get_data()
+        if len(body) < min_bytes:
+            return response
+
+        response.set_data(compress_body(body, encoding, level))
+        response.headers["Content-Encoding"] = encoding
+        etag, weak = response.get_etag()
+        if etag and not weak:
+            response.set_etag(etag, weak=True)
+        return response
+
+    return compress_response
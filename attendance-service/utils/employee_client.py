@@ -0,0 +1,54 @@
+import os
+import threading
+import requests
+
+EMPLOYEE_API_URL = os.environ.get('EMPLOYEE_SERVICE_URL', 'http://localhost:5002')
+
+# Roster fields the attendance reports need when employee details are not requested
+ROSTER_FIELDS = ["id", "name", "designation"]
+
+# Last roster per field projection, revalidated with If-None-Match: fields -> (etag, employees)
+_roster_cache = {}
+_roster_cache_lock = threading.Lock()
+
+
+class EmployeeServiceError(Exception):
+    """Raised when the employee service cannot return the employee list"""
+
+
+def fetch_all_employees(fields=None):
+    """
+    Fetch the employee roster from the employee service.
+
+    Args:
+        fields (list, optional): Only return these fields per employee; all fields when omitted
+
+    Returns:
+        list: Employee records (shared with the revalidation cache, do not mutate them)
+
+    Raises:
+        EmployeeServiceError: If the employee service responds with an error
+    """
+    params = {"fields": ",".join(fields)} if fields else None
+    cache_key = tuple(fields or ())
+    with _roster_cache_lock:
+        cached = _roster_cache.get(cache_key)
+
+    # Revalidate the copy we already have; a 304 skips sending and decoding the roster again
+    headers = {"If-None-Match": cached[0]} if cached else None
+    response = requests.get(f"{EMPLOYEE_API_URL}/api/employee/all", params=params, headers=headers)
+    if response.status_code == 304 and cached:
+        return cached[1]
+    if response.status_code != 200:
+        raise EmployeeServiceError(f"Failed to fetch employees: {response.status_code}")
+
+    employees_data = response.json()
+    if employees_data.get("status") != 200:
+        raise EmployeeServiceError(f"Employee API error: {employees_data.get('message')}")
+
+    employees = employees_data.get("data") or []
+    etag = response.headers.get("ETag")
+    if etag:
+        with _roster_cache_lock:
+            _roster_cache[cache_key] = (etag, employees)
+    return employees
@@ -0,0 +1,221 @@
+import math
+from collections import defaultdict, namedtuple
+import numpy as np
+from geopy.distance import geodesic
+
+# Mean Earth radius (IUGG), used by the spherical haversine distance
+EARTH_RADIUS_KM = 6371.0088
+# Shortest length of a degree of latitude on WGS-84 (at the equator); bounding boxes built with it never cut a fence short
+MIN_KM_PER_DEGREE = 110.574
+# Haversine differs from the WGS-84 geodesic by under 0.6%; only points within this fraction of a radius use geodesic
+HAVERSINE_TOLERANCE = 0.006
+# Grid cell size bounds in degrees
+MIN_CELL_DEGREES = 0.01
+MAX_CELL_DEGREES = 1.0
+# Rings of cells searched for the nearest office to a rejected point before falling back to every office
+NEAREST_SEARCH_RINGS = 2
+# Most point-office distances held in memory at once by validate_batch
+BATCH_CHUNK_CELLS = 1 << 20
+
+VALID = "VALID"
+INVALID_LOCATION = "INVALID_LOCATION"
+
+Office = namedtuple("Office", ["id", "name", "latitude", "longitude", "radius_km"])
+# office is the fence that matched, or the nearest office when none did
+GeofenceMatch = namedtuple("GeofenceMatch", ["status", "office", "distance_km"])
+
+
+def haversine_km(lat1, lon1, lat2, lon2):
+    """Great-circle distance in km on a spherical Earth"""
+    phi1, phi2 = math.radians(lat1), math.radians(lat2)
+    dphi = phi2 - phi1
+    dlambda = math.radians(lon2 - lon1)
+    a = math.sin(dphi / 2) ** 2 + math.cos(phi1) * math.cos(phi2) * math.sin(dlambda / 2) ** 2
+    return 2 * EARTH_RADIUS_KM * math.asin(min(1.0, math.sqrt(a)))
+
+
+def degree_span(latitude, distance_km):
+    """Latitude and longitude half-widths, in degrees, of a box holding every point within distance_km"""
+    lat_span = distance_km / MIN_KM_PER_DEGREE
+    # Widest at the box edge nearest the pole
+    cos_lat = math.cos(math.radians(min(89.9, abs(latitude) + lat_span)))
+    return lat_span, min(180.0, lat_span / cos_lat)
+
+
+class GeofenceIndex:
+    """
+    Offices on a latitude/longitude grid, for finding the fence a point is in.
+
+    Each office is registered in every grid cell its fence overlaps, so a
+    lookup only checks the offices in the point's own cell however many
+    offices there are. Each candidate goes through a bounding-box test, then
+    haversine, and only points within HAVERSINE_TOLERANCE of the radius get
+    the exact (and much slower) geodesic distance.
+
+    Points outside every fence are measured (by haversine, which is plenty for
+    an error message) against the nearest office so the rejection can say how
+    far away they are. Offices are also gridded by centre, and the cells around
+    the point are searched ring by ring; only points with no office within
+    NEAREST_SEARCH_RINGS cells are compared with every office. Fences are not
+    expected to cross the antimeridian.
+
+    Args:
+        offices (list): Office tuples
+        cell_degrees (float, optional): Grid cell size; by default about twice the largest radius
+    """
+
+    def __init__(self, offices, cell_degrees=None):
+        self.offices = list(offices)
+        if cell_degrees is None:
+            largest = max((office.radius_km for office in self.offices), default=0)
+            cell_degrees = min(MAX_CELL_DEGREES, max(MIN_CELL_DEGREES, 2 * largest / MIN_KM_PER_DEGREE))
+        self.cell_degrees = cell_degrees
+        self._spans = {}  # office id -> (lat span, lon span) of its fence
+        self._cells = defaultdict(list)  # (row, column) -> offices whose fence overlaps the cell
+        self._centers = defaultdict(list)  # (row, column) -> offices centred in the cell
+        for office in self.offices:
+            self._centers[self._cell(office.latitude, office.longitude)].append(office)
+            lat_span, lon_span = degree_span(office.latitude, office.radius_km * (1 + HAVERSINE_TOLERANCE))
+            self._spans[office.id] = (lat_span, lon_span)
+            min_row, min_column = self._cell(office.latitude - lat_span, office.longitude - lon_span)
+            max_row, max_column = self._cell(office.latitude + lat_span, office.longitude + lon_span)
+            for row in range(min_row, max_row + 1):
+                for column in range(min_column, max_column + 1):
+                    self._cells[(row, column)].append(office)
+
+    def _cell(self, latitude, longitude):
+        return math.floor(latitude / self.cell_degrees), math.floor(longitude / self.cell_degrees)
+
+    def candidates(self, latitude, longitude):
+        """Offices whose fence may contain the point"""
+        return self._cells.get(self._cell(latitude, longitude), ())
+
+    def _check(self, office, latitude, longitude):
+        """(inside, distance in km); distance is None when the bounding box already rules the point out"""
+        lat_span, lon_span = self._spans[office.id]
+        if abs(latitude - office.latitude) > lat_span or abs(longitude - office.longitude) > lon_span:
+            return False, None
+        distance = haversine_km(office.latitude, office.longitude, latitude, longitude)
+        if distance < office.radius_km * (1 - HAVERSINE_TOLERANCE):
+            return True, distance
+        if distance > office.radius_km * (1 + HAVERSINE_TOLERANCE):
+            return False, distance
+        distance = geodesic((office.latitude, office.longitude), (latitude, longitude)).km
+        return distance <= office.radius_km, distance
+
+    def locate(self, latitude, longitude):
+        """
+        Fence containing the point, closest office first where fences overlap.
+
+        Returns:
+            GeofenceMatch: VALID with the matching office, or INVALID_LOCATION with the nearest office
+                (office and distance are None if there are no offices)
+        """
+        best = None
+        for office in self.candidates(latitude, longitude):
+            inside, distance = self._check(office, latitude, longitude)
+            if inside and (best is None or distance < best.distance_km):
+                best = GeofenceMatch(VALID, office, distance)
+        if best is not None:
+            return best
+        return self.nearest(latitude, longitude)
+
+    def nearest(self, latitude, longitude):
+        """INVALID_LOCATION match for the nearest office, with its haversine distance"""
+        if not self.offices:
+            return GeofenceMatch(INVALID_LOCATION, None, None)
+        row, column = self._cell(latitude, longitude)
+        best, best_distance = None, None
+        for ring in range(NEAREST_SEARCH_RINGS + 1):
+            for cell in _ring(row, column, ring):
+                for office in self._centers.get(cell, ()):
+                    distance = haversine_km(office.latitude, office.longitude, latitude, longitude)
+                    if best is None or distance < best_distance:
+                        best, best_distance = office, distance
+            # Offices in cells not searched yet are at least ring cells away (a cell is narrowest on its poleward side)
+            poleward = math.radians(min(89.9, abs(latitude) + (ring + 1) * self.cell_degrees))
+            reach = ring * self.cell_degrees * MIN_KM_PER_DEGREE * math.cos(poleward)
+            if best is not None and best_distance <= reach:
+                break
+        else:
+            best_distance, best = min((haversine_km(office.latitude, office.longitude, latitude, longitude), office)
+                                      for office in self.offices)
+        return GeofenceMatch(INVALID_LOCATION, best, best_distance)
+
+
+def _ring(row, column, ring):
+    """Grid cells at Chebyshev distance ring from (row, column)"""
+    if ring == 0:
+        yield row, column
+        return
+    for offset in range(-ring, ring + 1):
+        yield row - ring, column + offset
+        yield row + ring, column + offset
+    for offset in range(-ring + 1, ring):
+        yield row + offset, column - ring
+        yield row + offset, column + ring
+
+
+def haversine_matrix_km(latitudes, longitudes, office_latitudes, office_longitudes):
+    """Haversine distances in km from every point (rows) to every office (columns)"""
+    phi1 = np.radians(latitudes)[:, np.newaxis]
+    phi2 = np.radians(office_latitudes)[np.newaxis, :]
+    dlambda = np.radians(office_longitudes)[np.newaxis, :] - np.radians(longitudes)[:, np.newaxis]
+    a = np.sin((phi2 - phi1) / 2) ** 2 + np.cos(phi1) * np.cos(phi2) * np.sin(dlambda / 2) ** 2
+    return 2 * EARTH_RADIUS_KM * np.arcsin(np.minimum(1.0, np.sqrt(a)))
+
+
+def validate_batch(offices, latitudes, longitudes):
+    """
+    Geofence many points at once, with the same result as GeofenceIndex.locate for each.
+
+    Distances from every point to every office are computed in one vectorized
+    haversine pass (in chunks of BATCH_CHUNK_CELLS distances); only the
+    point-office pairs within HAVERSINE_TOLERANCE of the radius are settled
+    with geodesic.
+
+    Args:
+        offices (list): Office tuples (at least one)
+        latitudes (array-like): Point latitudes
+        longitudes (array-like): Point longitudes, same length
+
+    Returns:
+        dict: "status" (VALID / INVALID_LOCATION), "office_index" (into offices: the matching fence,
+            or the nearest office) and "distance_km", each an array with one entry per point
+    """
+    latitudes = np.asarray(latitudes, dtype=np.float64)
+    longitudes = np.asarray(longitudes, dtype=np.float64)
+    office_latitudes = np.array([office.latitude for office in offices], dtype=np.float64)
+    office_longitudes = np.array([office.longitude for office in offices], dtype=np.float64)
+    radii = np.array([office.radius_km for office in offices], dtype=np.float64)
+
+    count = len(latitudes)
+    valid = np.zeros(count, dtype=bool)
+    office_index = np.zeros(count, dtype=np.int64)
+    distance_km = np.zeros(count, dtype=np.float64)
+    chunk = max(1, BATCH_CHUNK_CELLS // max(1, len(offices)))
+    for start in range(0, count, chunk):
+        stop = min(count, start + chunk)
+        distances = haversine_matrix_km(latitudes[start:stop], longitudes[start:stop],
+                                        office_latitudes, office_longitudes)
+        inside = distances < radii * (1 - HAVERSINE_TOLERANCE)
+        fence_distances = distances.copy()
+        for row, column in zip(*np.nonzero(np.abs(distances - radii) <= radii * HAVERSINE_TOLERANCE)):
+            exact = geodesic((office_latitudes[column], office_longitudes[column]),
+                             (latitudes[start + row], longitudes[start + row])).km
+            fence_distances[row, column] = exact
+            inside[row, column] = exact <= radii[column]
+
+        in_fence = inside.any(axis=1)
+        matched = np.where(inside, fence_distances, np.inf).argmin(axis=1)
+        nearest = distances.argmin(axis=1)
+        rows = np.arange(stop - start)
+        valid[start:stop] = in_fence
+        office_index[start:stop] = np.where(in_fence, matched, nearest)
+        distance_km[start:stop] = np.where(in_fence, fence_distances[rows, matched], distances[rows, nearest])
+
+    return {
+        "status": np.where(valid, VALID, INVALID_LOCATION),
+        "office_index": office_index,
+        "distance_km": distance_km
+    }
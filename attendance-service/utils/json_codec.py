@@ -0,0 +1,70 @@
+# Shared with the other service: edit common/utils/json_codec.py and run tools/sync_common.py
+import datetime
+import json
+import uuid
+
+try:
+    import orjson
+except ImportError:  # Optional speedup; the stdlib encoder is always available
+    orjson = None
+
+try:
+    import ujson
+except ImportError:
+    ujson = None
+
+
+def _default(value):
+    """Encode the non-JSON types Flask's jsonify accepts, in the same format"""
+    if isinstance(value, (datetime.date, datetime.datetime)):
+        from werkzeug.http import http_date
+        return http_date(value)
+    if isinstance(value, uuid.UUID):
+        return str(value)
+    if hasattr(value, "__html__"):
+        return str(value.__html__())
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+
+def _stdlib_dumps(data):
+    return json.dumps(data, default=_default, separators=(",", ":"), ensure_ascii=False).encode("utf-8")
+
+
+def _orjson_dumps(data):
+    # Datetimes are passed through to _default so the output matches jsonify
+    return orjson.dumps(data, default=_default,
+                        option=orjson.OPT_PASSTHROUGH_DATETIME | orjson.OPT_NON_STR_KEYS)
+
+
+def _ujson_dumps(data):
+    # ujson has no default hook, so payloads holding datetimes go through the stdlib encoder
+    try:
+        return ujson.dumps(data, ensure_ascii=False).encode("utf-8")
+    except (TypeError, OverflowError):
+        return _stdlib_dumps(data)
+
+
+ENCODERS = {"stdlib": _stdlib_dumps}
+if orjson is not None:
+    ENCODERS["orjson"] = _orjson_dumps
+if ujson is not None:
+    ENCODERS["ujson"] = _ujson_dumps
+
+
+def get_encoder(name="auto"):
+    """
+    Return a function that serializes a value to UTF-8 JSON bytes.
+
+    Args:
+        name (str): "orjson", "ujson", "stdlib" or "auto" (fastest one installed)
+
+    Returns:
+        callable: dumps(data) -> bytes
+    """
+    name = (name or "auto").lower()
+    if name == "auto":
+        name = "orjson" if "orjson" in ENCODERS else "stdlib"
+    if name not in ENCODERS:
+        print(f"JSON encoder '{name}' is not installed, falling back to stdlib")
+        return _stdlib_dumps
+    return ENCODERS[name]
@@ -1,2 +1,18 @@
+from flask import make_response
+from config import JSON_ENCODER
+from utils.json_codec import get_encoder
+
+# Serializer for every response body (orjson when installed, see JSON_ENCODER)
+dumps = get_encoder(JSON_ENCODER)
+
+
 def response_wrapper(status, message, data):
     return {"status": status, "message": message, "data": data}, status
+
+
+def output_json(data, code, headers=None):
+    """flask-restful representation for application/json using the configured encoder"""
+    response = make_response(dumps(data), code)
+    response.headers["Content-Type"] = "application/json"
+    response.headers.extend(headers or {})
+    return response
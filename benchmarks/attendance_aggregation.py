@@ -0,0 +1,191 @@
+"""
+Time and peak memory of the attendance aggregation code at large roster sizes.
+
+Runs the real AttendanceSummaryAPI.get, AttendanceRangeAPI.get, DashboardAPI.get
+and FirestoreDB.get_attendance_stats_by_date handlers on synthetic data. The
+storage reads and the employee roster are stubbed with prebuilt in-memory lists,
+so the numbers cover the aggregation only. They exclude Firestore round trips,
+document decoding and response serialization (see response_encoding.py for
+that).
+
+Each scenario reports the median wall time of --repeat runs. Peak memory comes
+from one extra run under tracemalloc, counting only what the handler allocates.
+
+Usage:
+    python benchmarks/attendance_aggregation.py [--employees 1000,10000,100000] [--days 30,365]
+        [--repeat 3] [--json report.json]
+"""
+import argparse
+import gc
+import json
+import logging
+import os
+import random
+import statistics
+import sys
+import time
+import tracemalloc
+from datetime import date, timedelta
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+SERVICE_DIR = os.path.join(ROOT, "attendance-service")
+
+# Keep the service off Firestore and the employee service while it is imported
+os.environ.setdefault("STORAGE_BACKEND", "memory")
+os.environ.setdefault("EMPLOYEE_REPLICA_MODE", "poll")
+sys.path.insert(0, SERVICE_DIR)
+
+from app import app  # noqa: E402
+import api.attendance_summary_api as summary_api  # noqa: E402
+import api.dashboard_api as dashboard_api  # noqa: E402
+from server.firestore import FirestoreDB  # noqa: E402
+
+END_DATE = date(2024, 6, 28)
+DESIGNATIONS = ["Software Engineer", "Senior Software Engineer", "Engineering Manager", "HR Executive",
+                "Sales Associate", "Product Manager", "QA Engineer", "Data Analyst"]
+ATTENDANCE_RATE = 0.85
+INVALID_LOCATION_RATE = 0.05
+# Distinct daily record sets generated per roster size; longer ranges cycle through them to bound memory
+DISTINCT_DAYS = 3
+
+
+def make_roster(count):
+    """Roster as the replica serves it (ROSTER_FIELDS only)"""
+    rng = random.Random(42)
+    return [{"id": f"EMP{number:06d}", "name": f"Employee {number}", "designation": rng.choice(DESIGNATIONS)}
+            for number in range(1, count + 1)]
+
+
+def make_day(roster, day, seed):
+    """Attendance records shaped like the clock-in/out documents for one day"""
+    rng = random.Random(seed)
+    date_str = day.isoformat()
+    records = []
+    for employee in roster:
+        if rng.random() >= ATTENDANCE_RATE:
+            continue
+        clock_in = f"{date_str}T{rng.choice((8, 9, 9, 9, 10))}:{rng.randint(0, 59):02d}:{rng.randint(0, 59):02d}.000000"
+        clock_out = f"{date_str}T18:{rng.randint(0, 59):02d}:00.000000" if rng.random() < 0.7 else None
+        status = "INVALID_LOCATION" if rng.random() < INVALID_LOCATION_RATE else "VALID"
+        records.append({
+            "id": f"{employee['id']}-{date_str}",
+            "employee_id": employee["id"],
+            "clock_in": clock_in,
+            "clock_out": clock_out,
+            "date": date_str,
+            "location": {"latitude": 12.9562, "longitude": 80.1959, "distance_km": 0.02, "type": "clock_in"},
+            "status": status,
+            "clock_out_status": "VALID" if clock_out else None,
+            "created_date": clock_in,
+            "last_modified_date": clock_out or clock_in
+        })
+    return records
+
+
+class StubAttendanceDB(FirestoreDB):
+    """FirestoreDB whose date queries return prebuilt records instead of reading storage"""
+
+    def __init__(self, days):
+        super().__init__()
+        self.days = days
+
+    def get_all_records_by_date(self, date_str):
+        ordinal = date.fromisoformat(date_str).toordinal()
+        return list(self.days[ordinal % len(self.days)])
+
+    def get_all_records_by_dates(self, dates):
+        return {date_str: self.get_all_records_by_date(date_str) for date_str in dates}
+
+
+def install_fixtures(roster, stub_db):
+    """Point the API modules at the stubbed storage and roster"""
+    def get_employee_roster(fields=None):
+        return list(roster)
+
+    for module in (summary_api, dashboard_api):
+        module.db = stub_db
+        module.get_employee_roster = get_employee_roster
+
+
+def handler_call(resource, query_string):
+    def call():
+        with app.test_request_context("/", query_string=query_string):
+            body, status = resource().get()
+        if status != 200:
+            raise RuntimeError(f"{resource.__name__} returned {status}: {body.get('message')}")
+        return body
+    return call
+
+
+def measure(fn, repeat):
+    """Median wall time in ms over repeat runs, then peak traced allocation in MB for one more run"""
+    fn()  # Warm up code paths and caches
+    samples = []
+    for _ in range(repeat):
+        gc.collect()
+        started = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - started) * 1000)
+    gc.collect()
+    tracemalloc.start()
+    try:
+        fn()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return statistics.median(samples), peak / (1024 * 1024)
+
+
+def scenarios(day_counts):
+    """(name, callable) pairs for one roster size"""
+    yield "summary", handler_call(summary_api.AttendanceSummaryAPI, {"date": END_DATE.isoformat()})
+    yield "dashboard", handler_call(dashboard_api.DashboardAPI, {"date": END_DATE.isoformat()})
+    yield "stats_by_date", lambda: summary_api.db.get_attendance_stats_by_date(END_DATE.isoformat())
+    for days in day_counts:
+        start_date = END_DATE - timedelta(days=days - 1)
+        yield f"range_{days}d", handler_call(summary_api.AttendanceRangeAPI, {
+            "start_date": start_date.isoformat(), "end_date": END_DATE.isoformat()})
+
+
+def parse_counts(text):
+    return [int(value) for value in text.split(",") if value.strip()]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--employees", type=parse_counts, default=[1000, 10000, 100000],
+                        help="Comma separated roster sizes")
+    parser.add_argument("--days", type=parse_counts, default=[30, 365], help="Comma separated range lengths")
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--json", dest="json_path", help="Also write the results to this file")
+    args = parser.parse_args()
+
+    logging.disable(logging.WARNING)  # The handlers log at info/warning per request
+
+    results = []
+    header = f"{'employees':>10}  {'scenario':<16}{'records/day':>12}{'median ms':>12}{'peak MB':>10}"
+    print(f"median of {args.repeat} runs, peak traced memory of one run\n")
+    print(header)
+    print("-" * len(header))
+    for employee_count in args.employees:
+        roster = make_roster(employee_count)
+        days = [make_day(roster, END_DATE - timedelta(days=offset), seed=offset) for offset in range(DISTINCT_DAYS)]
+        install_fixtures(roster, StubAttendanceDB(days))
+        records_per_day = round(statistics.mean(len(day) for day in days))
+
+        for name, fn in scenarios(args.days):
+            median_ms, peak_mb = measure(fn, args.repeat)
+            results.append({"employees": employee_count, "scenario": name, "records_per_day": records_per_day,
+                            "median_ms": round(median_ms, 2), "peak_mb": round(peak_mb, 2)})
+            print(f"{employee_count:>10}  {name:<16}{records_per_day:>12}{median_ms:>12.2f}{peak_mb:>10.2f}")
+
+        del roster, days
+        gc.collect()
+
+    if args.json_path:
+        with open(args.json_path, "w") as report_file:
+            json.dump({"repeat": args.repeat, "results": results}, report_file, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,169 @@
+"""
+Compare JSON encoders and response compression on our largest payloads.
+
+Builds synthetic bodies shaped like GET /api/employee/all, the detailed
+attendance summary, a 90 day attendance range and the dashboard, then reports
+encode time per encoder and bytes on the wire for identity, gzip and deflate.
+
+Usage:
+    python benchmarks/response_encoding.py [--employees 5000] [--repeat 20] [--level 6]
+"""
+import argparse
+import gzip
+import importlib.util
+import os
+import random
+import statistics
+import time
+import zlib
+from datetime import date, timedelta
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def load_module(name, path):
+    """Import a service module by path (both services have a top-level utils package)"""
+    spec = importlib.util.spec_from_file_location(name, path)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+json_codec = load_module("json_codec", os.path.join(ROOT, "attendance-service", "utils", "json_codec.py"))
+
+DESIGNATIONS = ["Software Engineer", "Senior Software Engineer", "Engineering Manager", "HR Executive",
+                "Sales Associate", "Product Manager", "QA Engineer", "Data Analyst"]
+
+
+def make_employees(count):
+    rng = random.Random(42)
+    employees = []
+    for number in range(1, count + 1):
+        designation = rng.choice(DESIGNATIONS)
+        employees.append({
+            "id": f"EMP{number:03d}",
+            "name": f"Employee {number}",
+            "age": rng.randint(21, 60),
+            "date_of_birth": f"{rng.randint(1965, 2003)}-{rng.randint(1, 12):02d}-{rng.randint(1, 28):02d}",
+            "email": f"employee{number}@example.com",
+            "address": f"{rng.randint(1, 999)} Main Street, Chennai",
+            "blood_type": rng.choice(["A+", "B+", "O+", "AB+", "O-"]),
+            "phone_number": f"+91{rng.randint(7000000000, 9999999999)}",
+            "designation": designation,
+            "ctc": rng.randint(300000, 4000000),
+            "employee_shift_hours": "09:00-18:00",
+            "created_at": "2024-01-15T09:30:00.000000",
+            "last_login": "2024-06-01T08:55:12.123456",
+            "designation_lower": designation.lower(),
+            "department_keys": designation.lower().split()
+        })
+    return employees
+
+
+def make_detailed_summary(employees):
+    rng = random.Random(7)
+    present, absent = [], []
+    for employee in employees:
+        if rng.random() < 0.85:
+            present.append({
+                "employee_id": employee["id"],
+                "name": employee["name"],
+                "clock_in_time": "2024-06-03T09:%02d:00" % rng.randint(0, 59),
+                "clock_out_time": "2024-06-03T18:%02d:00" % rng.randint(0, 59),
+                "status": "VALID",
+                "clock_out_status": "VALID",
+                "within_office": True,
+                "employee_details": employee
+            })
+        else:
+            absent.append({"employee_id": employee["id"], "name": employee["name"], "employee_details": employee})
+    total = len(employees)
+    return {
+        "date": "2024-06-03", "total_employees": total, "present_count": len(present),
+        "absent_count": len(absent), "attendance_percentage": round(len(present) / total * 100, 2),
+        "within_office_count": len(present), "outside_office_count": 0,
+        "present_employees": present, "absent_employees": absent
+    }
+
+
+def make_range(employees, days=90):
+    start = date(2024, 3, 1)
+    total = len(employees)
+    summaries = [{
+        "date": (start + timedelta(days=offset)).isoformat(), "total_employees": total,
+        "present_count": int(total * 0.85), "absent_count": total - int(total * 0.85),
+        "attendance_percentage": 85.0, "within_office_count": int(total * 0.8),
+        "outside_office_count": int(total * 0.05)
+    } for offset in range(days)]
+    return {"start_date": summaries[0]["date"], "end_date": summaries[-1]["date"], "total_days": days,
+            "total_employees": total, "avg_attendance_percentage": 85.0, "daily_summaries": summaries}
+
+
+def make_dashboard(employees):
+    activity = [{"employee_id": e["id"], "name": e["name"], "action": "clocked in",
+                 "time": "09:12 AM", "is_late": False} for e in employees[:50]]
+    weekly = [{"date": f"2024-06-0{day}", "display_date": f"Jun {day}", "present": 40, "total": len(employees)}
+              for day in range(1, 8)]
+    return {"attendance_summary": {"date": "2024-06-03", "total_employees": len(employees)},
+            "recent_activity": activity, "weekly_overview": weekly}
+
+
+def envelope(data):
+    return {"status": 200, "message": "OK", "data": data}
+
+
+def timed(fn, repeat):
+    """Median wall time of fn in milliseconds, plus its last result"""
+    samples = []
+    result = None
+    for _ in range(repeat):
+        started = time.perf_counter()
+        result = fn()
+        samples.append((time.perf_counter() - started) * 1000)
+    return statistics.median(samples), result
+
+
+def compress_body(body, encoding, level):
+    """Same as utils.compression.compress_body, which cannot be imported without Flask"""
+    if encoding == "gzip":
+        return gzip.compress(body, compresslevel=level, mtime=0)
+    return zlib.compress(body, level)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--employees", type=int, default=5000)
+    parser.add_argument("--repeat", type=int, default=20)
+    parser.add_argument("--level", type=int, default=6, help="gzip/deflate level (COMPRESS_LEVEL)")
+    args = parser.parse_args()
+
+    employees = make_employees(args.employees)
+    payloads = {
+        "employee/all": envelope(employees),
+        "summary?detailed=true": envelope(make_detailed_summary(employees)),
+        "range (90 days)": envelope(make_range(employees)),
+        "dashboard": envelope(make_dashboard(employees)),
+    }
+    encoders = sorted(json_codec.ENCODERS)
+
+    print(f"{args.employees} employees, median of {args.repeat} runs, compression level {args.level}\n")
+    header = f"{'endpoint':<24}" + "".join(f"{name + ' ms':>14}" for name in encoders)
+    header += f"{'identity B':>14}{'gzip B':>12}{'gzip ms':>10}{'deflate B':>12}{'deflate ms':>12}"
+    print(header)
+    print("-" * len(header))
+
+    for endpoint, payload in payloads.items():
+        row = f"{endpoint:<24}"
+        body = None
+        for name in encoders:
+            encode_ms, encoded = timed(lambda: json_codec.ENCODERS[name](payload), args.repeat)
+            row += f"{encode_ms:>14.2f}"
+            body = body or encoded
+        gzip_ms, gzipped = timed(lambda: compress_body(body, "gzip", args.level), args.repeat)
+        deflate_ms, deflated = timed(lambda: compress_body(body, "deflate", args.level), args.repeat)
+        row += f"{len(body):>14}{len(gzipped):>12}{gzip_ms:>10.2f}{len(deflated):>12}{deflate_ms:>12.2f}"
+        print(row)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,129 @@
+# Shared with the other service: edit common/storage/aio.py and run tools/sync_common.py
+from functools import wraps
+from storage.client import Transaction
+
+
+class AsyncQuery:
+    """Async facade over a local Query; the work itself is synchronous and in-process"""
+
+    def __init__(self, query):
+        self._query = query
+
+    def where(self, field_path, op_string, value):
+        return AsyncQuery(self._query.where(field_path, op_string, value))
+
+    def order_by(self, field_path, direction="ASCENDING"):
+        return AsyncQuery(self._query.order_by(field_path, direction))
+
+    def limit(self, count):
+        return AsyncQuery(self._query.limit(count))
+
+    def select(self, field_paths):
+        return AsyncQuery(self._query.select(field_paths))
+
+    def start_after(self, snapshot):
+        return AsyncQuery(self._query.start_after(snapshot))
+
+    async def stream(self, transaction=None):
+        for snapshot in self._query.stream():
+            yield snapshot
+
+    async def get(self, transaction=None):
+        return self._query.get()
+
+
+class AsyncCollectionReference(AsyncQuery):
+    def document(self, document_id=None):
+        return AsyncDocumentReference(self._query.document(document_id))
+
+
+class AsyncDocumentReference:
+    def __init__(self, reference):
+        self._reference = reference
+        self.id = reference.id
+        self.path = reference.path
+
+    async def get(self, field_paths=None, transaction=None):
+        return self._reference.get(field_paths)
+
+    async def create(self, document_data):
+        self._reference.create(document_data)
+
+    async def set(self, document_data, merge=False):
+        self._reference.set(document_data, merge)
+
+    async def update(self, field_updates):
+        self._reference.update(field_updates)
+
+    async def delete(self):
+        self._reference.delete()
+
+
+class AsyncWriteBatch:
+    def __init__(self, batch):
+        self._batch = batch
+
+    def create(self, reference, document_data):
+        self._batch.create(reference._reference, document_data)
+
+    def set(self, reference, document_data, merge=False):
+        self._batch.set(reference._reference, document_data, merge)
+
+    def update(self, reference, field_updates):
+        self._batch.update(reference._reference, field_updates)
+
+    def delete(self, reference):
+        self._batch.delete(reference._reference)
+
+    async def commit(self):
+        self._batch.commit()
+
+
+class AsyncTransaction(AsyncWriteBatch):
+    """
+    Local transaction for coroutines. The store stays locked while the function
+    runs, which serializes it against other threads (not against other
+    coroutines on the same event loop).
+    """
+
+    async def run(self, fn, *args, **kwargs):
+        transaction = self._batch
+        with transaction._client.store.atomic():
+            transaction._writes = []
+            result = await fn(self, *args, **kwargs)
+            transaction.commit()
+        return result
+
+
+def async_transactional(fn):
+    """Drop-in for firestore.async_transactional that also accepts local transactions"""
+    @wraps(fn)
+    async def wrapper(transaction, *args, **kwargs):
+        if isinstance(transaction, AsyncTransaction):
+            return await transaction.run(fn, *args, **kwargs)
+        from google.cloud.firestore import async_transactional as firestore_async_transactional
+        return await firestore_async_transactional(fn)(transaction, *args, **kwargs)
+    return wrapper
+
+
+class AsyncLocalClient:
+    """AsyncClient-compatible wrapper around a LocalClient"""
+
+    def __init__(self, client):
+        self._client = client
+
+    def collection(self, collection_path):
+        return AsyncCollectionReference(self._client.collection(collection_path))
+
+    def batch(self):
+        return AsyncWriteBatch(self._client.batch())
+
+    def transaction(self, **kwargs):
+        return AsyncTransaction(Transaction(self._client))
+
+    async def get_all(self, references, field_paths=None, transaction=None):
+        for reference in references:
+            yield await reference.get(field_paths)
+
+    def close(self):
+        pass
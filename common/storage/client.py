@@ -0,0 +1,254 @@
+# Shared with the other service: edit common/storage/client.py and run tools/sync_common.py
+import copy
+import uuid
+from functools import wraps
+from storage.query import ASCENDING, DESCENDING, MISSING, get_path, project, run_query, set_path
+
+try:
+    from google.api_core.exceptions import AlreadyExists, NotFound
+except ImportError:  # Local backends work without the Google client libraries installed
+    class NotFound(Exception):
+        """Raised when updating a document that does not exist"""
+
+    class AlreadyExists(Exception):
+        """Raised when creating a document that already exists"""
+
+
+def _apply_update(data, fields):
+    """Merge update() fields (which may be dotted paths) into a document"""
+    for field_path, value in fields.items():
+        set_path(data, field_path, copy.deepcopy(value))
+    return data
+
+
+def _deep_merge(target, source):
+    for key, value in source.items():
+        if isinstance(value, dict) and isinstance(target.get(key), dict):
+            _deep_merge(target[key], value)
+        else:
+            target[key] = copy.deepcopy(value)
+    return target
+
+
+def apply_write(current, write):
+    """
+    Return the new contents of a document after a write, or None if it is deleted.
+
+    Raises:
+        NotFound: If an update targets a document that does not exist
+        AlreadyExists: If a create targets a document that exists
+    """
+    kind, _, doc_id, data, merge = write
+    if kind == "delete":
+        return None
+    if kind == "create" and current is not None:
+        raise AlreadyExists(f"Document already exists: {doc_id}")
+    if kind == "update":
+        if current is None:
+            raise NotFound(f"No document to update: {doc_id}")
+        return _apply_update(copy.deepcopy(current), data)
+    if merge and current is not None:
+        return _deep_merge(copy.deepcopy(current), data)
+    return copy.deepcopy(data)
+
+
+class DocumentSnapshot:
+    """Result of reading one document"""
+
+    def __init__(self, reference, data, shared=False):
+        self.reference = reference
+        self.id = reference.id
+        self._data = data
+        self._shared = shared  # data belongs to the store and must be copied before handing it out
+
+    @property
+    def exists(self):
+        return self._data is not None
+
+    def to_dict(self):
+        if self._data is None:
+            return None
+        return copy.deepcopy(self._data) if self._shared else dict(self._data)
+
+    def get(self, field_path):
+        value = get_path(self._data or {}, field_path)
+        return None if value is MISSING else copy.deepcopy(value)
+
+
+class Query:
+    """Immutable query over one collection; each builder method returns a new query"""
+
+    def __init__(self, client, collection, filters=(), orders=(), limit=None, fields=None, start_after=None):
+        self._client = client
+        self._collection = collection
+        self._filters = tuple(filters)
+        self._orders = tuple(orders)
+        self._limit = limit
+        self._fields = fields
+        self._start_after = start_after
+
+    def _copy(self, **changes):
+        state = {"filters": self._filters, "orders": self._orders, "limit": self._limit,
+                 "fields": self._fields, "start_after": self._start_after}
+        state.update(changes)
+        return Query(self._client, self._collection, **state)
+
+    def where(self, field_path, op_string, value):
+        return self._copy(filters=self._filters + ((field_path, op_string, value),))
+
+    def order_by(self, field_path, direction=ASCENDING):
+        direction = DESCENDING if str(direction).upper() == DESCENDING else ASCENDING
+        return self._copy(orders=self._orders + ((field_path, direction),))
+
+    def limit(self, count):
+        return self._copy(limit=count)
+
+    def select(self, field_paths):
+        return self._copy(fields=list(field_paths))
+
+    def start_after(self, snapshot):
+        return self._copy(start_after=(snapshot.id, snapshot._data or {}))
+
+    def stream(self, transaction=None):
+        store = self._client.store
+        candidates = store.query(self._collection, self._filters, self._orders,
+                                 None if self._start_after else self._limit)
+        results = run_query(candidates, self._filters, self._orders, self._start_after, self._limit)
+        for doc_id, data in results:
+            reference = DocumentReference(self._client, self._collection, doc_id)
+            if self._fields is not None:
+                data = project(data, self._fields)
+            yield DocumentSnapshot(reference, data, store.shares_data)
+
+    def get(self, transaction=None):
+        return list(self.stream(transaction))
+
+
+class CollectionReference(Query):
+    def __init__(self, client, collection):
+        super().__init__(client, collection)
+        self.id = collection
+
+    def document(self, document_id=None):
+        return DocumentReference(self._client, self._collection, document_id or uuid.uuid4().hex[:20])
+
+    def add(self, document_data):
+        reference = self.document()
+        reference.set(document_data)
+        return None, reference
+
+
+class DocumentReference:
+    def __init__(self, client, collection, doc_id):
+        self._client = client
+        self._collection = collection
+        self.id = doc_id
+        self.path = f"{collection}/{doc_id}"
+
+    def get(self, field_paths=None, transaction=None):
+        store = self._client.store
+        data = store.get(self._collection, self.id)
+        if data is not None and field_paths is not None:
+            data = project(data, field_paths)
+        return DocumentSnapshot(self, data, store.shares_data)
+
+    def _write(self, kind, data=None, merge=False):
+        self._client.store.commit([(kind, self._collection, self.id, data, merge)])
+
+    def create(self, document_data):
+        self._write("create", document_data)
+
+    def set(self, document_data, merge=False):
+        self._write("set", document_data, merge)
+
+    def update(self, field_updates):
+        self._write("update", field_updates)
+
+    def delete(self):
+        self._write("delete")
+
+
+class WriteBatch:
+    """Writes applied together, atomically, on commit()"""
+
+    def __init__(self, client):
+        self._client = client
+        self._writes = []
+
+    def create(self, reference, document_data):
+        self._writes.append(("create", reference._collection, reference.id, document_data, False))
+
+    def set(self, reference, document_data, merge=False):
+        self._writes.append(("set", reference._collection, reference.id, document_data, merge))
+
+    def update(self, reference, field_updates):
+        self._writes.append(("update", reference._collection, reference.id, field_updates, False))
+
+    def delete(self, reference):
+        self._writes.append(("delete", reference._collection, reference.id, None, False))
+
+    def commit(self):
+        writes, self._writes = self._writes, []
+        self._client.store.commit(writes)
+
+
+class Transaction(WriteBatch):
+    """
+    Local transaction: the function runs while the store is locked, and its
+    writes are committed together when it returns.
+    """
+
+    def run(self, fn, *args, **kwargs):
+        with self._client.store.atomic():
+            self._writes = []
+            result = fn(self, *args, **kwargs)
+            self.commit()
+        return result
+
+
+def transactional(fn):
+    """Drop-in for firestore.transactional that also accepts local transactions"""
+    @wraps(fn)
+    def wrapper(transaction, *args, **kwargs):
+        if isinstance(transaction, Transaction):
+            return transaction.run(fn, *args, **kwargs)
+        from google.cloud import firestore
+        return firestore.transactional(fn)(transaction, *args, **kwargs)
+    return wrapper
+
+
+def supports_listeners(client):
+    """Whether client can deliver on_snapshot listeners (Firestore clients can, local ones cannot)"""
+    return getattr(client, "supports_listeners", True)
+
+
+class LocalClient:
+    """
+    Subset of the Firestore client API backed by a local store.
+
+    Covers what the services use: documents, equality/range/in/array_contains
+    filters, order_by, limit, select, start_after, get_all, batches and
+    transactions. Listeners (on_snapshot) are not supported; callers check
+    supports_listeners() first.
+    """
+
+    supports_listeners = False
+
+    def __init__(self, store):
+        self.store = store
+
+    def collection(self, collection_path):
+        return CollectionReference(self, collection_path)
+
+    def batch(self):
+        return WriteBatch(self)
+
+    def transaction(self, **kwargs):
+        return Transaction(self)
+
+    def get_all(self, references, field_paths=None, transaction=None):
+        for reference in references:
+            yield reference.get(field_paths)
+
+    def close(self):
+        self.store.close()
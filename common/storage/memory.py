@@ -0,0 +1,52 @@
+# Shared with the other service: edit common/storage/memory.py and run tools/sync_common.py
+import threading
+from contextlib import contextmanager
+from storage.client import apply_write
+
+
+class MemoryStore:
+    """
+    Documents held in a dict in this process.
+
+    Nothing is persisted and each process (e.g. each gunicorn worker) has its
+    own copy, so this backend suits single-process runs, tests and profiling.
+    """
+
+    name = "memory"
+    shares_data = True  # Stored dicts are handed to snapshots, which copy them on to_dict()
+
+    def __init__(self):
+        self._collections = {}  # collection -> {doc_id: data}
+        self._lock = threading.RLock()
+
+    def get(self, collection, doc_id):
+        return self._collections.get(collection, {}).get(doc_id)
+
+    def query(self, collection, filters, orders, limit):
+        """Candidate (doc_id, data) pairs; the caller applies filters, ordering and limit"""
+        with self._lock:
+            return list(self._collections.get(collection, {}).items())
+
+    @contextmanager
+    def atomic(self):
+        with self._lock:
+            yield
+
+    def commit(self, writes):
+        """Apply (kind, collection, doc_id, data, merge) writes all or nothing"""
+        with self._lock:
+            staged = {}
+            for write in writes:
+                _, collection, doc_id, _, _ = write
+                key = (collection, doc_id)
+                current = staged[key] if key in staged else self.get(collection, doc_id)
+                staged[key] = apply_write(current, write)
+            for (collection, doc_id), data in staged.items():
+                documents = self._collections.setdefault(collection, {})
+                if data is None:
+                    documents.pop(doc_id, None)
+                else:
+                    documents[doc_id] = data
+
+    def close(self):
+        pass
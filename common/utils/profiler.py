@@ -0,0 +1,221 @@
+# Shared with the other service: edit common/utils/profiler.py and run tools/sync_common.py
+import hmac
+import json
+import logging
+import os
+import random
+import re
+import sys
+import threading
+import time
+from collections import Counter
+from datetime import datetime
+from flask import g, request
+
+PROFILE_HEADER = "X-Profile"
+PROFILE_ID_HEADER = "X-Profile-Id"
+# Frames listed in the JSON summary
+TOP_FRAMES = 25
+
+SERVICE_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+class RequestProfile:
+    """Stack samples collected for one request thread"""
+
+    def __init__(self, thread_id, forced):
+        self.thread_id = thread_id
+        self.forced = forced  # Requested with the admin header: always kept, whatever its duration
+        self.started_at = time.perf_counter()
+        self.stacks = Counter()  # folded stack -> samples
+
+    def add(self, frame):
+        frames = []
+        while frame is not None:
+            frames.append(_frame_label(frame.f_code))
+            frame = frame.f_back
+        self.stacks[";".join(reversed(frames))] += 1
+
+
+_labels = {}  # code object -> label; code objects live as long as their functions, so this stays small
+
+
+def _frame_label(code):
+    label = _labels.get(code)
+    if label is None:
+        filename = code.co_filename
+        if filename.startswith(SERVICE_ROOT):
+            filename = os.path.relpath(filename, SERVICE_ROOT)
+        else:
+            filename = "/".join(filename.split(os.sep)[-2:])
+        # Folded stacks separate frames with ";"
+        label = _labels[code] = f"{code.co_name} ({filename}:{code.co_firstlineno})".replace(";", ",")
+    return label
+
+
+class SamplingProfiler:
+    """
+    Statistical profiler for selected request threads.
+
+    One background thread per process wakes every interval_ms and records the
+    current stack of each thread being profiled (from sys._current_frames).
+    It sleeps while nothing is being profiled, so unsampled requests pay
+    nothing beyond the decision in before_request.
+    """
+
+    def __init__(self, interval_ms=5):
+        self.interval = interval_ms / 1000.0
+        self._active = {}  # thread id -> RequestProfile
+        self._condition = threading.Condition()
+        self._pid = None
+
+    def _ensure_thread(self):
+        if self._pid == os.getpid():
+            return
+        self._pid = os.getpid()
+        self._active = {}
+        threading.Thread(target=self._run, name="request-profiler", daemon=True).start()
+
+    def start(self, forced):
+        profile = RequestProfile(threading.get_ident(), forced)
+        with self._condition:
+            self._ensure_thread()
+            self._active[profile.thread_id] = profile
+            self._condition.notify()
+        return profile
+
+    def stop(self, profile):
+        with self._condition:
+            self._active.pop(profile.thread_id, None)
+        return time.perf_counter() - profile.started_at
+
+    def _run(self):
+        while True:
+            with self._condition:
+                while not self._active:
+                    self._condition.wait()
+                # Sampled under the lock so a profile is never added to after stop() returns
+                frames = sys._current_frames()
+                for profile in self._active.values():
+                    frame = frames.get(profile.thread_id)
+                    if frame is not None:
+                        profile.add(frame)
+                del frames
+            time.sleep(self.interval)
+
+
+def _slug(text):
+    return re.sub(r"[^A-Za-z0-9]+", "-", text).strip("-")[:80] or "root"
+
+
+def summarize(stacks):
+    """Top frames by self samples (leaf) and by total samples (anywhere on the stack)"""
+    total = sum(stacks.values())
+    self_counts, total_counts = Counter(), Counter()
+    for stack, count in stacks.items():
+        frames = stack.split(";")
+        self_counts[frames[-1]] += count
+        for frame in set(frames):
+            total_counts[frame] += count
+
+    def top(counts):
+        return [{"frame": frame, "samples": count, "percent": round(count * 100.0 / total, 1)}
+                for frame, count in counts.most_common(TOP_FRAMES)]
+    return {"samples": total, "top_self": top(self_counts), "top_total": top(total_counts)}
+
+
+class RequestProfiler:
+    """
+    Decides which requests to profile and writes the results.
+
+    A request is profiled when it carries X-Profile with the admin token, or
+    at random with probability sample_rate; randomly sampled profiles are only
+    kept if the request took at least min_duration_ms.
+
+    Each kept profile is written to profile_dir as <name>.folded (one
+    "frame;frame;frame count" line per stack, the input format of
+    flamegraph.pl and speedscope) and <name>.json (route, duration and the top
+    frames by self and total samples).
+    """
+
+    def __init__(self, profile_dir, sample_rate=0.0, min_duration_ms=500, interval_ms=5, admin_token=None):
+        self.profile_dir = profile_dir
+        self.sample_rate = sample_rate
+        self.min_duration = min_duration_ms / 1000.0
+        self.admin_token = admin_token
+        self.sampler = SamplingProfiler(interval_ms)
+
+    def _forced(self):
+        token = request.headers.get(PROFILE_HEADER)
+        return bool(token and self.admin_token and hmac.compare_digest(token, self.admin_token))
+
+    def before_request(self):
+        forced = self._forced()
+        if forced or (self.sample_rate and random.random() < self.sample_rate):
+            g.request_profile = self.sampler.start(forced)
+
+    def after_request(self, response):
+        profile = g.pop("request_profile", None)
+        if profile is None:
+            return response
+        # Streamed bodies are produced after this point and are not part of the profile
+        duration = self.sampler.stop(profile)
+        if profile.forced or duration >= self.min_duration:
+            try:
+                name = self.save(profile, duration, response.status_code)
+            except OSError as e:
+                logging.error(f"Error saving request profile: {str(e)}")
+            else:
+                if profile.forced:
+                    response.headers[PROFILE_ID_HEADER] = name
+        return response
+
+    def teardown_request(self, exc):
+        # after_request does not run when the view raised
+        profile = g.pop("request_profile", None)
+        if profile is not None:
+            self.sampler.stop(profile)
+
+    def save(self, profile, duration, status_code):
+        """Write the folded stacks and summary; returns the file name shared by both"""
+        rule = request.url_rule.rule if request.url_rule is not None else request.path
+        name = "{}-{}-{}-{}ms-{}".format(datetime.utcnow().strftime("%Y%m%dT%H%M%S%f"), request.method,
+                                         _slug(rule), int(duration * 1000), os.getpid())
+        os.makedirs(self.profile_dir, exist_ok=True)
+        with open(os.path.join(self.profile_dir, name + ".folded"), "w") as folded:
+            for stack, count in sorted(profile.stacks.items()):
+                folded.write(f"{stack} {count}\n")
+        summary = {
+            "method": request.method,
+            "route": rule,
+            "path": request.full_path,
+            "status": status_code,
+            "duration_ms": round(duration * 1000, 2),
+            "interval_ms": self.sampler.interval * 1000,
+            "forced": profile.forced,
+            **summarize(profile.stacks)
+        }
+        with open(os.path.join(self.profile_dir, name + ".json"), "w") as summary_file:
+            json.dump(summary, summary_file, indent=2)
+        return name
+
+
+def init_profiler(app, profile_dir, sample_rate=0.0, min_duration_ms=500, interval_ms=5, admin_token=None):
+    """
+    Register the request profiling hooks; does nothing unless a sample rate or admin token is configured.
+
+    Args:
+        app (Flask): Application to instrument
+        profile_dir (str): Directory for .folded and .json profiles
+        sample_rate (float): Fraction of requests to profile at random (0 to 1)
+        min_duration_ms (float): Randomly sampled profiles faster than this are discarded
+        interval_ms (float): Time between stack samples
+        admin_token (str, optional): Value of the X-Profile header that forces a profile
+    """
+    if not sample_rate and not admin_token:
+        return None
+    profiler = RequestProfiler(profile_dir, sample_rate, min_duration_ms, interval_ms, admin_token)
+    app.before_request(profiler.before_request)
+    app.after_request(profiler.after_request)
+    app.teardown_request(profiler.teardown_request)
+    return profiler
@@ -0,0 +1,67 @@
+import codecs
+import csv
+import json
+
+# Numeric registration fields that arrive as text in CSV uploads
+NUMERIC_FIELDS = ("age", "ctc")
+
+
+def _coerce_csv_row(row):
+    """Strip CSV cells and turn numeric columns back into numbers"""
+    data = {key.strip(): (value.strip() if isinstance(value, str) else value)
+            for key, value in row.items() if key}
+    for field in NUMERIC_FIELDS:
+        value = data.get(field)
+        if isinstance(value, str) and value:
+            try:
+                data[field] = int(value)
+            except ValueError:
+                try:
+                    data[field] = float(value)
+                except ValueError:
+                    pass  # Leave it as text; validation happens on the stored value as before
+    return data
+
+
+def parse_bulk_payload(stream, content_type):
+    """
+    Parse a bulk registration upload into a list of employee dicts.
+
+    Args:
+        stream: Binary request body stream
+        content_type (str): application/json (array), application/x-ndjson or text/csv
+
+    Returns:
+        list: One dict per row
+
+    Raises:
+        ValueError: If the payload cannot be parsed or the content type is not supported
+    """
+    mimetype = (content_type or "application/json").split(";")[0].strip().lower()
+    # codecs only needs read(), which every WSGI server's input stream provides
+    text = codecs.getreader("utf-8")(stream)
+
+    if mimetype == "application/json":
+        try:
+            rows = json.load(text)
+        except json.JSONDecodeError as e:
+            raise ValueError(f"Invalid JSON: {e}")
+        if not isinstance(rows, list):
+            raise ValueError("JSON body must be an array of employees")
+        return rows
+
+    if mimetype in ("application/x-ndjson", "application/ndjson", "application/jsonlines"):
+        rows = []
+        for line_number, line in enumerate(text, start=1):
+            if not line.strip():
+                continue
+            try:
+                rows.append(json.loads(line))
+            except json.JSONDecodeError as e:
+                raise ValueError(f"Invalid JSON on line {line_number}: {e}")
+        return rows
+
+    if mimetype in ("text/csv", "application/csv"):
+        return [_coerce_csv_row(row) for row in csv.DictReader(text)]
+
+    raise ValueError(f"Unsupported content type '{mimetype}'. Use application/json, application/x-ndjson or text/csv")
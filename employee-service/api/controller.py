@@ -7,8 +7,16 @@ from api.service import (
     verify_employee_exists,
     update_employee,
     get_employees_by_designation,
-    delete_employee
+    delete_employee,
+    get_service_stats,
+    search_employee_directory,
+    find_employees_by_department,
+    add_employees_bulk,
+    get_employees_batch,
+    employee_version
 )
+from api.bulk_import import parse_bulk_payload
+from utils.etag import conditional_get
 from utils.response_wrapper import response_wrapper
 
 employee_blueprint = Blueprint("employee", __name__)
@@ -32,6 +40,24 @@ def create_employee():
         return response_wrapper(500, error_message, None)
 
 
+@employee_blueprint.route("/register/bulk", methods=["POST"])
+def create_employees_bulk():
+    """Create many employees from a JSON array, NDJSON or CSV upload"""
+    try:
+        try:
+            rows = parse_bulk_payload(request.stream, request.content_type)
+        except ValueError as e:
+            return response_wrapper(400, str(e), None)
+
+        # add_employees_bulk already returns the response_wrapper tuple
+        return add_employees_bulk(rows)
+
+    except Exception as e:
+        error_message = f"Error in create_employees_bulk: {str(e)}"
+        print(error_message)
+        return response_wrapper(500, error_message, None)
+
+
 @employee_blueprint.route("/login", methods=["POST"])
 def login():
     """Employee login"""
@@ -50,6 +76,7 @@ def login():
 
 
 @employee_blueprint.route("/<employee_id>", methods=["GET"])
+@conditional_get(employee_version)
 def fetch_employee(employee_id):
     """Fetch a single employee by ID"""
     try:
@@ -109,11 +136,17 @@ def delete_employee_route(employee_id):
 
 
 @employee_blueprint.route("/all", methods=["GET"])
+@conditional_get(employee_version)
 def fetch_all_employees():
-    """Fetch all employees"""
+    """Fetch all employees, optionally paginated (limit, cursor), projected (fields=id,name) or streamed (stream=json|ndjson)"""
     try:
+        limit = request.args.get("limit")
+        cursor = request.args.get("cursor")
+        fields = request.args.get("fields")
+        stream = request.args.get("stream")  # "json" or "ndjson" for a chunked response
+
         # get_all_employees already returns the response_wrapper tuple
-        return get_all_employees()
+        return get_all_employees(limit=limit, cursor=cursor, fields=fields, stream=stream)
         
     except Exception as e:
         error_message = f"Error in fetch_all_employees: {str(e)}"
@@ -121,7 +154,44 @@ def fetch_all_employees():
         return response_wrapper(500, error_message, None)
 
 
+@employee_blueprint.route("/batch", methods=["GET", "POST"])
+def fetch_employees_batch():
+    """Fetch many employees at once: POST {"ids": [...], "fields": [...]} or GET ?ids=a,b&fields=id,name"""
+    try:
+        if request.method == "POST":
+            data = request.get_json()
+            if not data:
+                return response_wrapper(400, "Invalid JSON or no data provided", None)
+            ids = data.get("ids")
+            fields = data.get("fields")
+        else:
+            ids = request.args.get("ids", "")
+            fields = request.args.get("fields")
+
+        # get_employees_batch already returns the response_wrapper tuple
+        return get_employees_batch(ids, fields)
+
+    except Exception as e:
+        error_message = f"Error in fetch_employees_batch: {str(e)}"
+        print(error_message)
+        return response_wrapper(500, error_message, None)
+
+
+@employee_blueprint.route("/stats", methods=["GET"])
+def fetch_service_stats():
+    """Fetch cache hit/miss counters for this worker"""
+    try:
+        # get_service_stats already returns the response_wrapper tuple
+        return get_service_stats()
+
+    except Exception as e:
+        error_message = f"Error in fetch_service_stats: {str(e)}"
+        print(error_message)
+        return response_wrapper(500, error_message, None)
+
+
 @employee_blueprint.route("/verify", methods=["GET"])
+@conditional_get(employee_version)
 def check_employee_exists():
     """Verify if an employee exists"""
     try:
@@ -139,37 +209,17 @@ def check_employee_exists():
 
 
 @employee_blueprint.route("/search", methods=["GET"])
+@conditional_get(employee_version)
 def search_employees():
     """Search for employees by name, email, or designation"""
     try:
         query = request.args.get("q", "")
         field = request.args.get("field", "name")  # Default search by name
-        
-        if not query:
-            return response_wrapper(400, "Search query is required", None)
-        
-        # get_all_employees already returns the response_wrapper tuple
-        employees_response = get_all_employees()
-        
-        # Since employees_response is already a tuple (jsonify(response), status_code)
-        # we need to extract the data from it
-        response_json = employees_response[0].json
-        
-        if response_json["status"] != 200:
-            # If there was an error, just return the original response
-            return employees_response
-            
-        # Filter employees by search criteria
-        employees_list = response_json["data"]
-        if not employees_list:
-            employees_list = []
-            
-        filtered_employees = []
-        for employee in employees_list:
-            if field in employee and query.lower() in str(employee[field]).lower():
-                filtered_employees.append(employee)
-        
-        return response_wrapper(200, f"Found {len(filtered_employees)} matching employees", filtered_employees)
+        limit = request.args.get("limit")
+        mode = request.args.get("mode", "substring")  # "prefix" for typeahead
+
+        # search_employee_directory already returns the response_wrapper tuple
+        return search_employee_directory(query, field, limit, mode)
         
     except Exception as e:
         error_message = f"Error in search_employees: {str(e)}"
@@ -178,31 +228,20 @@ def search_employees():
 
 
 @employee_blueprint.route("/department/<department>", methods=["GET"])
-def get_employees_by_department(department):
-    """Get employees by department"""
+@conditional_get(employee_version)
+def get_employees_by_department_route(department):
+    """
+    Get employees whose designation contains the department as whole words ("engineer" matches
+    "Software Engineer", "eng" does not), optionally paginated (limit, cursor) and projected (fields)
+    """
     try:
-        # get_all_employees already returns the response_wrapper tuple
-        employees_response = get_all_employees()
-        
-        # Since employees_response is already a tuple (jsonify(response), status_code)
-        # we need to extract the data from it
-        response_json = employees_response[0].json
-        
-        if response_json["status"] != 200:
-            # If there was an error, just return the original response
-            return employees_response
-            
-        # Filter employees by department
-        employees_list = response_json["data"]
-        if not employees_list:
-            employees_list = []
-            
-        filtered_employees = []
-        for employee in employees_list:
-            if "designation" in employee and department.lower() in employee["designation"].lower():
-                filtered_employees.append(employee)
-        
-        return response_wrapper(200, f"Found {len(filtered_employees)} employees in {department}", filtered_employees)
+        limit = request.args.get("limit")
+        cursor = request.args.get("cursor")
+        fields = request.args.get("fields")
+        stream = request.args.get("stream")  # "json" or "ndjson" for a chunked response
+
+        # find_employees_by_department already returns the response_wrapper tuple
+        return find_employees_by_department(department, limit=limit, cursor=cursor, fields=fields, stream=stream)
         
     except Exception as e:
         error_message = f"Error in get_employees_by_department: {str(e)}"
@@ -211,11 +250,17 @@ def get_employees_by_department(department):
 
 
 @employee_blueprint.route("/designation/<designation>", methods=["GET"])
+@conditional_get(employee_version)
 def get_employees_by_designation_route(designation):
-    """Get employees by exact designation/role"""
+    """Get employees by exact designation/role, optionally paginated (limit, cursor) and projected (fields)"""
     try:
+        limit = request.args.get("limit")
+        cursor = request.args.get("cursor")
+        fields = request.args.get("fields")
+        stream = request.args.get("stream")  # "json" or "ndjson" for a chunked response
+
         # get_employees_by_designation already returns the response_wrapper tuple
-        return get_employees_by_designation(designation)
+        return get_employees_by_designation(designation, limit=limit, cursor=cursor, fields=fields, stream=stream)
         
     except Exception as e:
         error_message = f"Error in get_employees_by_designation_route: {str(e)}"
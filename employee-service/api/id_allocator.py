@@ -0,0 +1,83 @@
+import threading
+from config import EMPLOYEE_ID_BLOCK_SIZE
+
+EMPLOYEE_COLLECTION = "employees"
+COUNTERS_COLLECTION = "counters"
+EMPLOYEE_ID_COUNTER = "employee_id"
+COUNTER_FIELD = "value"
+EMPLOYEE_ID_PREFIX = "EMP"
+
+
+def format_employee_id(number):
+    """Format a sequence number as an employee ID (EMP001, EMP002, etc.)"""
+    return f"{EMPLOYEE_ID_PREFIX}{number:03d}"
+
+
+def parse_employee_id(employee_id):
+    """Extract the sequence number from an EMP*** ID, or None if it is not in that format"""
+    if not employee_id or not employee_id.startswith(EMPLOYEE_ID_PREFIX):
+        return None
+    try:
+        return int(employee_id[len(EMPLOYEE_ID_PREFIX):])
+    except ValueError:
+        return None
+
+
+def bootstrap_employee_id_counter(db):
+    """
+    Seed the employee ID counter from the highest existing EMP*** ID.
+
+    This is the only place that scans the employees collection, and it only
+    writes the counter if it does not exist yet, so running it more than once
+    (or from several workers at the same time) is safe.
+
+    Returns:
+        int: The counter value after bootstrapping
+    """
+    numbers = [parse_employee_id(doc_id) for doc_id in db.get_document_ids(EMPLOYEE_COLLECTION)]
+    highest = max((n for n in numbers if n is not None), default=0)
+    return db.create_counter(COUNTERS_COLLECTION, EMPLOYEE_ID_COUNTER, COUNTER_FIELD, highest)
+
+
+class EmployeeIdAllocator:
+    """
+    Hands out sequential employee IDs from blocks leased off a shared counter.
+
+    Each lease is a single transactional increment of counters/employee_id, so
+    concurrent workers never receive overlapping IDs and a registration costs
+    one counter read per block instead of a scan of the whole collection.
+    IDs left in a block when a worker exits are skipped, not reused.
+    """
+
+    def __init__(self, db, block_size=EMPLOYEE_ID_BLOCK_SIZE):
+        self.db = db
+        self.block_size = max(1, int(block_size))
+        self._lock = threading.Lock()
+        self._next = 0
+        self._end = 0  # Exclusive upper bound of the current lease
+
+    def _lease(self, count):
+        """Reserve count consecutive numbers from the shared counter and return the first one"""
+        high = self.db.increment_counter(COUNTERS_COLLECTION, EMPLOYEE_ID_COUNTER, COUNTER_FIELD, count)
+        if high is None:
+            # First allocation against this project: seed the counter once, then lease
+            bootstrap_employee_id_counter(self.db)
+            high = self.db.increment_counter(COUNTERS_COLLECTION, EMPLOYEE_ID_COUNTER, COUNTER_FIELD, count)
+        return high - count + 1
+
+    def next_id(self):
+        """Return the next employee ID, leasing a new block when the current one runs out"""
+        with self._lock:
+            if self._next >= self._end:
+                self._next = self._lease(self.block_size)
+                self._end = self._next + self.block_size
+            number = self._next
+            self._next += 1
+        return format_employee_id(number)
+
+    def reserve(self, count):
+        """Reserve count contiguous employee IDs in one lease, e.g. for a bulk import"""
+        if count < 1:
+            return []
+        first = self._lease(count)
+        return [format_employee_id(number) for number in range(first, first + count)]
@@ -0,0 +1,146 @@
+import math
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+import bcrypt
+
+MIN_ROUNDS = 10
+MAX_ROUNDS = 16
+DEFAULT_ROUNDS = 12  # bcrypt.gensalt() default
+CALIBRATION_ROUNDS = 8
+
+
+class HasherBusyError(Exception):
+    """Raised when the hashing queue is full; callers should answer 503 with Retry-After"""
+
+    def __init__(self, retry_after):
+        super().__init__("Password hashing queue is full")
+        self.retry_after = retry_after
+
+
+def hash_rounds(hashed_password):
+    """Read the cost factor out of a $2b$<rounds>$... bcrypt hash, or None if it cannot be parsed"""
+    try:
+        return int(hashed_password.split("$")[2])
+    except (AttributeError, IndexError, ValueError):
+        return None
+
+
+def calibrate_rounds(target_ms):
+    """Pick the highest cost factor whose hash time stays within target_ms on this machine"""
+    salt = bcrypt.gensalt(CALIBRATION_ROUNDS)
+    started = time.perf_counter()
+    bcrypt.hashpw(b"calibration-password", salt)
+    elapsed_ms = max((time.perf_counter() - started) * 1000, 0.01)
+    # Every extra round doubles the work
+    rounds = CALIBRATION_ROUNDS + int(math.floor(math.log2(target_ms / elapsed_ms)))
+    return max(MIN_ROUNDS, min(MAX_ROUNDS, rounds))
+
+
+class PasswordHasher:
+    """
+    Runs bcrypt on a dedicated, size-limited thread pool.
+
+    bcrypt releases the GIL, so hashing in the pool keeps request threads free
+    for cheap reads. At most workers + max_pending operations are admitted at
+    once; beyond that HasherBusyError is raised immediately instead of queueing
+    the request behind a burst of logins.
+
+    Args:
+        workers (int): Number of hashing threads
+        max_pending (int): Operations allowed to wait for a free thread
+        rounds (int, optional): Fixed bcrypt cost factor
+        target_ms (float, optional): Calibrate the cost factor to this hash time when rounds is not set
+        retry_after (int): Seconds suggested to clients when the queue is full
+    """
+
+    def __init__(self, workers, max_pending, rounds=None, target_ms=None, retry_after=1):
+        self.workers = max(1, int(workers))
+        self.max_pending = max(0, int(max_pending))
+        self.target_ms = target_ms
+        self.retry_after = retry_after
+        self._rounds = rounds
+        self._rounds_lock = threading.Lock()
+        self._executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="bcrypt")
+        self._slots = threading.BoundedSemaphore(self.workers + self.max_pending)
+        self._bulk_slots = threading.BoundedSemaphore(self.workers)
+        self._in_flight = 0
+        self._in_flight_lock = threading.Lock()
+
+    @property
+    def rounds(self):
+        """Cost factor used for new hashes (calibrated on first use when a target is configured)"""
+        if self._rounds is None:
+            with self._rounds_lock:
+                if self._rounds is None:
+                    self._rounds = calibrate_rounds(self.target_ms) if self.target_ms else DEFAULT_ROUNDS
+                    print(f"Using bcrypt cost factor {self._rounds}")
+        return self._rounds
+
+    def _release(self, future):
+        with self._in_flight_lock:
+            self._in_flight -= 1
+        self._slots.release()
+
+    def _submit(self, fn, *args, block=False):
+        """Queue fn on the pool, raising HasherBusyError if no slot is free and block is False"""
+        if not self._slots.acquire(blocking=block):
+            raise HasherBusyError(self.retry_after)
+        with self._in_flight_lock:
+            self._in_flight += 1
+        future = self._executor.submit(fn, *args)
+        future.add_done_callback(self._release)
+        return future
+
+    def _run(self, fn, *args):
+        """Run fn on the pool and wait for its result"""
+        return self._submit(fn, *args).result()
+
+    def hash(self, password):
+        """Hash a password with the configured cost factor"""
+        salt = bcrypt.gensalt(self.rounds)
+        return self._run(bcrypt.hashpw, password.encode("utf-8"), salt).decode("utf-8")
+
+    def hash_many(self, passwords):
+        """
+        Hash many passwords in parallel, for bulk imports.
+
+        Waits for free slots instead of failing fast, but never holds more than
+        one slot per worker so interactive logins keep the pending queue.
+        """
+        salt_rounds = self.rounds
+        futures = []
+        for password in passwords:
+            self._bulk_slots.acquire()
+            try:
+                future = self._submit(bcrypt.hashpw, password.encode("utf-8"), bcrypt.gensalt(salt_rounds), block=True)
+            except Exception:
+                self._bulk_slots.release()
+                raise
+            future.add_done_callback(lambda _: self._bulk_slots.release())
+            futures.append(future)
+        return [future.result().decode("utf-8") for future in futures]
+
+    def verify(self, password, hashed_password):
+        """Check a password against a stored bcrypt hash"""
+        if not hashed_password:
+            return False
+        return self._run(bcrypt.checkpw, password.encode("utf-8"), hashed_password.encode("utf-8"))
+
+    def needs_rehash(self, hashed_password):
+        """
+        True if a stored hash is weaker than the current cost factor.
+
+        Stronger hashes are kept, so a lower cost on one machine never downgrades them.
+        """
+        rounds = hash_rounds(hashed_password)
+        return rounds is not None and rounds < self.rounds
+
+    def stats(self):
+        """Pool size and current load"""
+        return {
+            "workers": self.workers,
+            "max_pending": self.max_pending,
+            "in_flight": self._in_flight,
+            "rounds": self._rounds
+        }
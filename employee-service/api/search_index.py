@@ -0,0 +1,247 @@
+import heapq
+import threading
+import time
+from datetime import datetime, timedelta
+
+SEARCH_FIELDS = ("name", "email", "designation")
+GRAM_SIZE = 3
+
+# Match tiers, best first
+EXACT_MATCH = 0
+PREFIX_MATCH = 1
+WORD_PREFIX_MATCH = 2
+SUBSTRING_MATCH = 3
+
+
+def _normalize(value):
+    return str(value).strip().lower() if value is not None else ""
+
+
+def _grams(text):
+    """Every GRAM_SIZE-character substring of text"""
+    return {text[i:i + GRAM_SIZE] for i in range(len(text) - GRAM_SIZE + 1)}
+
+
+def _word_prefixes(text):
+    """Prefixes shorter than GRAM_SIZE of every word, used for one and two character typeahead queries"""
+    prefixes = set()
+    for word in text.replace("@", " ").replace(".", " ").split():
+        for size in range(1, GRAM_SIZE):
+            prefixes.add(word[:size])
+    return prefixes
+
+
+def _match_tier(value, query):
+    """Rank how well query matches value, or None if it does not match at all"""
+    if value == query:
+        return EXACT_MATCH
+    if value.startswith(query):
+        return PREFIX_MATCH
+    position = value.find(query)
+    if position == -1:
+        return None
+    if not value[position - 1].isalnum():
+        return WORD_PREFIX_MATCH
+    return SUBSTRING_MATCH
+
+
+class EmployeeSearchIndex:
+    """
+    In-memory trigram/prefix index over employee name, email and designation.
+
+    The index is built once from the employees collection, kept current by the
+    service write paths (upsert/remove) and refreshed incrementally with a
+    created_at/updated_at delta query, so writes made by other workers show up
+    within refresh_seconds. Deletes made by other workers are picked up by the
+    periodic full rebuild.
+
+    Args:
+        load_all (callable): Returns every employee document
+        load_changed_since (callable): Takes (field, iso_timestamp) and returns documents changed after it
+        record_fields (list): Employee fields returned in search results
+        refresh_seconds (float): Minimum interval between incremental refreshes
+        rebuild_seconds (float): Interval between full rebuilds
+    """
+
+    def __init__(self, load_all, load_changed_since, record_fields, refresh_seconds=30, rebuild_seconds=600):
+        self.load_all = load_all
+        self.load_changed_since = load_changed_since
+        self.record_fields = list(record_fields)
+        self.refresh_seconds = refresh_seconds
+        self.rebuild_seconds = rebuild_seconds
+        self._lock = threading.RLock()
+        self._refresh_lock = threading.Lock()
+        self._clear()
+        self._built_at = None
+        self._refreshed_at = None
+        self._watermark = None
+
+    def _clear(self):
+        self._records = {}  # id -> employee record returned in results
+        self._values = {}  # id -> {field: normalized value}
+        # Postings point at distinct values, so shared values (designations, common names)
+        # are matched once per query instead of once per employee
+        self._value_ids = {field: {} for field in SEARCH_FIELDS}  # field -> value -> ids
+        self._grams = {field: {} for field in SEARCH_FIELDS}  # field -> gram -> values
+        self._prefixes = {field: {} for field in SEARCH_FIELDS}  # field -> short word prefix -> values
+
+    def _add_value(self, field, value, employee_id):
+        ids = self._value_ids[field].get(value)
+        if ids is None:
+            ids = self._value_ids[field][value] = set()
+            for gram in _grams(value):
+                self._grams[field].setdefault(gram, set()).add(value)
+            for prefix in _word_prefixes(value):
+                self._prefixes[field].setdefault(prefix, set()).add(value)
+        ids.add(employee_id)
+
+    def _discard_value(self, field, value, employee_id):
+        ids = self._value_ids[field].get(value)
+        if ids is None:
+            return
+        ids.discard(employee_id)
+        if ids:
+            return
+        del self._value_ids[field][value]
+        for index, keys in ((self._grams[field], _grams(value)), (self._prefixes[field], _word_prefixes(value))):
+            for key in keys:
+                values = index.get(key)
+                if values is not None:
+                    values.discard(value)
+                    if not values:
+                        del index[key]
+
+    def _remove_locked(self, employee_id):
+        values = self._values.pop(employee_id, None)
+        self._records.pop(employee_id, None)
+        if values:
+            for field, value in values.items():
+                self._discard_value(field, value, employee_id)
+
+    def _upsert_locked(self, employee):
+        employee_id = employee.get("id")
+        if not employee_id:
+            return
+        self._remove_locked(employee_id)
+        values = {field: _normalize(employee.get(field)) for field in SEARCH_FIELDS}
+        self._values[employee_id] = values
+        self._records[employee_id] = {field: employee[field] for field in self.record_fields if field in employee}
+        for field, value in values.items():
+            self._add_value(field, value, employee_id)
+
+    def upsert(self, employee):
+        """Add or replace one employee in the index"""
+        with self._lock:
+            self._upsert_locked(employee)
+
+    def remove(self, employee_id):
+        """Remove one employee from the index"""
+        with self._lock:
+            self._remove_locked(employee_id)
+
+    def rebuild(self):
+        """Rebuild the whole index from the collection"""
+        started = datetime.utcnow()
+        employees = self.load_all()
+        with self._lock:
+            self._clear()
+            for employee in employees:
+                self._upsert_locked(employee)
+            self._built_at = self._refreshed_at = time.monotonic()
+            # Overlap deltas a little so writes committed while we were reading are not missed
+            self._watermark = (started - timedelta(seconds=5)).isoformat()
+
+    def refresh(self):
+        """Fold documents created or updated since the last refresh into the index"""
+        started = datetime.utcnow()
+        changed = {}
+        for field in ("created_at", "updated_at"):
+            for employee in self.load_changed_since(field, self._watermark):
+                changed[employee.get("id")] = employee
+        with self._lock:
+            for employee in changed.values():
+                self._upsert_locked(employee)
+            self._refreshed_at = time.monotonic()
+            self._watermark = (started - timedelta(seconds=5)).isoformat()
+
+    def mark_stale(self):
+        """Refresh on the next search instead of waiting for refresh_seconds (e.g. another worker wrote)"""
+        with self._lock:
+            if self._built_at is not None:
+                self._refreshed_at = float("-inf")
+
+    def ensure_fresh(self):
+        """Build the index on first use and refresh or rebuild it once it is older than the configured intervals"""
+        now = time.monotonic()
+        if self._built_at is not None and now - self._refreshed_at < self.refresh_seconds:
+            return
+        # Only one request pays for the refresh; the others keep serving the current index
+        if not self._refresh_lock.acquire(blocking=self._built_at is None):
+            return
+        try:
+            now = time.monotonic()
+            if self._built_at is None or now - self._built_at >= self.rebuild_seconds:
+                self.rebuild()
+            elif now - self._refreshed_at >= self.refresh_seconds:
+                self.refresh()
+        finally:
+            self._refresh_lock.release()
+
+    def _candidates(self, field, query, prefix_only=False):
+        """Distinct field values that may contain query"""
+        if len(query) < GRAM_SIZE:
+            if prefix_only:
+                return self._prefixes[field].get(query, ())
+            # Too short for trigrams: scan the distinct values, so inner substrings still match
+            return [value for value in self._value_ids[field] if query in value]
+        posting_sets = []
+        for gram in _grams(query):
+            values = self._grams[field].get(gram)
+            if not values:
+                return ()
+            posting_sets.append(values)
+        posting_sets.sort(key=len)
+        return posting_sets[0].intersection(*posting_sets[1:])
+
+    def search(self, query, fields=SEARCH_FIELDS, limit=20, prefix_only=False):
+        """
+        Find employees whose fields contain query.
+
+        Args:
+            query (str): Text to look for (case-insensitive)
+            fields (tuple): Fields to search, in priority order
+            limit (int): Maximum number of results
+            prefix_only (bool): Typeahead mode, only match the start of a field or of a word in it
+
+        Returns:
+            tuple: (records, total) with the best ranked records first and the total match count
+        """
+        query = _normalize(query)
+        if not query:
+            return [], 0
+        best = {}  # id -> (tier, field priority)
+        with self._lock:
+            for priority, field in enumerate(fields):
+                for value in self._candidates(field, query, prefix_only):
+                    tier = _match_tier(value, query)
+                    if tier is None or (prefix_only and tier == SUBSTRING_MATCH):
+                        continue
+                    rank = (tier, priority)
+                    for employee_id in self._value_ids[field][value]:
+                        current = best.get(employee_id)
+                        if current is None or rank < current:
+                            best[employee_id] = rank
+            values = self._values
+            top = heapq.nsmallest(limit, best, key=lambda emp_id: (best[emp_id], values[emp_id]["name"], emp_id))
+            return [dict(self._records[emp_id]) for emp_id in top], len(best)
+
+    def stats(self):
+        """Index size and freshness"""
+        with self._lock:
+            return {
+                "employees": len(self._records),
+                "distinct_values": sum(len(index) for index in self._value_ids.values()),
+                "grams": sum(len(index) for index in self._grams.values()),
+                "built": self._built_at is not None,
+                "watermark": self._watermark
+            }
@@ -1,12 +1,65 @@
-import bcrypt
+import re
+import asyncio
 import string
 import random
-from datetime import datetime
-from firestore import FirestoreDB
-from utils.response_wrapper import response_wrapper
+from datetime import datetime, timedelta
+from firestore import FirestoreDB, KEY_TAKEN_ERROR
+from firestore_async import AsyncFirestoreDB
+from api.id_allocator import EmployeeIdAllocator
+from api.search_index import EmployeeSearchIndex, SEARCH_FIELDS
+from api.password_hasher import PasswordHasher, HasherBusyError
+from config import (
+    SEARCH_INDEX_REFRESH_SECONDS, SEARCH_INDEX_REBUILD_SECONDS, BCRYPT_WORKERS, BCRYPT_MAX_PENDING,
+    BCRYPT_ROUNDS, BCRYPT_TARGET_MS, BCRYPT_RETRY_AFTER_SECONDS, BULK_IMPORT_MAX_ROWS,
+    BATCH_GET_MAX_IDS, EMAIL_INDEX_FALLBACK, DESIGNATION_INDEX_FALLBACK, ASYNC_QUERY_TIMEOUT_SECONDS
+)
+from utils.async_bridge import run_async
+from utils.response_wrapper import response_wrapper, stream_response_wrapper
 
-db = FirestoreDB()
 EMPLOYEE_COLLECTION = "employees"
+# employee_emails/{normalized email} -> {"employee_id": ...}, maintained alongside each employee
+EMPLOYEE_EMAILS_COLLECTION = "employee_emails"
+# Employee documents are served from a write-through in-process cache
+db = FirestoreDB(cached_collections=[EMPLOYEE_COLLECTION])
+# Async access for fan-out reads, sharing the same caches and collection versions
+async_db = AsyncFirestoreDB(db.caches, db.versions)
+id_allocator = EmployeeIdAllocator(db)
+
+# Fields that listing endpoints may return; the password hash is never listed
+EMPLOYEE_LIST_FIELDS = [
+    "id", "name", "age", "date_of_birth", "email", "address", "blood_type", "phone_number",
+    "designation", "ctc", "employee_shift_hours", "created_at", "updated_at", "last_login"
+]
+DEFAULT_PAGE_SIZE = 100
+MAX_PAGE_SIZE = 500
+STREAM_FORMATS = ("json", "ndjson")
+DEFAULT_SEARCH_LIMIT = 20
+MAX_SEARCH_LIMIT = 100
+
+# In-memory search index, kept current by the write paths below
+search_index = EmployeeSearchIndex(
+    load_all=lambda: db.get_all_documents(EMPLOYEE_COLLECTION),
+    load_changed_since=lambda field, since: db.get_documents_after(EMPLOYEE_COLLECTION, field, since),
+    record_fields=EMPLOYEE_LIST_FIELDS,
+    refresh_seconds=SEARCH_INDEX_REFRESH_SECONDS,
+    rebuild_seconds=SEARCH_INDEX_REBUILD_SECONDS
+)
+# Writes made by other workers reach the index on its next refresh rather than after refresh_seconds
+db.versions[EMPLOYEE_COLLECTION].subscribe(search_index.mark_stale)
+
+# bcrypt runs off the request threads with bounded queueing
+password_hasher = PasswordHasher(
+    workers=BCRYPT_WORKERS,
+    max_pending=BCRYPT_MAX_PENDING,
+    rounds=BCRYPT_ROUNDS,
+    target_ms=BCRYPT_TARGET_MS,
+    retry_after=BCRYPT_RETRY_AFTER_SECONDS
+)
+
+
+def employee_version():
+    """Version of the employee collection, shared by every worker; read endpoints use it as their ETag"""
+    return db.collection_version(EMPLOYEE_COLLECTION)
 
 
 def generate_unique_password(length=12):
@@ -36,55 +89,131 @@ def generate_unique_password(length=12):
     return ''.join(password)
 
 
+def busy_response(error):
+    """503 response asking the client to retry once the hashing queue has drained"""
+    response, status_code = response_wrapper(503, "Server is busy, please retry shortly", None)
+    response.headers["Retry-After"] = str(error.retry_after)
+    return response, status_code
+
+
+def normalize_designation(designation):
+    """Lower-case a designation and collapse whitespace so equality lookups are case-insensitive"""
+    return " ".join(str(designation or "").lower().split())
+
+
+def designation_words(text):
+    """Lower-cased words of a designation or department name, in order"""
+    return [word for word in re.split(r"[^a-z0-9+#]+", normalize_designation(text)) if word]
+
+
+def department_keys(text):
+    """
+    Department names a designation belongs to: every run of consecutive words, e.g.
+    "senior software engineer" -> senior, software, engineer, senior software, software engineer, ...
+
+    Storing the runs lets a multi-word department be looked up with one array_contains
+    filter, with no checking of the results afterwards.
+    """
+    words = designation_words(text)
+    return sorted({" ".join(words[start:end]) for start in range(len(words)) for end in range(start + 1, len(words) + 1)})
+
+
+def designation_index_fields(designation):
+    """Write-time normalized fields backing the designation and department lookups"""
+    return {
+        "designation_lower": normalize_designation(designation),
+        "department_keys": department_keys(designation)
+    }
+
+
+def normalize_email(email):
+    """Key used for the email index: trimmed and lower-cased (None if it cannot be a document ID)"""
+    key = str(email or "").strip().lower()
+    if not key or "/" in key or key in (".", ".."):
+        return None
+    return key
+
+
+def email_key_of(employee):
+    """Email index key of a stored employee document"""
+    return normalize_email(employee.get("email"))
+
+
+def find_employee_id_by_email(email):
+    """Look up which employee owns an email with a point read on the email index"""
+    employee_id = db.get_key_owner(EMPLOYEE_EMAILS_COLLECTION, normalize_email(email))
+    if employee_id is None and EMAIL_INDEX_FALLBACK:
+        # Employees created before the index existed are only findable by query
+        employees = db.get_documents_by_field(EMPLOYEE_COLLECTION, "email", email)
+        if employees:
+            employee_id = employees[0]["id"]
+    return employee_id
+
+
+async def find_registered_emails(email_keys, raw_emails):
+    """Look up normalized emails in the email index and, while the fallback is on, raw emails in employees"""
+    lookups = [async_db.get_key_owners(EMPLOYEE_EMAILS_COLLECTION, email_keys)]
+    if EMAIL_INDEX_FALLBACK:
+        lookups.append(async_db.get_existing_field_values(EMPLOYEE_COLLECTION, "email", raw_emails))
+    return await asyncio.gather(*lookups)
+
+
 def get_next_employee_id():
     """Fetch the next sequential employee ID"""
-    try:
-        employees = db.get_all_documents(EMPLOYEE_COLLECTION)
-        
-        if not employees:
-            return "EMP001"  # Start with EMP001 if no employees exist
-        
-        # Extract numeric part from EMP*** format and find the max
-        emp_numbers = []
-        for emp in employees:
-            if "id" in emp and emp["id"].startswith("EMP"):
-                try:
-                    num = int(emp["id"][3:])  # Extract the number after "EMP"
-                    emp_numbers.append(num)
-                except ValueError:
-                    # Skip if not in the expected format
-                    continue
-        
-        if not emp_numbers:
-            return "EMP001"  # Start with EMP001 if no valid IDs found
-            
-        next_number = max(emp_numbers) + 1
-        return f"EMP{next_number:03d}"  # Format as EMP001, EMP002, etc.
-    except Exception as e:
-        # Better error handling - return error details
-        print(f"Error generating employee ID: {str(e)}")
-        return "EMP001"  # Fallback to default if error occurs
+    # IDs come from a transactional counter leased in blocks, so this no longer
+    # scans the collection and concurrent registrations cannot collide
+    return id_allocator.next_id()
+
+
+REQUIRED_EMPLOYEE_FIELDS = ["name", "age", "date_of_birth", "email", "address", "blood_type",
+                            "phone_number", "designation", "ctc", "employee_shift_hours"]
+
+
+def missing_employee_fields(data):
+    """Required registration fields that are absent or empty"""
+    return [field for field in REQUIRED_EMPLOYEE_FIELDS if field not in data or data[field] in [None, ""]]
+
+
+def build_employee_record(data, employee_id, hashed_password, created_at=None):
+    """Assemble the stored employee document from validated registration data"""
+    employee_data = {
+        "id": employee_id,
+        "name": data["name"],
+        "age": data["age"],
+        "date_of_birth": data["date_of_birth"],
+        "email": data["email"],
+        "address": data["address"],
+        "blood_type": data["blood_type"],
+        "phone_number": data["phone_number"],
+        "designation": data["designation"],
+        "ctc": data["ctc"],
+        "password": hashed_password,  # Store hashed password
+        "employee_shift_hours": data["employee_shift_hours"],
+        "created_at": created_at or datetime.utcnow().isoformat(),
+        "last_login": None
+    }
+    employee_data.update(designation_index_fields(data["designation"]))
+    return employee_data
 
 
 def add_employee(data):
     """Register a new employee with auto-generated password"""
     try:
-        required_fields = ["name", "age", "date_of_birth", "email", "address", "blood_type",
-                        "phone_number", "designation", "ctc", "employee_shift_hours"]
-
         if not data:
             return response_wrapper(400, "No data provided", None)
             
         # Check for missing fields more safely
-        missing_fields = [field for field in required_fields if field not in data or data[field] in [None, ""]]
+        missing_fields = missing_employee_fields(data)
         if missing_fields:
             return response_wrapper(400, f"Missing required fields: {', '.join(missing_fields)}", None)
 
         email = data["email"]
+        email_key = normalize_email(email)
+        if not email_key:
+            return response_wrapper(400, "Invalid email", None)
 
-        # Check if employee already exists with this email
-        existing_employees = db.get_documents_by_field(EMPLOYEE_COLLECTION, "email", email)
-        if existing_employees:
+        # Check if employee already exists with this email (before spending an ID and a hash)
+        if find_employee_id_by_email(email):
             return response_wrapper(400, "Employee with this email already exists", None)
 
         # Generate a unique employee ID
@@ -94,33 +223,25 @@ def add_employee(data):
         raw_password = generate_unique_password()
         
         # Hash the password before storing
-        hashed_password = bcrypt.hashpw(raw_password.encode("utf-8"), bcrypt.gensalt()).decode("utf-8")
-
-        employee_data = {
-            "id": employee_id,
-            "name": data["name"],
-            "age": data["age"],
-            "date_of_birth": data["date_of_birth"],
-            "email": email,
-            "address": data["address"],
-            "blood_type": data["blood_type"],
-            "phone_number": data["phone_number"],
-            "designation": data["designation"],
-            "ctc": data["ctc"],
-            "password": hashed_password,  # Store hashed password
-            "employee_shift_hours": data["employee_shift_hours"],
-            "created_at": datetime.utcnow().isoformat(),
-            "last_login": None
-        }
+        hashed_password = password_hasher.hash(raw_password)
 
-        # Add the document with employee_id as the document ID
-        db.add_document(EMPLOYEE_COLLECTION, employee_id, employee_data)
+        employee_data = build_employee_record(data, employee_id, hashed_password)
+
+        # Add the document with employee_id as the document ID; claiming the email index
+        # document in the same transaction stops concurrent registrations with one email
+        if not db.add_document_with_key(EMPLOYEE_COLLECTION, employee_id, employee_data,
+                                        EMPLOYEE_EMAILS_COLLECTION, email_key):
+            return response_wrapper(400, "Employee with this email already exists", None)
+        search_index.upsert(employee_data)
         
         # Return the employee data with the raw password for first-time use
         response_data = employee_data.copy()
         response_data["raw_password"] = raw_password  # Include raw password in response only
         return response_wrapper(201, "Employee registered successfully with auto-generated password", response_data)
     
+    except HasherBusyError as e:
+        return busy_response(e)
+
     except Exception as e:
         # Better error handling with more detailed error message
         error_message = f"Error creating employee: {str(e)}"
@@ -128,23 +249,132 @@ def add_employee(data):
         return response_wrapper(500, error_message, None)
 
 
+def add_employees_bulk(rows):
+    """
+    Register many employees in one request.
+
+    Rows are validated in one pass, emails are checked with one batched read of the email index,
+    IDs come from one contiguous block, passwords are hashed in parallel and the
+    documents are written with batched commits of up to 500.
+
+    Args:
+        rows (list): Registration dicts, in the same shape as /register
+
+    Returns:
+        Response with created/failed counts and a per-row result (including the raw password of created rows)
+    """
+    try:
+        if not rows:
+            return response_wrapper(400, "No employees provided", None)
+        if len(rows) > BULK_IMPORT_MAX_ROWS:
+            return response_wrapper(400, f"At most {BULK_IMPORT_MAX_ROWS} employees can be imported per request", None)
+
+        results = [None] * len(rows)
+        valid_rows = []
+        seen_emails = set()
+
+        # Validate every row and reject duplicates inside the payload
+        for index, data in enumerate(rows):
+            if not isinstance(data, dict):
+                results[index] = {"row": index, "status": "error", "error": "Row must be an object"}
+                continue
+            missing_fields = missing_employee_fields(data)
+            if missing_fields:
+                results[index] = {"row": index, "status": "error",
+                                  "error": f"Missing required fields: {', '.join(missing_fields)}"}
+                continue
+            email_key = normalize_email(data["email"])
+            if not email_key:
+                results[index] = {"row": index, "status": "error", "error": "Invalid email"}
+                continue
+            if email_key in seen_emails:
+                results[index] = {"row": index, "status": "error", "error": "Duplicate email in import"}
+                continue
+            seen_emails.add(email_key)
+            valid_rows.append((index, data))
+
+        # Emails that are already registered, checked against the index and the legacy field concurrently
+        existing_emails = set()
+        for emails in run_async(find_registered_emails(seen_emails, [data["email"] for _, data in valid_rows]),
+                                ASYNC_QUERY_TIMEOUT_SECONDS):
+            existing_emails.update(normalize_email(email) for email in emails)
+        new_rows = []
+        for index, data in valid_rows:
+            if normalize_email(data["email"]) in existing_emails:
+                results[index] = {"row": index, "status": "error", "error": "Employee with this email already exists"}
+            else:
+                new_rows.append((index, data))
+
+        if new_rows:
+            employee_ids = id_allocator.reserve(len(new_rows))
+            raw_passwords = [generate_unique_password() for _ in new_rows]
+            hashed_passwords = password_hasher.hash_many(raw_passwords)
+
+            created_at = datetime.utcnow()
+            employees = {}
+            for offset, (index, data) in enumerate(new_rows):
+                # Distinct timestamps keep the created_at ordering (and cursors) stable within the import
+                timestamp = (created_at + timedelta(microseconds=offset)).isoformat()
+                employees[employee_ids[offset]] = build_employee_record(
+                    data, employee_ids[offset], hashed_passwords[offset], timestamp)
+
+            email_keys = {
+                employee_ids[offset]: (EMPLOYEE_EMAILS_COLLECTION, normalize_email(data["email"]))
+                for offset, (index, data) in enumerate(new_rows)
+            }
+            failed_ids = db.add_documents(EMPLOYEE_COLLECTION, employees, keys=email_keys)
+
+            for offset, (index, data) in enumerate(new_rows):
+                employee_id = employee_ids[offset]
+                if employee_id in failed_ids:
+                    error = failed_ids[employee_id]
+                    # The email was registered after the index check above
+                    error = ("Employee with this email already exists" if error == KEY_TAKEN_ERROR
+                             else f"Write failed: {error}")
+                    results[index] = {"row": index, "status": "error", "email": data["email"], "error": error}
+                    continue
+                search_index.upsert(employees[employee_id])
+                results[index] = {"row": index, "status": "created", "id": employee_id,
+                                  "email": data["email"], "raw_password": raw_passwords[offset]}
+
+        created = sum(1 for result in results if result["status"] == "created")
+        summary = {
+            "total": len(rows),
+            "created": created,
+            "failed": len(rows) - created,
+            "results": results
+        }
+        return response_wrapper(201 if created else 400, f"Imported {created} of {len(rows)} employees", summary)
+
+    except HasherBusyError as e:
+        return busy_response(e)
+
+    except Exception as e:
+        error_message = f"Error importing employees: {str(e)}"
+        print(error_message)
+        return response_wrapper(500, error_message, None)
+
+
 def update_employee(employee_id, data):
     """Update an existing employee"""
     try:
         if not employee_id:
             return response_wrapper(400, "Employee ID is required", None)
             
-        # Check if employee exists
-        existing_employee = db.get_document(EMPLOYEE_COLLECTION, employee_id)
+        # Check if employee exists (uncached: the email comparison must see writes made by other workers)
+        existing_employee = db.get_document(EMPLOYEE_COLLECTION, employee_id, cached=False)
         if not existing_employee:
             return response_wrapper(404, "Employee not found", None)
             
         # Check if email is being updated and is already in use by another employee
+        new_email_key = None
         if "email" in data and data["email"] != existing_employee["email"]:
-            existing_emails = db.get_documents_by_field(EMPLOYEE_COLLECTION, "email", data["email"])
-            for emp in existing_emails:
-                if emp["id"] != employee_id:  # If email belongs to a different employee
-                    return response_wrapper(400, "Email already in use by another employee", None)
+            new_email_key = normalize_email(data["email"])
+            if not new_email_key:
+                return response_wrapper(400, "Invalid email", None)
+            owner_id = find_employee_id_by_email(data["email"])
+            if owner_id and owner_id != employee_id:  # If email belongs to a different employee
+                return response_wrapper(400, "Email already in use by another employee", None)
         
         # Create a copy of the data for the response
         response_data = {}
@@ -153,7 +383,7 @@ def update_employee(employee_id, data):
         if "update_password" in data and data["update_password"] is True:
             # Generate a new password if requested
             raw_password = generate_unique_password()
-            hashed_password = bcrypt.hashpw(raw_password.encode("utf-8"), bcrypt.gensalt()).decode("utf-8")
+            hashed_password = password_hasher.hash(raw_password)
             data["password"] = hashed_password
             # Remove update_password flag as it's not needed in the database
             del data["update_password"]
@@ -162,25 +392,38 @@ def update_employee(employee_id, data):
         elif "password" in data:
             # If a specific password is provided, hash it
             if data["password"]:
-                data["password"] = bcrypt.hashpw(data["password"].encode("utf-8"), bcrypt.gensalt()).decode("utf-8")
+                data["password"] = password_hasher.hash(data["password"])
             else:
                 # If empty password is provided, remove it from the update
                 del data["password"]
             
+        # Keep the normalized lookup fields in step with the designation
+        if "designation" in data:
+            data.update(designation_index_fields(data["designation"]))
+
         # Add last updated timestamp
         data["updated_at"] = datetime.utcnow().isoformat()
         
-        # Update employee data
-        db.update_document(EMPLOYEE_COLLECTION, employee_id, data)
+        # Update employee data; an email change swaps the email index document in the same transaction
+        if new_email_key:
+            if not db.update_document_with_key(EMPLOYEE_COLLECTION, employee_id, data, EMPLOYEE_EMAILS_COLLECTION,
+                                               new_email_key, email_key_of):
+                return response_wrapper(400, "Email already in use by another employee", None)
+        else:
+            db.update_document(EMPLOYEE_COLLECTION, employee_id, data)
         
         # Fetch updated employee data
         updated_employee = db.get_document(EMPLOYEE_COLLECTION, employee_id)
+        search_index.upsert(updated_employee)
         
         # Merge the updated employee with any response data (like raw password)
         response_data.update(updated_employee)
         
         return response_wrapper(200, "Employee updated successfully", response_data)
     
+    except HasherBusyError as e:
+        return busy_response(e)
+
     except Exception as e:
         error_message = f"Error updating employee: {str(e)}"
         print(error_message)
@@ -198,23 +441,40 @@ def login_employee(data):
         email = data["email"]
         password = data["password"]
 
-        # Fetch employee from Firestore by email
-        employees = db.get_documents_by_field(EMPLOYEE_COLLECTION, "email", email)
-        if not employees:
+        # Resolve the email through the email index, then read the employee document from storage:
+        # a cached copy could still hold a password changed since through another worker
+        employee_id = find_employee_id_by_email(email)
+        employee = db.get_document(EMPLOYEE_COLLECTION, employee_id, cached=False) if employee_id else None
+        if not employee:
             return response_wrapper(401, "Invalid email or password", None)
         
-        employee = employees[0]  # Use the first match (should be only one)
         stored_password = employee.get("password")
 
         # Verify password
-        if not bcrypt.checkpw(password.encode("utf-8"), stored_password.encode("utf-8")):
+        if not password_hasher.verify(password, stored_password):
             return response_wrapper(401, "Invalid email or password", None)
 
-        # Update last login time
-        db.update_document(EMPLOYEE_COLLECTION, employee["id"], {"last_login": datetime.utcnow().isoformat()})
+        login_update = {"last_login": datetime.utcnow().isoformat()}
+
+        # Transparently upgrade hashes made with an outdated cost factor
+        if password_hasher.needs_rehash(stored_password):
+            try:
+                login_update["password"] = password_hasher.hash(password)
+            except HasherBusyError:
+                pass  # Try again on a later login rather than failing this one
+
+        # Update last login time; a re-hashed password is written synchronously,
+        # a plain last_login bump goes through the write-behind buffer
+        if "password" in login_update:
+            db.update_document(EMPLOYEE_COLLECTION, employee["id"], login_update)
+        else:
+            db.defer_update(EMPLOYEE_COLLECTION, employee["id"], login_update)
 
         return response_wrapper(200, "Login successful", employee)
     
+    except HasherBusyError as e:
+        return busy_response(e)
+
     except Exception as e:
         error_message = f"Error during login: {str(e)}"
         print(error_message)
@@ -239,11 +499,138 @@ def get_employee(employee_id):
         return response_wrapper(500, error_message, None)
 
 
-def get_all_employees():
-    """Fetch all employees"""
+def get_employees_batch(ids, fields=None):
+    """
+    Resolve many employees by ID in one round trip.
+
+    Args:
+        ids (list or str): Employee IDs (list or comma separated)
+        fields (list or str, optional): Projection, as for listings
+
+    Returns:
+        Response with {"employees": [...], "missing": [...]} in request order
+    """
     try:
-        employees = db.get_all_documents(EMPLOYEE_COLLECTION)
-        return response_wrapper(200, "All employees fetched", employees)
+        if isinstance(ids, str):
+            ids = ids.split(",")
+        if not isinstance(ids, list):
+            return response_wrapper(400, "ids must be a list of employee IDs", None)
+        ids = list(dict.fromkeys(str(emp_id).strip() for emp_id in ids if emp_id and str(emp_id).strip()))
+        if not ids:
+            return response_wrapper(400, "At least one employee ID is required", None)
+        if len(ids) > BATCH_GET_MAX_IDS:
+            return response_wrapper(400, f"At most {BATCH_GET_MAX_IDS} IDs can be fetched per request", None)
+
+        try:
+            list_fields = parse_list_fields(fields)
+        except ValueError as e:
+            return response_wrapper(400, str(e), None)
+
+        found = db.get_documents(EMPLOYEE_COLLECTION, ids, list_fields)
+        employees = [found[emp_id] for emp_id in ids if emp_id in found]
+        missing = [emp_id for emp_id in ids if emp_id not in found]
+
+        return response_wrapper(200, f"Fetched {len(employees)} of {len(ids)} employees", {
+            "employees": employees,
+            "missing": missing
+        })
+
+    except Exception as e:
+        error_message = f"Error fetching employees batch: {str(e)}"
+        print(error_message)
+        return response_wrapper(500, error_message, None)
+
+
+def parse_list_fields(fields):
+    """
+    Validate a fields= projection for listing endpoints.
+
+    Args:
+        fields (str or list): Comma separated or list of field names, or None for all listable fields
+
+    Returns:
+        list: Field names to return ("id" is always included)
+
+    Raises:
+        ValueError: If a field is unknown or not allowed in listings
+    """
+    if not fields:
+        return list(EMPLOYEE_LIST_FIELDS)
+    if isinstance(fields, str):
+        fields = fields.split(",")
+    requested = [field.strip() for field in fields if field and field.strip()]
+    invalid = [field for field in requested if field not in EMPLOYEE_LIST_FIELDS]
+    if invalid:
+        raise ValueError(f"Unknown or restricted fields: {', '.join(invalid)}")
+    if "id" not in requested:
+        requested.insert(0, "id")
+    return requested
+
+
+def project_employee(employee, fields):
+    """Return only the requested fields of an employee record"""
+    return {field: employee[field] for field in fields if field in employee}
+
+
+def fetch_employee_page(limit, cursor, list_fields, filters=None):
+    """
+    Read one page of employees with Firestore start_after and wrap it in a response.
+
+    Args:
+        limit: Requested page size (DEFAULT_PAGE_SIZE when None)
+        cursor (str): ID of the last employee on the previous page
+        list_fields (list): Projection applied to each employee
+        filters (list, optional): (field, op, value) conditions
+    """
+    try:
+        limit = DEFAULT_PAGE_SIZE if limit is None else int(limit)
+    except (TypeError, ValueError):
+        return response_wrapper(400, "limit must be an integer", None)
+    if limit < 1 or limit > MAX_PAGE_SIZE:
+        return response_wrapper(400, f"limit must be between 1 and {MAX_PAGE_SIZE}", None)
+
+    try:
+        employees, next_cursor = db.get_documents_page(EMPLOYEE_COLLECTION, limit, cursor, list_fields, filters)
+    except ValueError as e:
+        return response_wrapper(400, str(e), None)
+
+    page = {
+        "employees": employees,
+        "next_cursor": next_cursor,
+        "count": len(employees)
+    }
+    return response_wrapper(200, f"Fetched {len(employees)} employees", page)
+
+
+def get_all_employees(limit=None, cursor=None, fields=None, stream=None):
+    """
+    Fetch all employees, optionally one page at a time and with a field projection.
+
+    Without limit/cursor the full list is returned (served from the directory cache).
+    With them, data is {"employees": [...], "next_cursor": ..., "count": n} and the page
+    is read from Firestore with start_after on the created_at ordering.
+    stream="json" or "ndjson" sends the full list as a chunked stream instead.
+    """
+    try:
+        try:
+            list_fields = parse_list_fields(fields)
+        except ValueError as e:
+            return response_wrapper(400, str(e), None)
+
+        if stream:
+            if stream not in STREAM_FORMATS:
+                return response_wrapper(400, "stream must be 'json' or 'ndjson'", None)
+            if limit is not None or cursor:
+                return response_wrapper(400, "stream cannot be combined with limit or cursor", None)
+            employees = db.iter_documents(EMPLOYEE_COLLECTION, list_fields)
+            return stream_response_wrapper(200, "All employees fetched", employees, ndjson=(stream == "ndjson"))
+
+        if limit is None and not cursor:
+            employees = db.get_all_documents(EMPLOYEE_COLLECTION)
+            employees = [project_employee(emp, list_fields) for emp in employees]
+            return response_wrapper(200, "All employees fetched", employees)
+
+        return fetch_employee_page(limit, cursor, list_fields)
     
     except Exception as e:
         error_message = f"Error fetching all employees: {str(e)}"
@@ -251,6 +638,47 @@ def get_all_employees():
         return response_wrapper(500, error_message, None)
 
 
+def search_employee_directory(query, field="name", limit=None, mode="substring"):
+    """
+    Search employees through the in-memory index.
+
+    Args:
+        query (str): Text to search for
+        field (str): name, email, designation or all
+        limit (int): Maximum number of results
+        mode (str): substring for ranked substring matches, prefix for typeahead
+    """
+    try:
+        if not query:
+            return response_wrapper(400, "Search query is required", None)
+
+        if field == "all":
+            fields = SEARCH_FIELDS
+        elif field in SEARCH_FIELDS:
+            fields = (field,)
+        else:
+            return response_wrapper(400, f"Unsupported search field '{field}'. Use one of: {', '.join(SEARCH_FIELDS)}, all", None)
+
+        if mode not in ("substring", "prefix"):
+            return response_wrapper(400, "mode must be 'substring' or 'prefix'", None)
+
+        try:
+            limit = DEFAULT_SEARCH_LIMIT if limit is None else int(limit)
+        except (TypeError, ValueError):
+            return response_wrapper(400, "limit must be an integer", None)
+        limit = max(1, min(limit, MAX_SEARCH_LIMIT))
+
+        search_index.ensure_fresh()
+        employees, total = search_index.search(query, fields, limit, prefix_only=(mode == "prefix"))
+
+        return response_wrapper(200, f"Found {total} matching employees", employees)
+
+    except Exception as e:
+        error_message = f"Error searching employees: {str(e)}"
+        print(error_message)
+        return response_wrapper(500, error_message, None)
+
+
 def verify_employee_exists(employee_id):
     """Check if an employee exists"""
     try:
@@ -264,24 +692,97 @@ def verify_employee_exists(employee_id):
         return response_wrapper(500, error_message, None)
 
 
-def get_employees_by_designation(designation):
-    """Get employees by designation/role"""
+def find_employees_matching(matches, filters, subject, limit=None, cursor=None, fields=None, stream=None):
+    """
+    List the employees selected by filters, as a list, a page (limit, cursor) or a stream.
+
+    Documents are looked up with filters on the write-time index fields, which
+    select exactly the matching employees. Employees written before those fields
+    existed cannot be found that way; while DESIGNATION_INDEX_FALLBACK is on, full
+    lists and streams filter the whole directory with matches instead. Pages always
+    use the index, so every page is full and the cursor stays exact.
+
+    Args:
+        matches (callable): Takes an employee (with its designation) and returns whether it belongs in the result
+        filters (list): (field, op, value) conditions selecting exactly the matches among indexed employees
+        subject (str): Describes the result in response messages, e.g. "in engineering"
+    """
     try:
-        if not designation:
+        list_fields = parse_list_fields(fields)
+    except ValueError as e:
+        return response_wrapper(400, str(e), None)
+
+    if stream and stream not in STREAM_FORMATS:
+        return response_wrapper(400, "stream must be 'json' or 'ndjson'", None)
+    if stream and (limit is not None or cursor):
+        return response_wrapper(400, "stream cannot be combined with limit or cursor", None)
+    if limit is not None or cursor:
+        return fetch_employee_page(limit, cursor, list_fields, filters)
+
+    if DESIGNATION_INDEX_FALLBACK:
+        fetch_fields = list_fields if "designation" in list_fields else list_fields + ["designation"]
+        if stream:
+            employees = (project_employee(emp, list_fields)
+                         for emp in db.iter_documents(EMPLOYEE_COLLECTION, fetch_fields) if matches(emp))
+        else:
+            employees = [project_employee(emp, list_fields)
+                         for emp in db.get_all_documents(EMPLOYEE_COLLECTION) if matches(emp)]
+    elif stream:
+        employees = db.iter_documents(EMPLOYEE_COLLECTION, list_fields, filters)
+    else:
+        employees = db.query_documents(EMPLOYEE_COLLECTION, filters, list_fields)
+
+    if stream:
+        return stream_response_wrapper(200, f"Employees {subject} fetched", employees, ndjson=(stream == "ndjson"))
+    return response_wrapper(200, f"Found {len(employees)} employees {subject}", employees)
+
+
+def get_employees_by_designation(designation, limit=None, cursor=None, fields=None, stream=None):
+    """Get employees whose designation equals the given one, ignoring case and spacing (indexed on designation_lower)"""
+    try:
+        designation_lower = normalize_designation(designation)
+        if not designation_lower:
             return response_wrapper(400, "Designation is required", None)
-            
-        employees = db.get_all_documents(EMPLOYEE_COLLECTION)
-        filtered_employees = [emp for emp in employees if emp.get("designation", "").lower() == designation.lower()]
-        
-        return response_wrapper(200, f"Found {len(filtered_employees)} employees with designation '{designation}'", 
-                            filtered_employees)
-    
+
+        def has_designation(employee):
+            return normalize_designation(employee.get("designation")) == designation_lower
+
+        return find_employees_matching(has_designation, [("designation_lower", "==", designation_lower)],
+                                       f"with designation '{designation}'", limit, cursor, fields, stream)
+
     except Exception as e:
         error_message = f"Error fetching employees by designation: {str(e)}"
         print(error_message)
         return response_wrapper(500, error_message, None)
 
 
+def find_employees_by_department(department, limit=None, cursor=None, fields=None, stream=None):
+    """
+    Get employees whose designation contains the department name as whole words (e.g. "engineer"
+    matches "Software Engineer", "eng" matches nothing), ignoring case.
+
+    Uses an array_contains lookup on department_keys, which hold every run of
+    consecutive designation words, so the cost is proportional to the number of matches.
+    """
+    try:
+        words = designation_words(department)
+        if not words:
+            return response_wrapper(400, "Department is required", None)
+
+        def in_department(employee):
+            designation = designation_words(employee.get("designation"))
+            return any(designation[i:i + len(words)] == words for i in range(len(designation) - len(words) + 1))
+
+        filters = [("department_keys", "array_contains", " ".join(words))]
+        return find_employees_matching(in_department, filters, f"in {department}",
+                                       limit, cursor, fields, stream)
+
+    except Exception as e:
+        error_message = f"Error fetching employees by department: {str(e)}"
+        print(error_message)
+        return response_wrapper(500, error_message, None)
+
+
 def delete_employee(employee_id):
     """Delete an employee"""
     try:
@@ -293,12 +794,29 @@ def delete_employee(employee_id):
         if not employee:
             return response_wrapper(404, "Employee not found", None)
             
-        # Delete the employee
-        db.delete_document(EMPLOYEE_COLLECTION, employee_id)
+        # Delete the employee together with its email index document
+        db.delete_document_with_key(EMPLOYEE_COLLECTION, employee_id, EMPLOYEE_EMAILS_COLLECTION, email_key_of)
+        search_index.remove(employee_id)
         
         return response_wrapper(200, "Employee deleted successfully", {"id": employee_id})
     
     except Exception as e:
         error_message = f"Error deleting employee: {str(e)}"
         print(error_message)
+        return response_wrapper(500, error_message, None)
+
+
+def get_service_stats():
+    """Report in-process cache, search index, hashing pool and write-behind counters"""
+    try:
+        return response_wrapper(200, "Service stats fetched", {
+            "cache": db.cache_stats(),
+            "search_index": search_index.stats(),
+            "password_hasher": password_hasher.stats(),
+            "write_behind": db.write_behind.stats()
+        })
+
+    except Exception as e:
+        error_message = f"Error fetching service stats: {str(e)}"
+        print(error_message)
         return response_wrapper(500, error_message, None)
\ No newline at end of file
@@ -2,11 +2,22 @@ from flask import Flask
 from flask_restful import Api
 from api.controller import employee_blueprint
 from flask_cors import CORS
+from config import COMPRESS_MIN_BYTES, COMPRESS_LEVEL, METRICS_DIR, METRICS_FLUSH_SECONDS, QUERY_TRACE_ENABLED, QUERY_TRACE_REPEAT_THRESHOLD
+from config import PROFILE_DIR, PROFILE_SAMPLE_RATE, PROFILE_MIN_DURATION_MS, PROFILE_INTERVAL_MS, PROFILE_ADMIN_TOKEN
+from utils.compression import response_compressor
+from utils.metrics import init_metrics
+from utils.query_trace import init_query_trace
+from utils.profiler import init_profiler
 import os
 
 app = Flask(__name__)
 CORS(app)  # Enable CORS for all routes
 api = Api(app)
+app.after_request(response_compressor(COMPRESS_MIN_BYTES, COMPRESS_LEVEL))  # gzip/deflate large bodies
+init_metrics(app, METRICS_DIR, METRICS_FLUSH_SECONDS)  # Per-route latency/status metrics on /metrics
+init_query_trace(app, QUERY_TRACE_ENABLED, QUERY_TRACE_REPEAT_THRESHOLD)  # Storage cost per request when debugging
+init_profiler(app, PROFILE_DIR, PROFILE_SAMPLE_RATE, PROFILE_MIN_DURATION_MS, PROFILE_INTERVAL_MS,
+              PROFILE_ADMIN_TOKEN)  # Opt-in sampling profiles of slow or flagged requests
 
 # Register Blueprints
 app.register_blueprint(employee_blueprint, url_prefix="/api/employee")
@@ -1,7 +1,7 @@
 import os
 import json
-import firebase_admin
-from firebase_admin import credentials, firestore
+import itertools
+import threading
 
 # Path for local development (when running with Docker)
 FIREBASE_CREDENTIALS_PATH = "/serviceAccountKey.json"
@@ -9,20 +9,165 @@ FIREBASE_CREDENTIALS_PATH = "/serviceAccountKey.json"
 # Check if credentials are provided as environment variable (for Render.com)
 FIREBASE_CREDENTIALS_JSON = os.environ.get("FIREBASE_CREDENTIALS_JSON")
 
-try:
-    # Try to use environment variable first
-    if FIREBASE_CREDENTIALS_JSON:
-        cred_dict = json.loads(FIREBASE_CREDENTIALS_JSON)
-        cred = credentials.Certificate(cred_dict)
-        firebase_admin.initialize_app(cred)
-    # Fall back to file if environment variable is not set
-    elif os.path.exists(FIREBASE_CREDENTIALS_PATH):
-        cred = credentials.Certificate(FIREBASE_CREDENTIALS_PATH)
-        firebase_admin.initialize_app(cred)
-    else:
-        raise FileNotFoundError(f"Firebase credentials file not found: {FIREBASE_CREDENTIALS_PATH}")
-
-    db = firestore.client()
-except Exception as e:
-    print(f"Error initializing Firebase: {e}")
-    raise
\ No newline at end of file
+# Number of employee IDs each worker leases from the shared counter at a time
+EMPLOYEE_ID_BLOCK_SIZE = int(os.environ.get("EMPLOYEE_ID_BLOCK_SIZE", 10))
+
+# In-process employee directory cache
+EMPLOYEE_CACHE_MAX_SIZE = int(os.environ.get("EMPLOYEE_CACHE_MAX_SIZE", 10000))
+EMPLOYEE_CACHE_TTL_SECONDS = float(os.environ.get("EMPLOYEE_CACHE_TTL_SECONDS", 60))
+
+# Employee search index: incremental refresh and full rebuild intervals
+SEARCH_INDEX_REFRESH_SECONDS = float(os.environ.get("SEARCH_INDEX_REFRESH_SECONDS", 30))
+SEARCH_INDEX_REBUILD_SECONDS = float(os.environ.get("SEARCH_INDEX_REBUILD_SECONDS", 600))
+
+# Production serving (gunicorn.conf.py): worker processes, threads per worker and shutdown grace period
+WEB_WORKERS = int(os.environ.get("WEB_WORKERS", (os.cpu_count() or 1) * 2 + 1))
+WEB_THREADS = int(os.environ.get("WEB_THREADS", 8))
+WEB_TIMEOUT_SECONDS = int(os.environ.get("WEB_TIMEOUT_SECONDS", 60))
+WEB_GRACEFUL_TIMEOUT_SECONDS = int(os.environ.get("WEB_GRACEFUL_TIMEOUT_SECONDS", 30))
+
+# bcrypt hashing pool of each web worker: the CPUs shared out between the WEB_WORKERS pools, at least one thread
+# each, so at most max(CPUs, WEB_WORKERS) hashes run at once (about two per CPU with the default WEB_WORKERS);
+# BCRYPT_ROUNDS pins the cost factor, otherwise BCRYPT_TARGET_MS calibrates it (once, in the gunicorn master)
+BCRYPT_WORKERS = int(os.environ.get("BCRYPT_WORKERS", max(1, (os.cpu_count() or 1) // WEB_WORKERS)))
+BCRYPT_MAX_PENDING = int(os.environ.get("BCRYPT_MAX_PENDING", min(WEB_THREADS, BCRYPT_WORKERS * 4)))
+BCRYPT_ROUNDS = int(os.environ["BCRYPT_ROUNDS"]) if os.environ.get("BCRYPT_ROUNDS") else None
+BCRYPT_TARGET_MS = float(os.environ["BCRYPT_TARGET_MS"]) if os.environ.get("BCRYPT_TARGET_MS") else None
+BCRYPT_RETRY_AFTER_SECONDS = int(os.environ.get("BCRYPT_RETRY_AFTER_SECONDS", 1))
+
+# Largest number of employees accepted by one bulk import request
+BULK_IMPORT_MAX_ROWS = int(os.environ.get("BULK_IMPORT_MAX_ROWS", 10000))
+
+# Largest number of IDs resolved by one batch lookup
+BATCH_GET_MAX_IDS = int(os.environ.get("BATCH_GET_MAX_IDS", 500))
+
+# Write-behind buffer for non-critical updates such as last_login
+WRITE_BEHIND_FLUSH_SECONDS = float(os.environ.get("WRITE_BEHIND_FLUSH_SECONDS", 2))
+WRITE_BEHIND_MAX_BATCH = int(os.environ.get("WRITE_BEHIND_MAX_BATCH", 500))
+WRITE_BEHIND_DRAIN_SECONDS = float(os.environ.get("WRITE_BEHIND_DRAIN_SECONDS", 5))
+
+# Fall back to email queries for employees missing from the employee_emails index.
+# Set to false once "python manage.py backfill-email-index" has been run.
+EMAIL_INDEX_FALLBACK = os.environ.get("EMAIL_INDEX_FALLBACK", "true").lower() == "true"
+
+# Opt in to filtering the whole directory for full designation/department lists while employees written before
+# designation_lower/department_keys existed remain; "python manage.py backfill-designation-index" removes the need
+DESIGNATION_INDEX_FALLBACK = os.environ.get("DESIGNATION_INDEX_FALLBACK", "false").lower() == "true"
+
+# Response encoding: JSON encoder (auto, orjson, ujson or stdlib) and gzip/deflate above a size threshold
+JSON_ENCODER = os.environ.get("JSON_ENCODER", "auto")
+COMPRESS_MIN_BYTES = int(os.environ.get("COMPRESS_MIN_BYTES", 1024))
+COMPRESS_LEVEL = int(os.environ.get("COMPRESS_LEVEL", 6))
+
+# Async data access: most concurrent queries per request and how long a request waits for them
+ASYNC_MAX_CONCURRENCY = int(os.environ.get("ASYNC_MAX_CONCURRENCY", 10))
+ASYNC_QUERY_TIMEOUT_SECONDS = float(os.environ.get("ASYNC_QUERY_TIMEOUT_SECONDS", 30))
+
+# Storage backend: firestore, memory (per process, not persisted) or sqlite (a local file shared by processes)
+STORAGE_BACKEND = os.environ.get("STORAGE_BACKEND", "firestore").lower()
+STORAGE_SQLITE_PATH = os.environ.get("STORAGE_SQLITE_PATH", "people-pilot.db")
+
+# Firestore clients (each with its own gRPC channel) per worker process; request threads are spread over them
+FIRESTORE_CHANNEL_POOL_SIZE = max(1, int(os.environ.get("FIRESTORE_CHANNEL_POOL_SIZE", 2)))
+
+# Prometheus /metrics: directory where each gunicorn worker publishes its metrics (per process when empty)
+METRICS_DIR = os.environ.get("METRICS_DIR", "")
+METRICS_FLUSH_SECONDS = float(os.environ.get("METRICS_FLUSH_SECONDS", 5))
+
+# Per-request storage tracing: X-Query-Trace headers, N+1 warnings and /debug/query-budget (off in production)
+QUERY_TRACE_ENABLED = os.environ.get("QUERY_TRACE_ENABLED", "false").lower() == "true"
+QUERY_TRACE_REPEAT_THRESHOLD = int(os.environ.get("QUERY_TRACE_REPEAT_THRESHOLD", 3))
+
+# Request profiling: requests sent with X-Profile: PROFILE_ADMIN_TOKEN, or a PROFILE_SAMPLE_RATE fraction of requests
+# (kept when slower than PROFILE_MIN_DURATION_MS), are sampled every PROFILE_INTERVAL_MS and written to PROFILE_DIR
+PROFILE_DIR = os.environ.get("PROFILE_DIR", "profiles")
+PROFILE_SAMPLE_RATE = float(os.environ.get("PROFILE_SAMPLE_RATE", 0))
+PROFILE_MIN_DURATION_MS = float(os.environ.get("PROFILE_MIN_DURATION_MS", 500))
+PROFILE_INTERVAL_MS = float(os.environ.get("PROFILE_INTERVAL_MS", 5))
+PROFILE_ADMIN_TOKEN = os.environ.get("PROFILE_ADMIN_TOKEN") or None
+
+_firebase_lock = threading.Lock()
+_clients = []
+_clients_pid = None
+_next_client = itertools.count()
+_thread_client = threading.local()
+_local_client = None
+
+
+def get_firebase_app():
+    """Initialize the Firebase app on first use and return it"""
+    # Firebase libraries are only loaded when the firestore backend is in use
+    import firebase_admin
+    from firebase_admin import credentials
+    with _firebase_lock:
+        try:
+            return firebase_admin.get_app()
+        except ValueError:
+            pass
+        try:
+            # Try to use environment variable first
+            if FIREBASE_CREDENTIALS_JSON:
+                cred_dict = json.loads(FIREBASE_CREDENTIALS_JSON)
+                cred = credentials.Certificate(cred_dict)
+            # Fall back to file if environment variable is not set
+            elif os.path.exists(FIREBASE_CREDENTIALS_PATH):
+                cred = credentials.Certificate(FIREBASE_CREDENTIALS_PATH)
+            else:
+                raise FileNotFoundError(f"Firebase credentials file not found: {FIREBASE_CREDENTIALS_PATH}")
+            return firebase_admin.initialize_app(cred)
+        except Exception as e:
+            print(f"Error initializing Firebase: {e}")
+            raise
+
+
+def get_db():
+    """
+    Return a Firestore client for the calling thread.
+
+    Clients are created lazily in each process, so no gRPC channel is opened
+    before gunicorn forks its workers, and they are recreated if the process
+    has forked since. Each thread sticks to one client of the pool.
+    With a local STORAGE_BACKEND every thread shares one local client instead.
+    """
+    global _clients, _clients_pid, _local_client
+    if STORAGE_BACKEND != "firestore":
+        if _local_client is None:
+            from storage import create_local_client
+            with _firebase_lock:
+                if _local_client is None:
+                    _local_client = create_local_client(STORAGE_BACKEND, STORAGE_SQLITE_PATH)
+        return _local_client
+    if _clients_pid != os.getpid():
+        from google.cloud import firestore
+        app = get_firebase_app()
+        with _firebase_lock:
+            if _clients_pid != os.getpid():
+                credential = app.credential.get_credential()
+                _clients = [firestore.Client(project=app.project_id, credentials=credential)
+                            for _ in range(FIRESTORE_CHANNEL_POOL_SIZE)]
+                _clients_pid = os.getpid()
+    client = getattr(_thread_client, "client", None)
+    if client is None or getattr(_thread_client, "pid", None) != _clients_pid:
+        client = _clients[next(_next_client) % len(_clients)]
+        _thread_client.client, _thread_client.pid = client, _clients_pid
+    return client
+
+
+class _LazyClient:
+    """Stands in for a Firestore client and forwards to get_db(), so modules can keep "from config import db\""""
+
+    def __getattr__(self, name):
+        return getattr(get_db(), name)
+
+
+db = _LazyClient()
+
+
+def create_async_client():
+    """Firestore AsyncClient for the Firebase app; create it on the event loop that will use it"""
+    if STORAGE_BACKEND != "firestore":
+        from storage import AsyncLocalClient
+        return AsyncLocalClient(get_db())
+    from google.cloud import firestore
+    app = get_firebase_app()
+    return firestore.AsyncClient(project=app.project_id, credentials=app.credential.get_credential())
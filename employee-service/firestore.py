@@ -1,35 +1,567 @@
-from config import db
+from datetime import datetime
+import atexit
+from storage import AlreadyExists, NotFound, transactional
+from config import (
+    db, EMPLOYEE_CACHE_MAX_SIZE, EMPLOYEE_CACHE_TTL_SECONDS,
+    WRITE_BEHIND_FLUSH_SECONDS, WRITE_BEHIND_MAX_BATCH, WRITE_BEHIND_DRAIN_SECONDS
+)
+from utils.collection_version import CollectionVersion
+from utils.directory_cache import DirectoryCache
+from utils.metrics import mark_cached, track_storage
+from utils.write_behind import WriteBehindBuffer
+
+# Cache key for the full ordered listing of a collection
+ALL_DOCUMENTS_KEY = ("__all__",)
+
+# Firestore limit on the number of writes in one batch
+MAX_BATCH_WRITES = 500
+# Firestore limit on the number of values in an "in" filter
+MAX_IN_QUERY_VALUES = 10
+# Field of a unique-key document (e.g. employee_emails/{email}) holding the owning document's ID
+KEY_OWNER_FIELD = "employee_id"
+# add_documents error for a document whose unique key already belongs to another document
+KEY_TAKEN_ERROR = "Unique key already taken"
+
+
+def apply_write_to_cache(caches, collection, doc_id, data=None, merge=False):
+    """Keep a collection cache consistent after a write (data=None means deleted)"""
+    cache = caches.get(collection)
+    if cache is None:
+        return
+    cache.invalidate(ALL_DOCUMENTS_KEY)
+    if data is None:
+        cache.invalidate(doc_id)
+    elif merge:
+        cache.update(doc_id, data)
+    else:
+        cache.put(doc_id, dict(data))
+
 
 class FirestoreDB:
-    def __init__(self):
+    def __init__(self, cached_collections=()):
         self.db = db  # ✅ Use the already initialized Firestore client
-        
+        # Write-through caches for collections that are read far more often than written
+        self.caches = {
+            collection: DirectoryCache(EMPLOYEE_CACHE_MAX_SIZE, EMPLOYEE_CACHE_TTL_SECONDS)
+            for collection in cached_collections
+        }
+        # Shared version of each cached collection: bumped by every write, used for ETags and
+        # to drop this worker's cache when another worker wrote
+        self.versions = {collection: CollectionVersion(self.db, collection) for collection in cached_collections}
+        for collection, version in self.versions.items():
+            version.subscribe(self.caches[collection].clear)
+        # Non-critical updates (e.g. last_login) are coalesced and written in the background
+        self.write_behind = WriteBehindBuffer(self._flush_deferred, WRITE_BEHIND_FLUSH_SECONDS, WRITE_BEHIND_MAX_BATCH)
+        atexit.register(self.write_behind.drain, WRITE_BEHIND_DRAIN_SECONDS)
+
+    def _document_written(self, collection, doc_id, data=None, merge=False):
+        """Keep the collection cache consistent after a write (data=None means deleted)"""
+        apply_write_to_cache(self.caches, collection, doc_id, data, merge)
+
+    def _bump_version(self, collection):
+        """Tell every worker that a collection changed (call once per write operation)"""
+        version = self.versions.get(collection)
+        if version is not None:
+            version.bump()
+
+    @track_storage("read", documents=lambda version: 0)
+    def collection_version(self, collection):
+        """
+        Current version of a cached collection; it changes whenever any worker writes to it.
+
+        Served from the version listener when the backend has one, otherwise the
+        version document is read.
+        """
+        version, read = self.versions[collection].current()
+        if not read:
+            mark_cached()
+        return version
+
+    def defer_update(self, collection, doc_id, data):
+        """
+        Queue a non-critical field update to be written in the background.
+
+        The cached document reflects the change immediately. The full listing cache
+        is left alone, so listings may show the old value until their TTL expires.
+        This worker's ETags change at once; other workers see the change when the
+        buffer is flushed.
+        """
+        cache = self.caches.get(collection)
+        if cache is not None:
+            cache.update(doc_id, data)
+        version = self.versions.get(collection)
+        if version is not None:
+            version.touch()
+        self.write_behind.enqueue(collection, doc_id, data)
+
+    @track_storage("write")
+    def _flush_deferred(self, pending):
+        """Write {(collection, doc_id): fields} from the write-behind buffer in batches"""
+        items = list(pending.items())
+        for start in range(0, len(items), MAX_BATCH_WRITES):
+            chunk = items[start:start + MAX_BATCH_WRITES]
+            batch = self.db.batch()
+            for (collection, doc_id), data in chunk:
+                batch.update(self.db.collection(collection).document(doc_id), data)
+            try:
+                batch.commit()
+            except NotFound:
+                # A document was deleted after its update was queued; write the rest one by one
+                for (collection, doc_id), data in chunk:
+                    try:
+                        self.db.collection(collection).document(doc_id).update(data)
+                    except NotFound:
+                        pass
+        for collection in {collection for collection, _ in items}:
+            self._bump_version(collection)
+
+    def cache_stats(self):
+        """Hit/miss counters for every cached collection"""
+        return {collection: cache.stats() for collection, cache in self.caches.items()}
+
+    @track_storage("write")
     def add_document(self, collection, doc_id, data):
         self.db.collection(collection).document(doc_id).set(data)
+        self._document_written(collection, doc_id, data)
+        self._bump_version(collection)
+
+    @track_storage("read")
+    def get_document(self, collection, doc_id, cached=True):
+        """
+        Get one document, from the collection cache when it holds a copy.
 
-    def get_document(self, collection, doc_id):
+        Pass cached=False where a stale copy would be wrong (authentication, key swaps):
+        the document is then read from storage and the cached copy refreshed.
+        """
+        cache = self.caches.get(collection)
+        if cache is not None:
+            copy = cache.get(doc_id) if cached else None
+            if copy is not None:
+                mark_cached()
+                return dict(copy)
+            generation = cache.generation
         doc = self.db.collection(collection).document(doc_id).get()
-        return doc.to_dict() if doc.exists else None
+        if not doc.exists:
+            return None
+        data = doc.to_dict()
+        if cache is not None:
+            cache.put(doc_id, data, generation)
+            return dict(data)
+        return data
+
+    @track_storage("read", documents=len)
+    def get_documents(self, collection, ids, fields=None):
+        """
+        Get many documents by ID in one batched round trip.
+
+        Cached documents are served from memory; the rest are fetched together with get_all.
 
+        Args:
+            collection (str): Collection name
+            ids (list): Document IDs
+            fields (list, optional): Field paths to return; all fields when omitted
+
+        Returns:
+            dict: {doc_id: data} for the documents that exist
+        """
+        found = {}
+        cache = self.caches.get(collection)
+        missing = []
+        for doc_id in dict.fromkeys(ids):
+            cached = cache.get(doc_id) if cache is not None else None
+            if cached is not None:
+                found[doc_id] = cached
+            else:
+                missing.append(doc_id)
+
+        if not missing:
+            mark_cached()
+        else:
+            generation = cache.generation if cache is not None else None
+            refs = [self.db.collection(collection).document(doc_id) for doc_id in missing]
+            # Fetch whole documents for cached collections so they can be cached
+            field_paths = fields if cache is None else None
+            for doc in self.db.get_all(refs, field_paths=field_paths):
+                if not doc.exists:
+                    continue
+                data = doc.to_dict()
+                if cache is not None:
+                    cache.put(doc.id, data, generation)
+                found[doc.id] = data
+
+        if fields:
+            return {doc_id: {field: data[field] for field in fields if field in data} for doc_id, data in found.items()}
+        return {doc_id: dict(data) for doc_id, data in found.items()}
+
+    @track_storage("read")
     def get_all_documents(self, collection):
+        """Get every document ordered by newest first (the returned dicts are shared with the cache, do not mutate them)"""
+        cache = self.caches.get(collection)
+        if cache is not None:
+            cached = cache.get(ALL_DOCUMENTS_KEY)
+            if cached is not None:
+                mark_cached()
+                return list(cached)
+            generation = cache.generation
         docs = self.db.collection(collection).order_by('created_at', direction='DESCENDING').stream()
+        results = [doc.to_dict() for doc in docs]
+        if cache is not None:
+            cache.put(ALL_DOCUMENTS_KEY, results, generation)
+            return list(results)
+        return results
+
+    def _ordered_query(self, collection, filters=None, fields=None):
+        """Build a newest-first query with optional (field, op, value) filters and a field projection"""
+        query = self.db.collection(collection)
+        for field_name, op, value in filters or ():
+            query = query.where(field_name, op, value)
+        query = query.order_by('created_at', direction='DESCENDING')
+        if fields:
+            query = query.select(fields)
+        return query
+
+    @track_storage("read", documents=lambda page: len(page[0]))
+    def get_documents_page(self, collection, limit, cursor=None, fields=None, filters=None):
+        """
+        Get one page of documents ordered by newest first.
+
+        Args:
+            collection (str): Collection name
+            limit (int): Maximum number of documents to return
+            cursor (str, optional): ID of the last document of the previous page
+            fields (list, optional): Field paths to project; all fields when omitted
+            filters (list, optional): (field, op, value) conditions, e.g. [("designation_lower", "==", "qa engineer")]
+
+        Returns:
+            tuple: (documents, next_cursor) where next_cursor is None on the last page
+        """
+        query = self._ordered_query(collection, filters, fields)
+        if cursor:
+            snapshot = self.db.collection(collection).document(cursor).get()
+            if not snapshot.exists:
+                raise ValueError(f"Invalid cursor: {cursor}")
+            query = query.start_after(snapshot)
+
+        docs = list(query.limit(limit).stream())
+        next_cursor = docs[-1].id if len(docs) == limit else None
+        return [doc.to_dict() for doc in docs], next_cursor
+
+    @track_storage("read")
+    def query_documents(self, collection, filters, fields=None):
+        """Get every document matching (field, op, value) filters, newest first"""
+        docs = self._ordered_query(collection, filters, fields).stream()
         return [doc.to_dict() for doc in docs]
-        
+
+    @track_storage("read")
+    def iter_documents(self, collection, fields=None, filters=None):
+        """
+        Yield documents newest first without building a list.
+
+        Unfiltered reads are served from the cached listing when it is warm; otherwise
+        documents come straight off the Firestore stream (and are not cached).
+        """
+        cache = self.caches.get(collection)
+        cached = cache.get(ALL_DOCUMENTS_KEY) if cache is not None and not filters else None
+        if cached is not None:
+            mark_cached()
+            for data in cached:
+                yield {field: data[field] for field in fields if field in data} if fields else data
+            return
+        for doc in self._ordered_query(collection, filters, fields).stream():
+            yield doc.to_dict()
+
+    @track_storage("read")
+    def stream_documents(self, collection, fields=None):
+        """Yield (id, data) for every document in a collection without building a list"""
+        query = self.db.collection(collection)
+        if fields is not None:
+            query = query.select(fields)
+        for doc in query.stream():
+            yield doc.id, doc.to_dict()
+
+    @track_storage("read")
+    def get_existing_field_values(self, collection, field_name, values):
+        """Return which of values already appear in field_name, using batched "in" queries"""
+        values = list(dict.fromkeys(values))
+        found = set()
+        for start in range(0, len(values), MAX_IN_QUERY_VALUES):
+            chunk = values[start:start + MAX_IN_QUERY_VALUES]
+            docs = self.db.collection(collection).where(field_name, "in", chunk).select([field_name]).stream()
+            found.update(doc.to_dict().get(field_name) for doc in docs)
+        return found
+
+    @track_storage("write")
+    def add_documents(self, collection, documents, keys=None):
+        """
+        Write {doc_id: data} documents using batched commits of up to 500 writes.
+
+        Unique-key documents are created (never overwritten) in the same batch as their
+        document, so a key claimed in the meantime by a registration or another import
+        makes the commit fail. The documents of a failed batch are then retried one by
+        one, so only those whose key is taken fail.
+
+        Args:
+            collection (str): Collection name
+            documents (dict): {doc_id: data}
+            keys (dict, optional): {doc_id: (key_collection, key)} unique-key documents
+                written in the same batch as their document
+
+        Returns:
+            dict: {doc_id: error message} for documents that were not written
+                (KEY_TAKEN_ERROR when their key belongs to another document)
+        """
+        keys = keys or {}
+        items = list(documents.items())
+        per_batch = MAX_BATCH_WRITES // 2 if keys else MAX_BATCH_WRITES
+        failed = {}
+        for start in range(0, len(items), per_batch):
+            chunk = items[start:start + per_batch]
+            try:
+                self._commit_documents(collection, chunk, keys)
+            except AlreadyExists:
+                for doc_id, data in chunk:
+                    try:
+                        self._commit_documents(collection, [(doc_id, data)], keys)
+                    except AlreadyExists:
+                        failed[doc_id] = KEY_TAKEN_ERROR
+                    except Exception as e:
+                        print(f"Error writing {doc_id} to {collection}: {str(e)}")
+                        failed[doc_id] = str(e)
+            except Exception as e:
+                print(f"Error committing batch to {collection}: {str(e)}")
+                failed.update((doc_id, str(e)) for doc_id, _ in chunk)
+        if len(failed) < len(items):
+            self._bump_version(collection)
+        return failed
+
+    def _commit_documents(self, collection, chunk, keys):
+        batch = self.db.batch()
+        for doc_id, data in chunk:
+            batch.set(self.db.collection(collection).document(doc_id), data)
+            if doc_id in keys:
+                key_collection, key = keys[doc_id]
+                batch.create(self.db.collection(key_collection).document(key), {KEY_OWNER_FIELD: doc_id})
+        batch.commit()
+        for doc_id, data in chunk:
+            self._document_written(collection, doc_id, data)
+
+    @track_storage("read")
+    def get_key_owner(self, key_collection, key):
+        """Return the ID of the document that holds a unique key, or None"""
+        doc = self.db.collection(key_collection).document(key).get()
+        return (doc.to_dict() or {}).get(KEY_OWNER_FIELD) if doc.exists else None
+
+    @track_storage("read", documents=len)
+    def get_key_owners(self, key_collection, keys):
+        """Return {key: owner_id} for the keys that are taken, using batched reads"""
+        refs = [self.db.collection(key_collection).document(key) for key in dict.fromkeys(keys)]
+        owners = {}
+        for start in range(0, len(refs), MAX_BATCH_WRITES):
+            for doc in self.db.get_all(refs[start:start + MAX_BATCH_WRITES]):
+                if doc.exists:
+                    owners[doc.id] = (doc.to_dict() or {}).get(KEY_OWNER_FIELD)
+        return owners
+
+    @track_storage("write")
+    def add_document_with_key(self, collection, doc_id, data, key_collection, key):
+        """
+        Create a document together with its unique-key document in one transaction.
+
+        Returns:
+            bool: False (and nothing written) if the key already belongs to another document
+        """
+        doc_ref = self.db.collection(collection).document(doc_id)
+        key_ref = self.db.collection(key_collection).document(key)
+
+        @transactional
+        def _add(transaction):
+            if key_ref.get(transaction=transaction).exists:
+                return False
+            transaction.set(key_ref, {KEY_OWNER_FIELD: doc_id})
+            transaction.set(doc_ref, data)
+            return True
+
+        added = _add(self.db.transaction())
+        if added:
+            self._document_written(collection, doc_id, data)
+            self._bump_version(collection)
+        return added
+
+    @track_storage("write")
+    def update_document_with_key(self, collection, doc_id, data, key_collection, new_key, key_of):
+        """
+        Update a document and move its unique key to new_key in one transaction.
+
+        The key being released is taken from the document as read inside the
+        transaction, never from a cached copy, so a change made by another worker
+        cannot leave its key document orphaned.
+
+        Args:
+            key_of (callable): Returns the unique key of a stored document (None if it has none)
+
+        Returns:
+            bool: False (and nothing written) if new_key already belongs to another document
+        """
+        doc_ref = self.db.collection(collection).document(doc_id)
+        new_key_ref = self.db.collection(key_collection).document(new_key)
+
+        @transactional
+        def _update(transaction):
+            current = doc_ref.get(transaction=transaction)
+            snapshot = new_key_ref.get(transaction=transaction)
+            if snapshot.exists and (snapshot.to_dict() or {}).get(KEY_OWNER_FIELD) != doc_id:
+                return False
+            old_key = key_of(current.to_dict() or {}) if current.exists else None
+            if old_key and old_key != new_key:
+                transaction.delete(self.db.collection(key_collection).document(old_key))
+            transaction.set(new_key_ref, {KEY_OWNER_FIELD: doc_id})
+            transaction.update(doc_ref, data)
+            return True
+
+        updated = _update(self.db.transaction())
+        if updated:
+            self._document_written(collection, doc_id, data, merge=True)
+            self._bump_version(collection)
+        return updated
+
+    @track_storage("write")
+    def delete_document_with_key(self, collection, doc_id, key_collection, key_of):
+        """
+        Delete a document and its unique-key document together.
+
+        Args:
+            key_of (callable): Returns the unique key of the stored document, read inside the transaction
+        """
+        doc_ref = self.db.collection(collection).document(doc_id)
+
+        @transactional
+        def _delete(transaction):
+            current = doc_ref.get(transaction=transaction)
+            key = key_of(current.to_dict() or {}) if current.exists else None
+            if key:
+                transaction.delete(self.db.collection(key_collection).document(key))
+            transaction.delete(doc_ref)
+
+        _delete(self.db.transaction())
+        self._document_written(collection, doc_id)
+        self._bump_version(collection)
+
+    @track_storage("write")
+    def set_key_owners(self, key_collection, owners):
+        """
+        Create {key: owner_id} unique-key documents in batches (used for backfills).
+
+        Keys that already have an owner are left alone, including ones claimed while
+        the backfill runs.
+
+        Returns:
+            int: Number of key documents created
+        """
+        items = list(owners.items())
+        written = 0
+        for start in range(0, len(items), MAX_BATCH_WRITES):
+            chunk = items[start:start + MAX_BATCH_WRITES]
+            try:
+                self._create_key_owners(key_collection, chunk)
+                written += len(chunk)
+            except AlreadyExists:
+                for key, owner_id in chunk:
+                    try:
+                        self._create_key_owners(key_collection, [(key, owner_id)])
+                        written += 1
+                    except AlreadyExists:
+                        print(f"Skipping {key}: already owned in {key_collection}")
+        return written
+
+    def _create_key_owners(self, key_collection, chunk):
+        batch = self.db.batch()
+        for key, owner_id in chunk:
+            batch.create(self.db.collection(key_collection).document(key), {KEY_OWNER_FIELD: owner_id})
+        batch.commit()
+
+    @track_storage("write")
+    def update_documents(self, collection, updates):
+        """Apply {doc_id: fields} updates using batched writes of up to 500 documents"""
+        items = list(updates.items())
+        for start in range(0, len(items), MAX_BATCH_WRITES):
+            batch = self.db.batch()
+            chunk = items[start:start + MAX_BATCH_WRITES]
+            for doc_id, data in chunk:
+                batch.update(self.db.collection(collection).document(doc_id), data)
+            batch.commit()
+            for doc_id, data in chunk:
+                self._document_written(collection, doc_id, data, merge=True)
+        if items:
+            self._bump_version(collection)
+        return len(items)
+
+    @track_storage("read")
     def get_document_by_field(self, collection, field_name, field_value):
         docs = self.db.collection(collection).where(field_name, "==", field_value).limit(1).stream()
         for doc in docs:
             return doc.to_dict()  # Return the first matching document
         return None  # Return None if no document found
     
+    @track_storage("write")
     def update_document(self, collection, doc_id, data):
         """Update fields in a document"""
         self.db.collection(collection).document(doc_id).update(data)
+        self._document_written(collection, doc_id, data, merge=True)
+        self._bump_version(collection)
         
+    @track_storage("write")
     def delete_document(self, collection, doc_id):
         """Delete a document"""
         self.db.collection(collection).document(doc_id).delete()
+        self._document_written(collection, doc_id)
+        self._bump_version(collection)
         
+    @track_storage("read")
     def get_documents_by_field(self, collection, field_name, field_value):
         """Get all documents matching a field value"""
         docs = self.db.collection(collection).where(field_name, "==", field_value).stream()
-        return [doc.to_dict() for doc in docs]
\ No newline at end of file
+        return [doc.to_dict() for doc in docs]
+
+    @track_storage("read")
+    def get_documents_after(self, collection, field_name, field_value):
+        """Get all documents whose field is greater than a value (e.g. changed since a timestamp)"""
+        docs = self.db.collection(collection).where(field_name, ">", field_value).stream()
+        return [doc.to_dict() for doc in docs]
+
+    @track_storage("read")
+    def get_document_ids(self, collection):
+        """Get the IDs of every document in a collection without reading field data"""
+        docs = self.db.collection(collection).select(["__name__"]).stream()
+        return [doc.id for doc in docs]
+
+    @track_storage("write")
+    def create_counter(self, collection, doc_id, field, value):
+        """Create a counter document if it does not exist yet, returning the stored value"""
+        ref = self.db.collection(collection).document(doc_id)
+
+        @transactional
+        def _create(transaction):
+            snapshot = ref.get(transaction=transaction)
+            if snapshot.exists:
+                return (snapshot.to_dict() or {}).get(field)
+            transaction.set(ref, {field: value, "updated_at": datetime.utcnow().isoformat()})
+            return value
+
+        return _create(self.db.transaction())
+
+    @track_storage("write")
+    def increment_counter(self, collection, doc_id, field, amount):
+        """Atomically add amount to a counter and return the new value (None if the counter is missing)"""
+        ref = self.db.collection(collection).document(doc_id)
+
+        @transactional
+        def _increment(transaction):
+            snapshot = ref.get(transaction=transaction)
+            current = (snapshot.to_dict() or {}).get(field) if snapshot.exists else None
+            if current is None:
+                return None
+            new_value = current + amount
+            transaction.update(ref, {field: new_value, "updated_at": datetime.utcnow().isoformat()})
+            return new_value
+
+        return _increment(self.db.transaction())
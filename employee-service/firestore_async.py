@@ -0,0 +1,420 @@
+import os
+from datetime import datetime
+from storage import AlreadyExists, async_transactional
+from config import create_async_client, ASYNC_MAX_CONCURRENCY
+from firestore import (
+    ALL_DOCUMENTS_KEY, MAX_BATCH_WRITES, MAX_IN_QUERY_VALUES, KEY_OWNER_FIELD, KEY_TAKEN_ERROR, apply_write_to_cache
+)
+from utils.async_bridge import gather_limited
+from utils.collection_version import VERSIONS_COLLECTION
+from utils.metrics import storage_operation
+
+
+class AsyncFirestoreDB:
+    """
+    Async counterpart of FirestoreDB built on Firestore's AsyncClient.
+
+    Methods mirror FirestoreDB but are coroutines, so independent reads can be
+    awaited together with asyncio.gather. Run them on the background loop from
+    Flask handlers with utils.async_bridge.run_async.
+
+    Args:
+        caches (dict, optional): The synchronous wrapper's collection caches
+            (FirestoreDB.caches), shared so both wrappers read and invalidate the same data
+        versions (dict, optional): The synchronous wrapper's collection versions
+            (FirestoreDB.versions), bumped by writes made here too
+    """
+
+    def __init__(self, caches=None, versions=None):
+        self.caches = caches if caches is not None else {}
+        self.versions = versions if versions is not None else {}
+        self._client = None
+        self._client_pid = None
+
+    @property
+    def db(self):
+        # The client binds to the event loop it is first used on, so create it lazily (once per process)
+        if self._client is None or self._client_pid != os.getpid():
+            self._client = create_async_client()
+            self._client_pid = os.getpid()
+        return self._client
+
+    def _document_written(self, collection, doc_id, data=None, merge=False):
+        apply_write_to_cache(self.caches, collection, doc_id, data, merge)
+
+    async def _bump_version(self, collection):
+        """Tell every worker that a collection changed (call once per write operation)"""
+        version = self.versions.get(collection)
+        if version is not None:
+            await self.db.collection(VERSIONS_COLLECTION).document(collection).set(version.next_version())
+
+    async def _fetch(self, query):
+        return [doc.to_dict() async for doc in query.stream()]
+
+    async def add_document(self, collection, doc_id, data):
+        await self.db.collection(collection).document(doc_id).set(data)
+        self._document_written(collection, doc_id, data)
+        await self._bump_version(collection)
+
+    async def get_document(self, collection, doc_id, cached=True):
+        """Get one document, from the collection cache unless cached=False (then the cached copy is refreshed)"""
+        cache = self.caches.get(collection)
+        if cache is not None:
+            copy = cache.get(doc_id) if cached else None
+            if copy is not None:
+                return dict(copy)
+            generation = cache.generation
+        doc = await self.db.collection(collection).document(doc_id).get()
+        if not doc.exists:
+            return None
+        data = doc.to_dict()
+        if cache is not None:
+            cache.put(doc_id, data, generation)
+            return dict(data)
+        return data
+
+    async def get_documents(self, collection, ids, fields=None):
+        """Get many documents by ID in one batched round trip; returns {doc_id: data} for those that exist"""
+        found = {}
+        cache = self.caches.get(collection)
+        missing = []
+        for doc_id in dict.fromkeys(ids):
+            cached = cache.get(doc_id) if cache is not None else None
+            if cached is not None:
+                found[doc_id] = cached
+            else:
+                missing.append(doc_id)
+
+        if missing:
+            generation = cache.generation if cache is not None else None
+            refs = [self.db.collection(collection).document(doc_id) for doc_id in missing]
+            # Fetch whole documents for cached collections so they can be cached
+            field_paths = fields if cache is None else None
+            async for doc in self.db.get_all(refs, field_paths=field_paths):
+                if not doc.exists:
+                    continue
+                data = doc.to_dict()
+                if cache is not None:
+                    cache.put(doc.id, data, generation)
+                found[doc.id] = data
+
+        if fields:
+            return {doc_id: {field: data[field] for field in fields if field in data} for doc_id, data in found.items()}
+        return {doc_id: dict(data) for doc_id, data in found.items()}
+
+    async def get_all_documents(self, collection):
+        """Get every document ordered by newest first (the returned dicts are shared with the cache, do not mutate them)"""
+        cache = self.caches.get(collection)
+        if cache is not None:
+            cached = cache.get(ALL_DOCUMENTS_KEY)
+            if cached is not None:
+                return list(cached)
+            generation = cache.generation
+        results = await self._fetch(self.db.collection(collection).order_by('created_at', direction='DESCENDING'))
+        if cache is not None:
+            cache.put(ALL_DOCUMENTS_KEY, results, generation)
+            return list(results)
+        return results
+
+    def _ordered_query(self, collection, filters=None, fields=None):
+        """Build a newest-first query with optional (field, op, value) filters and a field projection"""
+        query = self.db.collection(collection)
+        for field_name, op, value in filters or ():
+            query = query.where(field_name, op, value)
+        query = query.order_by('created_at', direction='DESCENDING')
+        if fields:
+            query = query.select(fields)
+        return query
+
+    async def get_documents_page(self, collection, limit, cursor=None, fields=None, filters=None):
+        """Get one page of documents ordered by newest first; returns (documents, next_cursor)"""
+        query = self._ordered_query(collection, filters, fields)
+        if cursor:
+            snapshot = await self.db.collection(collection).document(cursor).get()
+            if not snapshot.exists:
+                raise ValueError(f"Invalid cursor: {cursor}")
+            query = query.start_after(snapshot)
+
+        docs = [doc async for doc in query.limit(limit).stream()]
+        next_cursor = docs[-1].id if len(docs) == limit else None
+        return [doc.to_dict() for doc in docs], next_cursor
+
+    async def query_documents(self, collection, filters, fields=None):
+        """Get every document matching (field, op, value) filters, newest first"""
+        return await self._fetch(self._ordered_query(collection, filters, fields))
+
+    async def query_many(self, queries, limit=ASYNC_MAX_CONCURRENCY):
+        """
+        Run several query_documents calls concurrently.
+
+        Args:
+            queries (list): (collection, filters, fields) tuples
+            limit (int): Most queries in flight at once
+
+        Returns:
+            list: One result list per query, in input order
+        """
+        return await gather_limited((self.query_documents(*query) for query in queries), limit)
+
+    async def iter_documents(self, collection, fields=None, filters=None):
+        """Yield documents newest first without building a list, from the cached listing when it is warm"""
+        cache = self.caches.get(collection)
+        cached = cache.get(ALL_DOCUMENTS_KEY) if cache is not None and not filters else None
+        if cached is not None:
+            for data in cached:
+                yield {field: data[field] for field in fields if field in data} if fields else data
+            return
+        async for doc in self._ordered_query(collection, filters, fields).stream():
+            yield doc.to_dict()
+
+    async def stream_documents(self, collection, fields=None):
+        """Yield (id, data) for every document in a collection without building a list"""
+        query = self.db.collection(collection)
+        if fields is not None:
+            query = query.select(fields)
+        async for doc in query.stream():
+            yield doc.id, doc.to_dict()
+
+    async def get_existing_field_values(self, collection, field_name, values):
+        """Return which of values already appear in field_name, running the "in" queries concurrently"""
+        values = list(dict.fromkeys(values))
+        chunks = [values[start:start + MAX_IN_QUERY_VALUES] for start in range(0, len(values), MAX_IN_QUERY_VALUES)]
+        queries = (self._fetch(self.db.collection(collection).where(field_name, "in", chunk).select([field_name]))
+                   for chunk in chunks)
+        found = set()
+        with storage_operation("get_existing_field_values", "read", f"get_existing_field_values:{collection}") as call:
+            for docs in await gather_limited(queries, ASYNC_MAX_CONCURRENCY):
+                found.update(doc.get(field_name) for doc in docs)
+            call.documents = len(found)
+        return found
+
+    async def add_documents(self, collection, documents, keys=None):
+        """
+        Write {doc_id: data} documents in batches, creating their unique-key documents in the same batch.
+
+        Returns:
+            dict: {doc_id: error message} for documents that were not written
+                (KEY_TAKEN_ERROR when their key belongs to another document)
+        """
+        keys = keys or {}
+        items = list(documents.items())
+        per_batch = MAX_BATCH_WRITES // 2 if keys else MAX_BATCH_WRITES
+        failed = {}
+        for start in range(0, len(items), per_batch):
+            chunk = items[start:start + per_batch]
+            try:
+                await self._commit_documents(collection, chunk, keys)
+            except AlreadyExists:
+                for doc_id, data in chunk:
+                    try:
+                        await self._commit_documents(collection, [(doc_id, data)], keys)
+                    except AlreadyExists:
+                        failed[doc_id] = KEY_TAKEN_ERROR
+                    except Exception as e:
+                        print(f"Error writing {doc_id} to {collection}: {str(e)}")
+                        failed[doc_id] = str(e)
+            except Exception as e:
+                print(f"Error committing batch to {collection}: {str(e)}")
+                failed.update((doc_id, str(e)) for doc_id, _ in chunk)
+        if len(failed) < len(items):
+            await self._bump_version(collection)
+        return failed
+
+    async def _commit_documents(self, collection, chunk, keys):
+        batch = self.db.batch()
+        for doc_id, data in chunk:
+            batch.set(self.db.collection(collection).document(doc_id), data)
+            if doc_id in keys:
+                key_collection, key = keys[doc_id]
+                batch.create(self.db.collection(key_collection).document(key), {KEY_OWNER_FIELD: doc_id})
+        await batch.commit()
+        for doc_id, data in chunk:
+            self._document_written(collection, doc_id, data)
+
+    async def get_key_owner(self, key_collection, key):
+        """Return the ID of the document that holds a unique key, or None"""
+        doc = await self.db.collection(key_collection).document(key).get()
+        return (doc.to_dict() or {}).get(KEY_OWNER_FIELD) if doc.exists else None
+
+    async def get_key_owners(self, key_collection, keys):
+        """Return {key: owner_id} for the keys that are taken, using batched reads"""
+        refs = [self.db.collection(key_collection).document(key) for key in dict.fromkeys(keys)]
+        owners = {}
+        with storage_operation("get_key_owners", "read", f"get_key_owners:{key_collection}") as call:
+            for start in range(0, len(refs), MAX_BATCH_WRITES):
+                async for doc in self.db.get_all(refs[start:start + MAX_BATCH_WRITES]):
+                    if doc.exists:
+                        owners[doc.id] = (doc.to_dict() or {}).get(KEY_OWNER_FIELD)
+            call.documents = len(owners)
+        return owners
+
+    async def add_document_with_key(self, collection, doc_id, data, key_collection, key):
+        """Create a document together with its unique-key document; False if the key is taken"""
+        doc_ref = self.db.collection(collection).document(doc_id)
+        key_ref = self.db.collection(key_collection).document(key)
+
+        @async_transactional
+        async def _add(transaction):
+            if (await key_ref.get(transaction=transaction)).exists:
+                return False
+            transaction.set(key_ref, {KEY_OWNER_FIELD: doc_id})
+            transaction.set(doc_ref, data)
+            return True
+
+        added = await _add(self.db.transaction())
+        if added:
+            self._document_written(collection, doc_id, data)
+            await self._bump_version(collection)
+        return added
+
+    async def update_document_with_key(self, collection, doc_id, data, key_collection, new_key, key_of):
+        """
+        Update a document and move its unique key to new_key in one transaction; False if new_key is taken.
+
+        Args:
+            key_of (callable): Returns the unique key of the stored document, read inside the transaction
+        """
+        doc_ref = self.db.collection(collection).document(doc_id)
+        new_key_ref = self.db.collection(key_collection).document(new_key)
+
+        @async_transactional
+        async def _update(transaction):
+            current = await doc_ref.get(transaction=transaction)
+            snapshot = await new_key_ref.get(transaction=transaction)
+            if snapshot.exists and (snapshot.to_dict() or {}).get(KEY_OWNER_FIELD) != doc_id:
+                return False
+            old_key = key_of(current.to_dict() or {}) if current.exists else None
+            if old_key and old_key != new_key:
+                transaction.delete(self.db.collection(key_collection).document(old_key))
+            transaction.set(new_key_ref, {KEY_OWNER_FIELD: doc_id})
+            transaction.update(doc_ref, data)
+            return True
+
+        updated = await _update(self.db.transaction())
+        if updated:
+            self._document_written(collection, doc_id, data, merge=True)
+            await self._bump_version(collection)
+        return updated
+
+    async def delete_document_with_key(self, collection, doc_id, key_collection, key_of):
+        """
+        Delete a document and its unique-key document together.
+
+        Args:
+            key_of (callable): Returns the unique key of the stored document, read inside the transaction
+        """
+        doc_ref = self.db.collection(collection).document(doc_id)
+
+        @async_transactional
+        async def _delete(transaction):
+            current = await doc_ref.get(transaction=transaction)
+            key = key_of(current.to_dict() or {}) if current.exists else None
+            if key:
+                transaction.delete(self.db.collection(key_collection).document(key))
+            transaction.delete(doc_ref)
+
+        await _delete(self.db.transaction())
+        self._document_written(collection, doc_id)
+        await self._bump_version(collection)
+
+    async def set_key_owners(self, key_collection, owners):
+        """
+        Create {key: owner_id} unique-key documents in batches (used for backfills).
+
+        Keys that already have an owner are left alone. Returns the number of key documents created.
+        """
+        items = list(owners.items())
+        written = 0
+        for start in range(0, len(items), MAX_BATCH_WRITES):
+            chunk = items[start:start + MAX_BATCH_WRITES]
+            try:
+                await self._create_key_owners(key_collection, chunk)
+                written += len(chunk)
+            except AlreadyExists:
+                for key, owner_id in chunk:
+                    try:
+                        await self._create_key_owners(key_collection, [(key, owner_id)])
+                        written += 1
+                    except AlreadyExists:
+                        print(f"Skipping {key}: already owned in {key_collection}")
+        return written
+
+    async def _create_key_owners(self, key_collection, chunk):
+        batch = self.db.batch()
+        for key, owner_id in chunk:
+            batch.create(self.db.collection(key_collection).document(key), {KEY_OWNER_FIELD: owner_id})
+        await batch.commit()
+
+    async def update_documents(self, collection, updates):
+        """Apply {doc_id: fields} updates using batched writes of up to 500 documents"""
+        items = list(updates.items())
+        for start in range(0, len(items), MAX_BATCH_WRITES):
+            batch = self.db.batch()
+            chunk = items[start:start + MAX_BATCH_WRITES]
+            for doc_id, data in chunk:
+                batch.update(self.db.collection(collection).document(doc_id), data)
+            await batch.commit()
+            for doc_id, data in chunk:
+                self._document_written(collection, doc_id, data, merge=True)
+        if items:
+            await self._bump_version(collection)
+        return len(items)
+
+    async def get_document_by_field(self, collection, field_name, field_value):
+        async for doc in self.db.collection(collection).where(field_name, "==", field_value).limit(1).stream():
+            return doc.to_dict()  # Return the first matching document
+        return None
+
+    async def update_document(self, collection, doc_id, data):
+        """Update fields in a document"""
+        await self.db.collection(collection).document(doc_id).update(data)
+        self._document_written(collection, doc_id, data, merge=True)
+        await self._bump_version(collection)
+
+    async def delete_document(self, collection, doc_id):
+        """Delete a document"""
+        await self.db.collection(collection).document(doc_id).delete()
+        self._document_written(collection, doc_id)
+        await self._bump_version(collection)
+
+    async def get_documents_by_field(self, collection, field_name, field_value):
+        """Get all documents matching a field value"""
+        return await self._fetch(self.db.collection(collection).where(field_name, "==", field_value))
+
+    async def get_documents_after(self, collection, field_name, field_value):
+        """Get all documents whose field is greater than a value (e.g. changed since a timestamp)"""
+        return await self._fetch(self.db.collection(collection).where(field_name, ">", field_value))
+
+    async def get_document_ids(self, collection):
+        """Get the IDs of every document in a collection without reading field data"""
+        return [doc.id async for doc in self.db.collection(collection).select(["__name__"]).stream()]
+
+    async def create_counter(self, collection, doc_id, field, value):
+        """Create a counter document if it does not exist yet, returning the stored value"""
+        ref = self.db.collection(collection).document(doc_id)
+
+        @async_transactional
+        async def _create(transaction):
+            snapshot = await ref.get(transaction=transaction)
+            if snapshot.exists:
+                return (snapshot.to_dict() or {}).get(field)
+            transaction.set(ref, {field: value, "updated_at": datetime.utcnow().isoformat()})
+            return value
+
+        return await _create(self.db.transaction())
+
+    async def increment_counter(self, collection, doc_id, field, amount):
+        """Atomically add amount to a counter and return the new value (None if the counter is missing)"""
+        ref = self.db.collection(collection).document(doc_id)
+
+        @async_transactional
+        async def _increment(transaction):
+            snapshot = await ref.get(transaction=transaction)
+            current = (snapshot.to_dict() or {}).get(field) if snapshot.exists else None
+            if current is None:
+                return None
+            new_value = current + amount
+            transaction.update(ref, {field: new_value, "updated_at": datetime.utcnow().isoformat()})
+            return new_value
+
+        return await _increment(self.db.transaction())
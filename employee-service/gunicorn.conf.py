@@ -0,0 +1,44 @@
+# Production server settings: gunicorn -c gunicorn.conf.py app:app
+import os
+import tempfile
+
+# Workers publish their metrics to a shared directory so /metrics covers the whole server, whichever worker
+# answers the scrape. Set before config is imported: the workers inherit the master's imported modules.
+os.environ.setdefault("METRICS_DIR", os.path.join(tempfile.gettempdir(), f"employee-service-metrics-{os.environ.get('PORT', 5002)}"))
+
+# Calibrate the bcrypt cost once for the whole deployment, in the master: every worker then hashes with the same
+# cost instead of each timing its own (and re-hashing passwords back and forth between slightly different results)
+if not os.environ.get("BCRYPT_ROUNDS") and os.environ.get("BCRYPT_TARGET_MS"):
+    from api.password_hasher import calibrate_rounds
+    os.environ["BCRYPT_ROUNDS"] = str(calibrate_rounds(float(os.environ["BCRYPT_TARGET_MS"])))
+
+from config import METRICS_DIR, WEB_WORKERS, WEB_THREADS, WEB_TIMEOUT_SECONDS, WEB_GRACEFUL_TIMEOUT_SECONDS, WRITE_BEHIND_DRAIN_SECONDS
+
+bind = f"0.0.0.0:{os.environ.get('PORT', 5002)}"
+workers = WEB_WORKERS
+threads = WEB_THREADS
+worker_class = "gthread"
+timeout = WEB_TIMEOUT_SECONDS
+# SIGTERM stops accepting connections and gives in-flight requests this long to finish
+graceful_timeout = WEB_GRACEFUL_TIMEOUT_SECONDS
+keepalive = 5
+# The app is imported in each worker, so Firestore clients and background threads are created after fork
+preload_app = False
+accesslog = "-"
+
+
+def on_starting(server):
+    """Start the metrics from zero rather than adding to the previous run's workers"""
+    from utils.metrics import clear_snapshots
+    os.makedirs(METRICS_DIR, exist_ok=True)
+    clear_snapshots(METRICS_DIR)
+
+
+def worker_exit(server, worker):
+    """Write out queued last_login updates and the final metrics before the worker goes away"""
+    from api.service import db
+    from utils.metrics import exporter
+    remaining = db.write_behind.drain(WRITE_BEHIND_DRAIN_SECONDS)
+    if remaining:
+        server.log.warning("Worker %s exited with %s write-behind updates unsaved", worker.pid, remaining)
+    exporter.flush()
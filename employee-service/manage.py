@@ -0,0 +1,65 @@
+import argparse
+import sys
+from firestore import FirestoreDB
+from api.id_allocator import bootstrap_employee_id_counter
+from api.service import EMPLOYEE_COLLECTION, EMPLOYEE_EMAILS_COLLECTION, designation_index_fields, normalize_email
+
+
+def bootstrap_id_counter(db, args):
+    """Seed the employee ID counter from the existing maximum EMP*** ID"""
+    value = bootstrap_employee_id_counter(db)
+    print(f"Employee ID counter is at {value}")
+
+
+def backfill_designation_index(db, args):
+    """Populate designation_lower/department_keys on employees written before they existed"""
+    updates = {}
+    fields = ["designation", "designation_lower", "department_keys"]
+    for doc_id, employee in db.stream_documents(EMPLOYEE_COLLECTION, fields):
+        expected = designation_index_fields(employee.get("designation"))
+        if any(employee.get(field) != value for field, value in expected.items()):
+            updates[doc_id] = expected
+    updated = db.update_documents(EMPLOYEE_COLLECTION, updates)
+    print(f"Backfilled designation index fields on {updated} employees")
+
+
+def backfill_email_index(db, args):
+    """Create employee_emails index documents for employees registered before the index existed"""
+    owners = {}
+    for doc_id, employee in db.stream_documents(EMPLOYEE_COLLECTION, ["email"]):
+        email_key = normalize_email(employee.get("email"))
+        if not email_key:
+            print(f"Skipping {doc_id}: invalid email {employee.get('email')!r}")
+        elif email_key in owners:
+            print(f"Skipping {doc_id}: {email_key} is already used by {owners[email_key]}")
+        else:
+            owners[email_key] = doc_id
+
+    existing = db.get_key_owners(EMPLOYEE_EMAILS_COLLECTION, owners)
+    for email_key, owner_id in existing.items():
+        if owner_id != owners[email_key]:
+            print(f"Index for {email_key} points at {owner_id}, expected {owners[email_key]}; leaving it")
+    missing = {key: owner_id for key, owner_id in owners.items() if key not in existing}
+    written = db.set_key_owners(EMPLOYEE_EMAILS_COLLECTION, missing)
+    print(f"Backfilled {written} email index documents")
+
+
+COMMANDS = {
+    "bootstrap-id-counter": bootstrap_id_counter,
+    "backfill-designation-index": backfill_designation_index,
+    "backfill-email-index": backfill_email_index,
+}
+
+
+def main():
+    """Run one-off maintenance commands against the employee Firestore collections"""
+    parser = argparse.ArgumentParser(description="Employee service maintenance commands")
+    parser.add_argument("command", choices=sorted(COMMANDS))
+    args = parser.parse_args()
+
+    COMMANDS[args.command](FirestoreDB(), args)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,33 @@
+# Shared with the other service: edit common/storage/__init__.py and run tools/sync_common.py
+"""
+Local storage backends that stand in for Firestore.
+
+STORAGE_BACKEND=memory keeps documents in the process; STORAGE_BACKEND=sqlite
+keeps them in a SQLite file. Both are served through LocalClient, which
+implements the part of the Firestore client API the services use, so the
+FirestoreDB wrappers run unchanged without credentials or network access.
+"""
+from storage.aio import AsyncLocalClient, async_transactional
+from storage.client import AlreadyExists, LocalClient, NotFound, supports_listeners, transactional
+from storage.memory import MemoryStore
+from storage.sqlite import SQLiteStore
+
+BACKENDS = ("firestore", "memory", "sqlite")
+
+
+def create_local_client(backend, sqlite_path=None):
+    """
+    Build a LocalClient for a local backend.
+
+    Args:
+        backend (str): "memory" or "sqlite"
+        sqlite_path (str, optional): Database file for the sqlite backend
+
+    Raises:
+        ValueError: If the backend is not a local one
+    """
+    if backend == "memory":
+        return LocalClient(MemoryStore())
+    if backend == "sqlite":
+        return LocalClient(SQLiteStore(sqlite_path))
+    raise ValueError(f"Unknown storage backend '{backend}'. Use one of: {', '.join(BACKENDS)}")
@@ -0,0 +1,71 @@
+import os
+import sys
+import uuid
+import pytest
+
+SERVICE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# The suite runs on the in-process storage backend with the cheapest bcrypt cost
+os.environ["STORAGE_BACKEND"] = "memory"
+os.environ["BCRYPT_ROUNDS"] = "4"
+os.environ["METRICS_DIR"] = ""
+sys.path.insert(0, SERVICE_DIR)
+
+from app import app  # noqa: E402
+
+
+@pytest.fixture
+def client():
+    return app.test_client()
+
+
+def employee_payload(**overrides):
+    """Registration body with a unique email (the memory store is shared by the whole test session)"""
+    payload = {
+        "name": "Test Employee",
+        "age": 30,
+        "date_of_birth": "1994-01-01",
+        "email": f"{uuid.uuid4().hex[:12]}@example.com",
+        "address": "1 Test Street",
+        "blood_type": "O+",
+        "phone_number": "9999999999",
+        "designation": "Software Engineer",
+        "ctc": 1200000,
+        "employee_shift_hours": 8
+    }
+    payload.update(overrides)
+    return payload
+
+
+@pytest.fixture
+def register(client):
+    """Register an employee and return the created record (including raw_password)"""
+    def _register(**overrides):
+        response = client.post("/api/employee/register", json=employee_payload(**overrides))
+        assert response.status_code == 201, response.get_json()
+        return response.get_json()["data"]
+    return _register
+
+
+@pytest.fixture
+def other_worker(monkeypatch):
+    """
+    Serve requests as another gunicorn worker would: same storage, its own caches.
+
+    Returns a context manager; requests made inside it go through the other worker's FirestoreDB.
+    """
+    import contextlib
+    import api.service as service
+    from firestore import FirestoreDB
+
+    other_db = FirestoreDB(cached_collections=[service.EMPLOYEE_COLLECTION])
+
+    @contextlib.contextmanager
+    def as_other_worker():
+        own_db = service.db
+        service.db = other_db
+        try:
+            yield other_db
+        finally:
+            service.db = own_db
+    return as_other_worker
@@ -0,0 +1,46 @@
+import api.service as service
+from storage.client import LocalClient
+
+
+def test_batch_returns_employees_in_request_order_and_lists_missing_ids(client, register):
+    first, second = register(), register()
+    response = client.post("/api/employee/batch", json={"ids": [second["id"], "EMP-NOPE", first["id"], second["id"]]})
+    assert response.status_code == 200
+    data = response.get_json()["data"]
+    assert [emp["id"] for emp in data["employees"]] == [second["id"], first["id"]]
+    assert data["missing"] == ["EMP-NOPE"]
+    assert "password" not in data["employees"][0]
+
+
+def test_batch_get_projects_fields(client, register):
+    employee = register()
+    response = client.get("/api/employee/batch", query_string={"ids": f"{employee['id']},", "fields": "name"})
+    assert response.get_json()["data"]["employees"] == [{"id": employee["id"], "name": employee["name"]}]
+
+
+def test_uncached_ids_are_read_in_one_round_trip(client, register, other_worker, monkeypatch):
+    ids = [register()["id"] for _ in range(3)]
+    calls = []
+    original_get_all = LocalClient.get_all
+
+    def counting_get_all(db_client, references, field_paths=None, transaction=None):
+        calls.append(len(references))
+        return original_get_all(db_client, references, field_paths, transaction)
+    monkeypatch.setattr(LocalClient, "get_all", counting_get_all)
+
+    # The other worker has none of them cached yet
+    with other_worker():
+        response = client.post("/api/employee/batch", json={"ids": ids})
+        assert len(response.get_json()["data"]["employees"]) == 3
+        assert calls == [3]
+        # Now they are cached: no storage read at all
+        client.post("/api/employee/batch", json={"ids": ids})
+        assert calls == [3]
+
+
+def test_batch_rejects_bad_requests(client, monkeypatch):
+    assert client.post("/api/employee/batch", json={"ids": 5}).status_code == 400
+    assert client.post("/api/employee/batch", json={"ids": []}).status_code == 400
+    assert client.get("/api/employee/batch", query_string={"ids": "a", "fields": "password"}).status_code == 400
+    monkeypatch.setattr(service, "BATCH_GET_MAX_IDS", 2)
+    assert client.get("/api/employee/batch", query_string={"ids": "a,b,c"}).status_code == 400
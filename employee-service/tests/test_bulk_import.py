@@ -0,0 +1,88 @@
+import io
+import json
+import pytest
+import api.service as service
+from api.bulk_import import parse_bulk_payload
+from api.id_allocator import parse_employee_id
+from conftest import employee_payload
+
+CSV_COLUMNS = ["name", "age", "date_of_birth", "email", "address", "blood_type", "phone_number",
+               "designation", "ctc", "employee_shift_hours"]
+
+
+def _csv(rows):
+    lines = [",".join(CSV_COLUMNS)]
+    lines += [",".join(f" {row[column]} " for column in CSV_COLUMNS) for row in rows]
+    return "\n".join(lines) + "\n"
+
+
+def _parse(text, content_type):
+    return parse_bulk_payload(io.BytesIO(text.encode("utf-8")), content_type)
+
+
+def test_parses_json_ndjson_and_csv():
+    rows = [employee_payload(), employee_payload()]
+    assert _parse(json.dumps(rows), "application/json; charset=utf-8") == rows
+    assert _parse("\n".join(json.dumps(row) for row in rows) + "\n\n", "application/x-ndjson") == rows
+
+    parsed = _parse(_csv(rows), "text/csv")
+    assert [row["email"] for row in parsed] == [row["email"] for row in rows]
+    # Cells are stripped and numeric columns come back as numbers
+    assert parsed[0]["age"] == 30 and parsed[0]["ctc"] == 1200000 and parsed[0]["name"] == "Test Employee"
+
+
+@pytest.mark.parametrize("text, content_type, message", [
+    ("{not json", "application/json", "Invalid JSON"),
+    ('{"name": "x"}', "application/json", "must be an array"),
+    ('{"a": 1}\nnope\n', "application/x-ndjson", "line 2"),
+    ("a,b\n1,2\n", "application/xml", "Unsupported content type"),
+])
+def test_rejects_unparseable_payloads(text, content_type, message):
+    with pytest.raises(ValueError, match=message):
+        _parse(text, content_type)
+
+
+def test_csv_import_creates_employees_that_can_log_in(client):
+    rows = [employee_payload(), employee_payload()]
+    response = client.post("/api/employee/register/bulk", data=_csv(rows), content_type="text/csv")
+    assert response.status_code == 201, response.get_json()
+    summary = response.get_json()["data"]
+    assert summary["created"] == 2 and summary["failed"] == 0
+
+    created = summary["results"]
+    # One contiguous ID block
+    numbers = [parse_employee_id(result["id"]) for result in created]
+    assert numbers[1] == numbers[0] + 1
+    login = client.post("/api/employee/login", json={"email": created[1]["email"],
+                                                      "password": created[1]["raw_password"]})
+    assert login.status_code == 200
+
+
+def test_invalid_rows_fail_alone(client):
+    incomplete = employee_payload()
+    del incomplete["designation"]
+    rows = [incomplete, "not an object", employee_payload(email="no-at-sign/slash"), employee_payload()]
+    response = client.post("/api/employee/register/bulk", json=rows)
+    results = response.get_json()["data"]["results"]
+    assert [result["status"] for result in results] == ["error", "error", "error", "created"]
+    assert "designation" in results[0]["error"]
+    assert results[1]["error"] == "Row must be an object"
+    assert results[2]["error"] == "Invalid email"
+
+
+def test_imports_span_several_write_batches(client, monkeypatch):
+    # Two employees (plus their email keys) per batch
+    monkeypatch.setattr("firestore.MAX_BATCH_WRITES", 4)
+    rows = [employee_payload() for _ in range(5)]
+    response = client.post("/api/employee/register/bulk", json=rows)
+    assert response.get_json()["data"]["created"] == 5
+    ids = [result["id"] for result in response.get_json()["data"]["results"]]
+    assert len(service.db.get_documents(service.EMPLOYEE_COLLECTION, ids)) == 5
+
+
+def test_empty_and_oversized_imports_are_rejected(client, monkeypatch):
+    assert client.post("/api/employee/register/bulk", json=[]).status_code == 400
+    monkeypatch.setattr(service, "BULK_IMPORT_MAX_ROWS", 2)
+    response = client.post("/api/employee/register/bulk", json=[employee_payload() for _ in range(3)])
+    assert response.status_code == 400
+    assert "At most 2" in response.get_json()["message"]
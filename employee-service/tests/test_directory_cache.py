@@ -0,0 +1,79 @@
+import api.service as service
+from api.service import EMPLOYEE_COLLECTION
+from firestore import ALL_DOCUMENTS_KEY, apply_write_to_cache
+from utils.directory_cache import DirectoryCache
+
+
+class _Clock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+def test_entries_expire_after_their_ttl(monkeypatch):
+    clock = _Clock()
+    monkeypatch.setattr("utils.directory_cache.time.monotonic", clock)
+    cache = DirectoryCache(max_size=10, ttl_seconds=5)
+    cache.put("a", {"name": "A"})
+
+    clock.now += 4.9
+    assert cache.get("a") == {"name": "A"}
+    clock.now += 0.2
+    assert cache.get("a") is None
+    assert cache.stats()["size"] == 0
+
+
+def test_least_recently_used_entry_is_evicted():
+    cache = DirectoryCache(max_size=2, ttl_seconds=60)
+    cache.put("a", 1)
+    cache.put("b", 2)
+    assert cache.get("a") == 1  # b is now the least recently used
+    cache.put("c", 3)
+    assert cache.get("b") is None
+    assert cache.get("a") == 1 and cache.get("c") == 3
+    assert cache.stats()["evictions"] == 1
+
+
+def test_put_is_dropped_when_an_invalidation_raced_the_read():
+    cache = DirectoryCache()
+    generation = cache.generation
+    cache.invalidate("a")  # a write landed while the value was being read
+    cache.put("a", "stale", generation)
+    assert cache.get("a") is None
+
+    cache.put("a", "fresh", cache.generation)
+    assert cache.get("a") == "fresh"
+
+
+def test_update_merges_into_a_cached_value_only():
+    cache = DirectoryCache()
+    cache.update("missing", {"x": 1})
+    assert cache.get("missing") is None
+    cache.put("a", {"x": 1, "y": 1})
+    cache.update("a", {"y": 2})
+    assert cache.get("a") == {"x": 1, "y": 2}
+
+
+def test_writes_drop_the_cached_listing():
+    caches = {"employees": DirectoryCache()}
+    cache = caches["employees"]
+    cache.put(ALL_DOCUMENTS_KEY, [{"id": "a"}])
+    cache.put("a", {"id": "a", "name": "Old"})
+
+    apply_write_to_cache(caches, "employees", "a", {"name": "New"}, merge=True)
+    assert cache.get(ALL_DOCUMENTS_KEY) is None
+    assert cache.get("a") == {"id": "a", "name": "New"}
+
+    apply_write_to_cache(caches, "employees", "a")
+    assert cache.get("a") is None
+
+
+def test_update_is_visible_to_the_next_read(client, register):
+    employee = register()
+    assert client.get(f"/api/employee/{employee['id']}").status_code == 200  # warms the cache
+    assert client.put(f"/api/employee/{employee['id']}", json={"address": "9 New Road"}).status_code == 200
+    assert service.db.get_document(EMPLOYEE_COLLECTION, employee["id"])["address"] == "9 New Road"
+    listed = {emp["id"]: emp for emp in client.get("/api/employee/all").get_json()["data"]}
+    assert listed[employee["id"]]["address"] == "9 New Road"
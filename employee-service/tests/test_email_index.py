@@ -0,0 +1,126 @@
+from flask import g
+import api.service as service
+import utils.query_trace as query_trace
+from app import app
+from conftest import employee_payload
+from api.service import EMPLOYEE_EMAILS_COLLECTION, db
+from utils.async_bridge import run_async
+from utils.query_trace import QueryTrace
+
+
+def test_register_rejects_an_email_already_registered_in_any_case(client, register):
+    employee = register()
+    response = client.post("/api/employee/register", json=employee_payload(email=employee["email"].upper()))
+    assert response.status_code == 400
+    assert db.get_key_owner(EMPLOYEE_EMAILS_COLLECTION, employee["email"]) == employee["id"]
+
+
+def test_bulk_import_rejects_registered_and_repeated_emails(client, register):
+    employee = register()
+    repeated = employee_payload()
+    rows = [employee_payload(email=employee["email"]), repeated, dict(repeated), employee_payload()]
+    response = client.post("/api/employee/register/bulk", json=rows)
+    results = response.get_json()["data"]["results"]
+    assert [result["status"] for result in results] == ["error", "created", "error", "created"]
+    assert results[0]["error"] == "Employee with this email already exists"
+    assert results[2]["error"] == "Duplicate email in import"
+
+
+def test_bulk_import_does_not_overwrite_an_email_claimed_after_the_check(client, register, monkeypatch):
+    # A registration that lands between the import's index check and its commit
+    claimed = employee_payload()
+    other = employee_payload()
+
+    async def nothing_registered(email_keys, raw_emails):
+        client.post("/api/employee/register", json=claimed)
+        return [{}, set()]
+
+    monkeypatch.setattr(service, "find_registered_emails", nothing_registered)
+    response = client.post("/api/employee/register/bulk", json=[dict(claimed, name="Importer"), other])
+    results = response.get_json()["data"]["results"]
+    assert results[0] == {"row": 0, "status": "error", "email": claimed["email"],
+                          "error": "Employee with this email already exists"}
+    assert results[1]["status"] == "created"
+
+    owner = db.get_key_owner(EMPLOYEE_EMAILS_COLLECTION, claimed["email"])
+    assert db.get_document("employees", owner)["name"] == claimed["name"]
+    assert db.get_key_owner(EMPLOYEE_EMAILS_COLLECTION, other["email"]) == results[1]["id"]
+
+
+def test_backfill_leaves_existing_owners_alone(register):
+    employee = register()
+    written = db.set_key_owners(EMPLOYEE_EMAILS_COLLECTION, {employee["email"]: "EMP-OTHER", "new@example.org": "EMP-NEW"})
+    assert written == 1
+    assert db.get_key_owners(EMPLOYEE_EMAILS_COLLECTION, [employee["email"], "new@example.org"]) == {
+        employee["email"]: employee["id"], "new@example.org": "EMP-NEW"}
+
+
+def test_update_cannot_take_another_employees_email(client, register):
+    first, second = register(), register()
+    response = client.put(f"/api/employee/{second['id']}", json={"email": first["email"]})
+    assert response.status_code == 400
+    assert db.get_key_owner(EMPLOYEE_EMAILS_COLLECTION, first["email"]) == first["id"]
+
+
+def test_update_moves_the_email_index_entry(client, register):
+    employee = register()
+    new_email = employee_payload()["email"]
+    response = client.put(f"/api/employee/{employee['id']}", json={"email": new_email})
+    assert response.status_code == 200
+    assert db.get_key_owner(EMPLOYEE_EMAILS_COLLECTION, new_email) == employee["id"]
+    assert db.get_key_owner(EMPLOYEE_EMAILS_COLLECTION, employee["email"]) is None
+
+
+def test_async_email_lookups_are_counted_in_the_request(register, monkeypatch):
+    employee = register()
+    monkeypatch.setitem(query_trace._settings, "enabled", True)
+    monkeypatch.setattr(service, "EMAIL_INDEX_FALLBACK", True)
+    with app.test_request_context("/api/employee/register/bulk", method="POST"):
+        g.query_trace = QueryTrace("POST /api/employee/register/bulk")
+        run_async(service.find_registered_emails([employee["email"], "nobody@example.com"],
+                                                 [employee["email"], "nobody@example.com"]))
+        operations = {operation[2]: operation[4] for operation in g.query_trace.operations}
+
+    assert operations == {f"get_key_owners:{EMPLOYEE_EMAILS_COLLECTION}": 1,
+                          "get_existing_field_values:employees": 1}
+
+
+def test_login_checks_the_password_stored_by_another_worker(client, register, other_worker):
+    employee = register()
+    client.get(f"/api/employee/{employee['id']}")  # This worker now holds a cached copy
+
+    with other_worker():
+        response = client.put(f"/api/employee/{employee['id']}", json={"password": "N3w-password!"})
+        assert response.status_code == 200
+
+    old = client.post("/api/employee/login", json={"email": employee["email"], "password": employee["raw_password"]})
+    new = client.post("/api/employee/login", json={"email": employee["email"], "password": "N3w-password!"})
+    assert old.status_code == 401
+    assert new.status_code == 200
+
+
+def test_email_change_releases_the_address_stored_by_another_worker(client, register, other_worker):
+    employee = register()
+    client.get(f"/api/employee/{employee['id']}")  # Cached with the original email
+    second, third = employee_payload()["email"], employee_payload()["email"]
+
+    with other_worker():
+        assert client.put(f"/api/employee/{employee['id']}", json={"email": second}).status_code == 200
+    assert client.put(f"/api/employee/{employee['id']}", json={"email": third}).status_code == 200
+
+    for released in (employee["email"], second):
+        assert db.get_key_owner(EMPLOYEE_EMAILS_COLLECTION, released) is None
+    assert db.get_key_owner(EMPLOYEE_EMAILS_COLLECTION, third) == employee["id"]
+    # The freed address can be registered again
+    assert client.post("/api/employee/register", json=employee_payload(email=second)).status_code == 201
+
+
+def test_delete_releases_the_current_email(client, register, other_worker):
+    employee = register()
+    client.get(f"/api/employee/{employee['id']}")
+    changed = employee_payload()["email"]
+    with other_worker():
+        assert client.put(f"/api/employee/{employee['id']}", json={"email": changed}).status_code == 200
+
+    assert client.delete(f"/api/employee/{employee['id']}").status_code == 200
+    assert db.get_key_owner(EMPLOYEE_EMAILS_COLLECTION, changed) is None
@@ -0,0 +1,142 @@
+import api.controller as controller
+import api.service as service
+
+
+def _get(client, employee_id, etag=None):
+    headers = {"If-None-Match": etag} if etag else {}
+    return client.get(f"/api/employee/{employee_id}", headers=headers)
+
+
+def test_unchanged_employee_revalidates_with_304(client, register):
+    employee = register()
+    first = _get(client, employee["id"])
+    assert first.status_code == 200 and first.headers["ETag"]
+
+    again = _get(client, employee["id"], first.headers["ETag"])
+    assert again.status_code == 304
+    assert again.headers["ETag"] == first.headers["ETag"]
+    assert again.data == b""
+
+
+def test_304_does_not_run_the_view(client, register, monkeypatch):
+    employee = register()
+    etag = _get(client, employee["id"]).headers["ETag"]
+
+    def fail(*args, **kwargs):
+        raise AssertionError("employee data read for a conditional request that matched")
+    monkeypatch.setattr(controller, "get_employee", fail)
+    monkeypatch.setattr(service.db, "get_document", fail)
+    assert _get(client, employee["id"], etag).status_code == 304
+
+
+def test_etag_is_shared_by_workers(client, register, other_worker):
+    employee = register()
+    etag = _get(client, employee["id"]).headers["ETag"]
+
+    with other_worker():
+        response = _get(client, employee["id"], etag)
+    assert response.status_code == 304
+
+
+def test_write_by_another_worker_invalidates_the_etag(client, register, other_worker):
+    employee = register()
+    etag = _get(client, employee["id"]).headers["ETag"]
+
+    with other_worker():
+        assert client.put(f"/api/employee/{employee['id']}", json={"address": "3 Elsewhere"}).status_code == 200
+    # This worker's cached copy is dropped along with the old tag
+    response = _get(client, employee["id"], etag)
+    assert response.status_code == 200
+    assert response.get_json()["data"]["address"] == "3 Elsewhere"
+    assert response.headers["ETag"] != etag
+
+
+def test_update_invalidates_the_etag(client, register):
+    employee = register()
+    etag = _get(client, employee["id"]).headers["ETag"]
+
+    assert client.put(f"/api/employee/{employee['id']}", json={"address": "2 Other Street"}).status_code == 200
+    response = _get(client, employee["id"], etag)
+    assert response.status_code == 200
+    assert response.get_json()["data"]["address"] == "2 Other Street"
+    assert response.headers["ETag"] != etag
+
+
+def test_login_invalidates_the_etag(client, register):
+    employee = register()
+    etag = _get(client, employee["id"]).headers["ETag"]
+
+    # last_login goes through the write-behind buffer, which must not leave a stale 304 behind
+    login = client.post("/api/employee/login", json={"email": employee["email"],
+                                                      "password": employee["raw_password"]})
+    assert login.status_code == 200
+    response = _get(client, employee["id"], etag)
+    assert response.status_code == 200
+    assert response.get_json()["data"]["last_login"]
+    assert response.headers["ETag"] != etag
+
+
+def test_error_responses_carry_no_etag(client):
+    response = _get(client, "no-such-employee")
+    assert response.status_code == 404
+    assert "ETag" not in response.headers
+
+
+class _ListeningClient:
+    """LocalClient whose documents support on_snapshot, like Firestore's"""
+    supports_listeners = True
+
+    def __init__(self, client):
+        self.client = client
+        self.listeners = []
+        self.reads = 0
+
+    def collection(self, name):
+        return _ListeningCollection(self, self.client.collection(name))
+
+
+class _ListeningCollection:
+    def __init__(self, owner, collection):
+        self.owner = owner
+        self.collection = collection
+
+    def document(self, doc_id):
+        return _ListeningDocument(self.owner, self.collection.document(doc_id))
+
+
+class _ListeningDocument:
+    def __init__(self, owner, ref):
+        self.owner = owner
+        self.ref = ref
+
+    def get(self):
+        self.owner.reads += 1
+        return self.ref.get()
+
+    def set(self, data):
+        self.ref.set(data)
+        for callback in self.owner.listeners:
+            callback([self.ref.get()], [], None)
+
+    def on_snapshot(self, callback):
+        self.owner.listeners.append(callback)
+        callback([self.ref.get()], [], None)
+        return object()
+
+
+def test_listener_serves_the_version_without_reads():
+    from storage import create_local_client
+    from utils.collection_version import CollectionVersion
+
+    client = _ListeningClient(create_local_client("memory"))
+    ours = CollectionVersion(client, "employees")
+    theirs = CollectionVersion(client, "employees")
+    changes = []
+    ours.subscribe(lambda: changes.append(True))
+
+    first, read = ours.current()
+    assert not read and client.reads == 0
+    theirs.bump()
+    second, _ = ours.current()
+    assert second != first and changes
+    assert client.reads == 0
@@ -0,0 +1,58 @@
+import inspect
+from api.service import EMPLOYEE_COLLECTION, EMPLOYEE_EMAILS_COLLECTION, async_db, db, email_key_of
+from firestore import FirestoreDB
+from firestore_async import AsyncFirestoreDB
+from utils.async_bridge import run_async
+
+# FirestoreDB methods tied to its own worker state, with no async counterpart
+SYNC_ONLY = {"defer_update", "cache_stats", "collection_version"}
+# Concurrency helpers only the async wrapper has
+ASYNC_ONLY = {"query_many"}
+
+
+def _public_methods(cls):
+    return {name: member for name, member in inspect.getmembers(cls, inspect.isfunction) if not name.startswith("_")}
+
+
+def test_async_wrapper_has_the_same_method_surface():
+    sync_methods = _public_methods(FirestoreDB)
+    async_methods = _public_methods(AsyncFirestoreDB)
+    assert set(sync_methods) - SYNC_ONLY == set(async_methods) - ASYNC_ONLY
+    for name, method in async_methods.items():
+        if name in ASYNC_ONLY:
+            continue
+        assert list(inspect.signature(method).parameters) == list(inspect.signature(sync_methods[name]).parameters), name
+
+
+def test_async_writes_keep_the_shared_cache_and_version(register):
+    employee = register()
+    db.get_document(EMPLOYEE_COLLECTION, employee["id"])
+    version = db.collection_version(EMPLOYEE_COLLECTION)
+
+    new_email = f"moved-{employee['email']}"
+    moved = run_async(async_db.update_document_with_key(
+        EMPLOYEE_COLLECTION, employee["id"], {"email": new_email}, EMPLOYEE_EMAILS_COLLECTION, new_email, email_key_of
+    ))
+    assert moved
+    assert db.get_document(EMPLOYEE_COLLECTION, employee["id"])["email"] == new_email
+    assert db.get_key_owner(EMPLOYEE_EMAILS_COLLECTION, employee["email"]) is None
+    assert db.get_key_owner(EMPLOYEE_EMAILS_COLLECTION, new_email) == employee["id"]
+    assert db.collection_version(EMPLOYEE_COLLECTION) != version
+
+    run_async(async_db.delete_document_with_key(EMPLOYEE_COLLECTION, employee["id"],
+                                                EMPLOYEE_EMAILS_COLLECTION, email_key_of))
+    assert db.get_document(EMPLOYEE_COLLECTION, employee["id"]) is None
+    assert db.get_key_owner(EMPLOYEE_EMAILS_COLLECTION, new_email) is None
+
+
+def test_async_bulk_write_reports_taken_keys(register):
+    owner = register()
+    documents = {
+        "async-a": {"id": "async-a", "email": owner["email"], "created_at": owner["created_at"]},
+        "async-b": {"id": "async-b", "email": "async-b@example.com", "created_at": owner["created_at"]}
+    }
+    keys = {doc_id: (EMPLOYEE_EMAILS_COLLECTION, data["email"]) for doc_id, data in documents.items()}
+    failed = run_async(async_db.add_documents(EMPLOYEE_COLLECTION, documents, keys))
+    assert failed == {"async-a": "Unique key already taken"}
+    assert db.get_key_owner(EMPLOYEE_EMAILS_COLLECTION, owner["email"]) == owner["id"]
+    assert db.get_key_owner(EMPLOYEE_EMAILS_COLLECTION, "async-b@example.com") == "async-b"
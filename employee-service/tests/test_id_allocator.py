@@ -0,0 +1,53 @@
+from api.id_allocator import EmployeeIdAllocator, bootstrap_employee_id_counter
+from api.service import EMPLOYEE_COLLECTION, db
+from firestore import FirestoreDB
+from storage import create_local_client
+from storage.client import Query
+
+
+def test_document_ids_project_only_the_document_name(register, monkeypatch):
+    # select([]) returns every field on Firestore; __name__ returns the keys alone
+    employee = register()
+    selected = []
+    original_select = Query.select
+
+    def recording_select(query, field_paths):
+        selected.append(list(field_paths))
+        return original_select(query, field_paths)
+    monkeypatch.setattr(Query, "select", recording_select)
+
+    ids = db.get_document_ids(EMPLOYEE_COLLECTION)
+    assert selected == [["__name__"]]
+    assert employee["id"] in ids
+
+
+def _fresh_db():
+    """A FirestoreDB on its own empty memory store, so counters start from scratch"""
+    fresh = FirestoreDB()
+    fresh.db = create_local_client("memory")
+    return fresh
+
+
+def test_bootstrap_starts_after_the_highest_existing_id():
+    fresh = _fresh_db()
+    for doc_id in ("EMP007", "EMP012", "legacy-id"):
+        fresh.add_document(EMPLOYEE_COLLECTION, doc_id, {"id": doc_id})
+    assert EmployeeIdAllocator(fresh, block_size=1).next_id() == "EMP013"
+    # Seeding again leaves the counter where it is
+    assert bootstrap_employee_id_counter(fresh) == 13
+
+
+def test_workers_never_hand_out_the_same_id():
+    fresh = _fresh_db()
+    first, second = EmployeeIdAllocator(fresh, block_size=3), EmployeeIdAllocator(fresh, block_size=3)
+    ids = [allocator.next_id() for _ in range(5) for allocator in (first, second)]
+    assert len(set(ids)) == len(ids)
+    assert ids[:2] == ["EMP001", "EMP004"]
+
+
+def test_reserve_returns_one_contiguous_range():
+    fresh = _fresh_db()
+    allocator = EmployeeIdAllocator(fresh, block_size=10)
+    allocator.next_id()
+    assert allocator.reserve(3) == ["EMP011", "EMP012", "EMP013"]
+    assert allocator.reserve(0) == []
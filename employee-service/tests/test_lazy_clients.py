@@ -0,0 +1,68 @@
+import os
+import subprocess
+import sys
+import threading
+from types import SimpleNamespace
+import pytest
+from google.cloud import firestore
+import config
+from conftest import SERVICE_DIR
+
+
+class _FakeClient:
+    created = []
+
+    def __init__(self, project=None, credentials=None):
+        self.project = project
+        _FakeClient.created.append(self)
+
+
+@pytest.fixture
+def firestore_pool(monkeypatch):
+    """Put config on the firestore backend, with clients that open no channel"""
+    _FakeClient.created = []
+    app = SimpleNamespace(project_id="people-pilot", credential=SimpleNamespace(get_credential=lambda: None))
+    monkeypatch.setattr(config, "STORAGE_BACKEND", "firestore")
+    monkeypatch.setattr(config, "FIRESTORE_CHANNEL_POOL_SIZE", 2)
+    monkeypatch.setattr(config, "get_firebase_app", lambda: app)
+    monkeypatch.setattr(config, "_clients", [])
+    monkeypatch.setattr(config, "_clients_pid", None)
+    monkeypatch.setattr(config, "_thread_client", threading.local())
+    monkeypatch.setattr(firestore, "Client", _FakeClient)
+    return _FakeClient
+
+
+def _client_in_new_thread():
+    result = []
+    thread = threading.Thread(target=lambda: result.append(config.get_db()))
+    thread.start()
+    thread.join()
+    return result[0]
+
+
+def test_importing_config_opens_no_firebase_app():
+    code = "import config, firebase_admin; config.db; assert not firebase_admin._apps"
+    env = dict(os.environ, STORAGE_BACKEND="firestore")
+    subprocess.run([sys.executable, "-c", code], cwd=SERVICE_DIR, env=env, check=True)
+
+
+def test_threads_stick_to_one_client_of_the_pool(firestore_pool):
+    first = config.get_db()
+    assert config.get_db() is first
+    assert len(firestore_pool.created) == 2
+    # The next thread is given the other client; no more are created
+    assert _client_in_new_thread() is not first
+    assert len(firestore_pool.created) == 2
+
+
+def test_clients_are_recreated_after_fork(firestore_pool, monkeypatch):
+    before = config.get_db()
+    monkeypatch.setattr(os, "getpid", lambda: -1)
+    after = config.get_db()
+    assert after is not before
+    assert len(firestore_pool.created) == 4
+    assert after in firestore_pool.created[2:]
+
+
+def test_db_proxy_forwards_to_the_current_client():
+    assert config.db.collection.__self__ is config.get_db()
@@ -0,0 +1,133 @@
+import uuid
+import pytest
+import api.service as service
+from api.service import EMPLOYEE_COLLECTION, db
+
+
+@pytest.fixture
+def word():
+    """A designation word no other test uses"""
+    return f"w{uuid.uuid4().hex[:8]}"
+
+
+def _ids(response):
+    assert response.status_code == 200, response.get_json()
+    return {employee["id"] for employee in response.get_json()["data"]}
+
+
+def _pages(client, url, limit):
+    """Follow next_cursor through every page and return the ids in order"""
+    ids, cursor = [], None
+    while True:
+        params = {"limit": limit, **({"cursor": cursor} if cursor else {})}
+        response = client.get(url, query_string=params)
+        assert response.status_code == 200, response.get_json()
+        page = response.get_json()["data"]
+        assert page["count"] == len(page["employees"]) <= limit
+        ids.extend(employee["id"] for employee in page["employees"])
+        cursor = page["next_cursor"]
+        if cursor is None:
+            return ids
+
+
+@pytest.fixture(params=[True, False], ids=["fallback", "indexed"])
+def fallback(request, monkeypatch):
+    monkeypatch.setattr(service, "DESIGNATION_INDEX_FALLBACK", request.param)
+    return request.param
+
+
+def test_department_matches_whole_words_in_any_case(client, register, word, fallback):
+    senior = register(designation=f"Senior {word.upper()} Engineer")
+    lead = register(designation=f"{word} lead")
+    register(designation=f"{word}x Engineer")
+
+    assert _ids(client.get(f"/api/employee/department/{word}")) == {senior["id"], lead["id"]}
+    assert _ids(client.get(f"/api/employee/department/{word} engineer")) == {senior["id"]}
+    assert _ids(client.get(f"/api/employee/department/engineer {word}")) == set()
+    assert _ids(client.get(f"/api/employee/department/{word[:-1]}")) == set()
+
+
+def test_designation_matches_ignoring_case_and_spacing(client, register, word, fallback):
+    employee = register(designation=f"QA  {word}")
+    register(designation=f"Senior QA {word}")
+    assert _ids(client.get(f"/api/employee/designation/qa {word.upper()}")) == {employee["id"]}
+
+
+def test_fallback_finds_employees_written_before_the_index_fields(client, register, word, monkeypatch):
+    indexed = register(designation=f"{word} analyst")
+    legacy = {key: value for key, value in indexed.items()
+              if key not in ("designation_lower", "department_keys", "raw_password")}
+    legacy.update(id=f"legacy-{word}", email=f"legacy-{word}@example.com")
+    db.add_document(EMPLOYEE_COLLECTION, legacy["id"], legacy)
+
+    monkeypatch.setattr(service, "DESIGNATION_INDEX_FALLBACK", True)
+    assert _ids(client.get(f"/api/employee/department/{word}")) == {indexed["id"], legacy["id"]}
+    assert _ids(client.get(f"/api/employee/designation/{word} analyst")) == {indexed["id"], legacy["id"]}
+    # Pages only use the index, so they never come back short
+    assert _pages(client, f"/api/employee/department/{word}", 1) == [indexed["id"]]
+
+    # Once the backfill has run the lookups only use the index
+    monkeypatch.setattr(service, "DESIGNATION_INDEX_FALLBACK", False)
+    assert _ids(client.get(f"/api/employee/department/{word}")) == {indexed["id"]}
+
+
+def test_cursor_pages_cover_every_employee_once(client, register, word, fallback):
+    created = [register(designation=f"{word} tester")["id"] for _ in range(5)]
+
+    for limit in (1, 2, 5):
+        pages = _pages(client, f"/api/employee/designation/{word} tester", limit)
+        # Newest first, no repeats, nothing skipped
+        assert pages == created[::-1]
+
+    everyone = _pages(client, "/api/employee/all", 3)
+    assert len(everyone) == len(set(everyone))
+    assert set(created) <= set(everyone)
+
+
+def test_multi_word_department_pages_are_full(client, register, word, fallback):
+    # Employees sharing a word but not the whole department name must not thin out the pages
+    wanted = [register(designation=f"{word} platform engineer")["id"] for _ in range(3)]
+    for _ in range(4):
+        register(designation=f"{word} platform lead")
+
+    ids, cursor = [], None
+    while True:
+        params = {"limit": 2, **({"cursor": cursor} if cursor else {})}
+        page = client.get(f"/api/employee/department/{word} platform engineer", query_string=params).get_json()["data"]
+        cursor = page["next_cursor"]
+        assert page["count"] == 2 or cursor is None
+        ids.extend(employee["id"] for employee in page["employees"])
+        if cursor is None:
+            break
+    assert ids == wanted[::-1]
+
+
+def test_department_keys_hold_every_run_of_words():
+    assert service.department_keys("Senior  Software Engineer") == [
+        "engineer", "senior", "senior software", "senior software engineer", "software", "software engineer"
+    ]
+
+
+def test_listings_never_include_the_password_hash(client, register):
+    employee = register()
+    listed = {emp["id"]: emp for emp in client.get("/api/employee/all").get_json()["data"]}
+    assert "password" not in listed[employee["id"]]
+
+
+def test_fields_projects_every_listing_shape(client, register, word):
+    register(designation=f"{word} tester")
+    url = f"/api/employee/designation/{word} tester"
+    listed = client.get(url, query_string={"fields": "name,designation"}).get_json()["data"]
+    page = client.get(url, query_string={"fields": "name", "limit": 5}).get_json()["data"]["employees"]
+    assert [set(emp) for emp in listed] == [{"id", "name", "designation"}]
+    assert [set(emp) for emp in page] == [{"id", "name"}]
+
+    response = client.get("/api/employee/all", query_string={"fields": "name,password"})
+    assert response.status_code == 400
+    assert "password" in response.get_json()["message"]
+
+
+def test_invalid_page_parameters_are_rejected(client):
+    assert client.get("/api/employee/all", query_string={"limit": 0}).status_code == 400
+    assert client.get("/api/employee/all", query_string={"limit": "ten"}).status_code == 400
+    assert client.get("/api/employee/all", query_string={"cursor": "no-such-employee"}).status_code == 400
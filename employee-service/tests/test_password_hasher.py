@@ -0,0 +1,79 @@
+import threading
+import pytest
+import api.service as service
+from api.password_hasher import PasswordHasher, HasherBusyError
+from conftest import employee_payload
+
+
+@pytest.fixture
+def blocked_hasher(monkeypatch):
+    """Make password checks hold their hashing slot until the returned event is set"""
+    release = threading.Event()
+
+    def slow_checkpw(password, hashed_password):
+        release.wait(5)
+        return False
+
+    monkeypatch.setattr("api.password_hasher.bcrypt.checkpw", slow_checkpw)
+    yield release
+    release.set()
+
+
+def _fill(hasher, count):
+    """Start count verifications that hold their slot until released"""
+    threads = [threading.Thread(target=hasher.verify, args=("password", "$2b$04$hash")) for _ in range(count)]
+    for thread in threads:
+        thread.start()
+    return threads
+
+
+def _wait_for_in_flight(hasher, count):
+    for _ in range(500):
+        if hasher.stats()["in_flight"] == count:
+            return
+        threading.Event().wait(0.01)
+    raise AssertionError(f"expected {count} operations in flight, got {hasher.stats()['in_flight']}")
+
+
+def test_admits_workers_plus_pending_then_fails_fast(blocked_hasher):
+    hasher = PasswordHasher(workers=1, max_pending=2, rounds=4, retry_after=3)
+    threads = _fill(hasher, 3)
+    _wait_for_in_flight(hasher, 3)
+
+    with pytest.raises(HasherBusyError) as error:
+        hasher.verify("password", "$2b$04$hash")
+    assert error.value.retry_after == 3
+
+    blocked_hasher.set()
+    for thread in threads:
+        thread.join(5)
+    assert hasher.stats()["in_flight"] == 0
+    assert hasher.verify("password", "$2b$04$hash") is False
+
+
+def test_full_queue_answers_503_with_retry_after(client, register, blocked_hasher, monkeypatch):
+    employee = register()
+    hasher = PasswordHasher(workers=1, max_pending=0, rounds=4, retry_after=2)
+    monkeypatch.setattr(service, "password_hasher", hasher)
+    threads = _fill(hasher, 1)
+    _wait_for_in_flight(hasher, 1)
+
+    login = client.post("/api/employee/login", json={"email": employee["email"], "password": "anything"})
+    assert login.status_code == 503
+    assert login.headers["Retry-After"] == "2"
+
+    registration = client.post("/api/employee/register", json=employee_payload())
+    assert registration.status_code == 503
+
+    blocked_hasher.set()
+    for thread in threads:
+        thread.join(5)
+
+
+def test_only_weaker_hashes_are_rehashed():
+    hasher = PasswordHasher(workers=1, max_pending=0, rounds=5)
+    assert hasher.needs_rehash("$2b$04$" + "a" * 53)
+    assert not hasher.needs_rehash("$2b$05$" + "a" * 53)
+    # A deployment calibrated to a lower cost keeps the stronger hashes it finds
+    assert not hasher.needs_rehash("$2b$12$" + "a" * 53)
+    assert not hasher.needs_rehash("not-a-bcrypt-hash")
@@ -0,0 +1,65 @@
+import json
+import time
+from collections import Counter
+from flask import Flask
+from utils.profiler import PROFILE_HEADER, PROFILE_ID_HEADER, init_profiler, summarize
+
+
+def _spin(seconds):
+    deadline = time.perf_counter() + seconds
+    while time.perf_counter() < deadline:
+        pass
+
+
+def _app(tmp_path, **options):
+    app = Flask(__name__)
+
+    @app.route("/slow/<int:ms>")
+    def slow(ms):
+        _spin(ms / 1000.0)
+        return "done"
+
+    init_profiler(app, str(tmp_path), interval_ms=1, **options)
+    return app.test_client()
+
+
+def test_admin_header_forces_a_profile(tmp_path):
+    client = _app(tmp_path, admin_token="secret")
+    response = client.get("/slow/100", headers={PROFILE_HEADER: "secret"})
+    name = response.headers[PROFILE_ID_HEADER]
+
+    summary = json.loads((tmp_path / f"{name}.json").read_text())
+    assert summary["route"] == "/slow/<int:ms>" and summary["forced"] and summary["status"] == 200
+    assert summary["samples"] > 0
+    folded = (tmp_path / f"{name}.folded").read_text().splitlines()
+    assert any(";_spin (" in line for line in folded)
+    assert sum(int(line.rsplit(" ", 1)[1]) for line in folded) == summary["samples"]
+
+
+def test_wrong_token_is_not_profiled(tmp_path):
+    client = _app(tmp_path, admin_token="secret")
+    response = client.get("/slow/1", headers={PROFILE_HEADER: "guess"})
+    assert PROFILE_ID_HEADER not in response.headers
+    assert list(tmp_path.iterdir()) == []
+
+
+def test_sampled_profiles_are_kept_only_for_slow_requests(tmp_path):
+    client = _app(tmp_path, sample_rate=1.0, min_duration_ms=50)
+    client.get("/slow/1")
+    assert list(tmp_path.iterdir()) == []
+    response = client.get("/slow/80")
+    # Sampled profiles are saved without announcing themselves to the caller
+    assert PROFILE_ID_HEADER not in response.headers
+    assert sorted(path.suffix for path in tmp_path.iterdir()) == [".folded", ".json"]
+
+
+def test_profiler_is_off_unless_configured(tmp_path):
+    assert init_profiler(Flask(__name__), str(tmp_path)) is None
+
+
+def test_summary_counts_self_and_total_samples():
+    summary = summarize(Counter({"main;handler;query": 3, "main;handler": 1, "main;other": 1}))
+    assert summary["samples"] == 5
+    assert summary["top_self"][0] == {"frame": "query", "samples": 3, "percent": 60.0}
+    assert {entry["frame"]: entry["samples"] for entry in summary["top_total"]} == {
+        "main": 5, "handler": 4, "query": 3, "other": 1}
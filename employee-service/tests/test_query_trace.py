@@ -0,0 +1,73 @@
+import pytest
+from flask import Flask, jsonify
+import utils.query_trace as query_trace
+from utils.metrics import mark_cached, track_storage
+from utils.query_trace import TRACE_HEADER, TRACE_OPERATIONS_HEADER, budget_report, check_budgets, init_query_trace
+
+
+class _Store:
+    @track_storage("read")
+    def get_document(self, collection, doc_id):
+        if doc_id == "cached":
+            mark_cached()
+        return {"id": doc_id}
+
+    @track_storage("read")
+    def get_documents(self, collection, doc_ids):
+        # Nested calls belong to this one operation
+        return [self.get_document(collection, doc_id) for doc_id in doc_ids]
+
+
+@pytest.fixture
+def traced(monkeypatch):
+    monkeypatch.setattr(query_trace, "_settings", dict(query_trace._settings))
+    monkeypatch.setattr(query_trace, "_route_reports", {})
+    app = Flask(__name__)
+    store = _Store()
+
+    @app.route("/one-by-one")
+    def one_by_one():
+        return jsonify([store.get_document("employees", doc_id) for doc_id in ("a", "b", "a", "cached")])
+
+    @app.route("/batched")
+    def batched():
+        return jsonify(store.get_documents("employees", ["a", "b", "c"]))
+
+    init_query_trace(app, enabled=True, repeat_threshold=3)
+    return app.test_client()
+
+
+def test_repeated_and_duplicate_queries_are_flagged(traced):
+    response = traced.get("/one-by-one")
+    summary = response.headers[TRACE_HEADER]
+    assert "ops=4; reads=4; writes=0; cache_hits=1; docs=4" in summary
+    assert "repeated=get_document:employees*4" in summary
+    # Only "a" was read twice with the same arguments
+    assert "duplicates=get_document:employees*1" in summary
+    assert response.headers[TRACE_OPERATIONS_HEADER].count("get_document:employees=1/") == 4
+
+
+def test_batched_reads_count_once(traced):
+    summary = traced.get("/batched").headers[TRACE_HEADER]
+    assert summary.startswith("ops=1; reads=1; writes=0; cache_hits=0; docs=3")
+    assert "repeated" not in summary and "duplicates" not in summary
+
+
+def test_budget_report_and_checks(traced):
+    traced.get("/one-by-one")
+    traced.get("/batched")
+    traced.get("/batched")
+    report = budget_report()
+    assert report["GET /batched"]["requests"] == 2
+    assert report["GET /batched"]["documents"] == {"max": 3, "mean": 3.0}
+    assert report["GET /one-by-one"]["repeated"] == {"get_document:employees": 1}
+    assert traced.get("/debug/query-budget").get_json()["GET /batched"] == report["GET /batched"]
+
+    violations = check_budgets({"GET /batched": {"operations": 1, "documents": 2},
+                                "GET /one-by-one": {"operations": 10}})
+    assert violations == ["GET /batched: 3 documents per request exceeds the budget of 2",
+                          "GET /one-by-one: repeated queries get_document:employees"]
+
+
+def test_responses_carry_no_trace_when_disabled(client):
+    assert TRACE_HEADER not in client.get("/api/employee/all").headers
@@ -0,0 +1,60 @@
+import datetime
+import gzip
+import json
+import uuid
+import zlib
+import pytest
+from flask import jsonify
+from app import app
+from utils.json_codec import ENCODERS, get_encoder
+
+PAYLOAD = {
+    "status": 200,
+    "message": "Fetched ünïcode",
+    "data": [{"id": "EMP001", "ctc": 1200000.5, "tags": None, "ok": True}],
+    "when": datetime.datetime(2024, 6, 1, 9, 30),
+    "day": datetime.date(2024, 6, 1),
+    "ref": uuid.UUID("12345678-1234-5678-1234-567812345678"),
+}
+
+
+@pytest.mark.parametrize("name", sorted(ENCODERS))
+def test_every_encoder_matches_jsonify(name):
+    with app.app_context():
+        expected = json.loads(jsonify(PAYLOAD).get_data())
+    assert json.loads(get_encoder(name)(PAYLOAD)) == expected
+
+
+def test_unknown_encoder_falls_back_to_stdlib():
+    assert get_encoder("no-such-encoder") is ENCODERS["stdlib"]
+    assert get_encoder("auto") is ENCODERS.get("orjson", ENCODERS["stdlib"])
+
+
+def _listing(client, register, encoding):
+    for _ in range(5):
+        register()  # enough employees for the listing to pass the compression threshold
+    return client.get("/api/employee/all", headers={"Accept-Encoding": encoding})
+
+
+@pytest.mark.parametrize("encoding, decompress", [("gzip", gzip.decompress), ("deflate", zlib.decompress)])
+def test_large_bodies_are_compressed_when_accepted(client, register, encoding, decompress):
+    compressed = _listing(client, register, encoding)
+    identity = client.get("/api/employee/all")
+    assert compressed.headers["Content-Encoding"] == encoding
+    assert "Accept-Encoding" in compressed.headers["Vary"]
+    assert "Content-Encoding" not in identity.headers
+    assert json.loads(decompress(compressed.data)) == identity.get_json()
+
+
+def test_compressed_etag_is_weak_and_still_revalidates(client, register):
+    compressed = _listing(client, register, "gzip")
+    etag = compressed.headers["ETag"]
+    assert etag.startswith('W/"')
+    again = client.get("/api/employee/all", headers={"Accept-Encoding": "gzip", "If-None-Match": etag})
+    assert again.status_code == 304
+
+
+def test_small_and_error_bodies_are_left_alone(client):
+    missing = client.get("/api/employee/no-such-employee", headers={"Accept-Encoding": "gzip"})
+    assert missing.status_code == 404
+    assert "Content-Encoding" not in missing.headers
@@ -0,0 +1,92 @@
+from api.search_index import EmployeeSearchIndex
+
+EMPLOYEES = [
+    {"id": "EMP001", "name": "Priya Raman", "email": "priya.raman@example.com", "designation": "QA Engineer"},
+    {"id": "EMP002", "name": "Arun Kumar", "email": "arun@example.com", "designation": "Software Engineer"},
+    {"id": "EMP003", "name": "Karthik Iyer", "email": "kiyer@example.com", "designation": "Product Manager"},
+]
+
+
+def _index(employees=EMPLOYEES):
+    index = EmployeeSearchIndex(lambda: list(employees), lambda field, since: [],
+                                record_fields=["id", "name", "email", "designation"])
+    index.ensure_fresh()
+    return index
+
+
+def _ids(result):
+    records, total = result
+    assert total >= len(records)
+    return [record["id"] for record in records]
+
+
+def test_short_queries_match_inside_words():
+    # "ya" is inside "priya" and "iyer" but starts no word
+    assert set(_ids(_index().search("ya", fields=("name",)))) == {"EMP001"}
+    assert set(_ids(_index().search("er", fields=("name",)))) == {"EMP003"}
+
+
+def test_short_queries_in_prefix_mode_only_match_word_starts():
+    index = _index()
+    assert _ids(index.search("ya", fields=("name",), prefix_only=True)) == []
+    assert _ids(index.search("ra", fields=("name",), prefix_only=True)) == ["EMP001"]
+
+
+def test_results_are_ranked_exact_prefix_word_then_substring():
+    employees = [
+        {"id": "sub", "name": "Jamesine Cole"},
+        {"id": "word", "name": "Amy Jamesine"},
+        {"id": "prefix", "name": "Jameson Park"},
+        {"id": "exact", "name": "James"},
+        {"id": "inner", "name": "Bojames Lee"},
+    ]
+    index = _index(employees)
+    # Ties within a tier are broken by name
+    assert _ids(index.search("james", fields=("name",))) == ["exact", "sub", "prefix", "word", "inner"]
+    records, total = index.search("james", fields=("name",), limit=2)
+    assert total == 5 and len(records) == 2
+    assert _ids(index.search("james", fields=("name",), prefix_only=True)) == ["exact", "sub", "prefix", "word"]
+
+
+def test_earlier_fields_rank_first():
+    employees = [
+        {"id": "by-email", "name": "Zed", "email": "lead@example.com"},
+        {"id": "by-name", "name": "Lead Person", "email": "x@example.com"},
+    ]
+    assert _ids(_index(employees).search("lead", fields=("name", "email"))) == ["by-name", "by-email"]
+
+
+def test_upsert_and_remove_keep_the_index_current():
+    index = _index()
+    index.upsert({"id": "EMP002", "name": "Arun Prakash", "email": "arun@example.com", "designation": "Engineer"})
+    assert _ids(index.search("kumar", fields=("name",))) == []
+    assert _ids(index.search("prakash", fields=("name",))) == ["EMP002"]
+    index.remove("EMP002")
+    assert _ids(index.search("arun", fields=("name", "email"))) == []
+
+
+def test_refresh_folds_in_writes_made_elsewhere():
+    changed = []
+    index = EmployeeSearchIndex(lambda: list(EMPLOYEES), lambda field, since: list(changed),
+                                record_fields=["id", "name"], refresh_seconds=3600)
+    index.ensure_fresh()
+    changed.append({"id": "EMP004", "name": "Meena Das", "email": "meena@example.com", "designation": "HR"})
+    index.ensure_fresh()
+    assert _ids(index.search("meena", fields=("name",))) == []  # still within refresh_seconds
+
+    index.mark_stale()
+    index.ensure_fresh()
+    assert _ids(index.search("meena", fields=("name",))) == ["EMP004"]
+
+
+def test_search_endpoint(client, register):
+    employee = register(name="Zephyrine Quill")
+    response = client.get("/api/employee/search", query_string={"q": "phyrin"})
+    assert response.status_code == 200
+    assert [emp["id"] for emp in response.get_json()["data"]] == [employee["id"]]
+    assert "password" not in response.get_json()["data"][0]
+
+    typeahead = client.get("/api/employee/search", query_string={"q": "phyrin", "mode": "prefix"})
+    assert typeahead.get_json()["data"] == []
+    assert client.get("/api/employee/search").status_code == 400
+    assert client.get("/api/employee/search", query_string={"q": "x", "field": "ctc"}).status_code == 400
@@ -0,0 +1,117 @@
+import datetime
+import pytest
+from storage import AlreadyExists, NotFound, create_local_client, transactional
+
+
+@pytest.fixture(params=["memory", "sqlite"])
+def store(request, tmp_path):
+    client = create_local_client(request.param, str(tmp_path / "store.db"))
+    people = client.collection("people")
+    people.document("a").set({"name": "Asha", "age": 31, "tags": ["qa", "lead"], "address": {"city": "Pune"}})
+    people.document("b").set({"name": "Bala", "age": 25, "tags": ["dev"], "address": {"city": "Chennai"}})
+    people.document("c").set({"name": "Chitra", "age": 40, "tags": ["dev", "lead"]})
+    people.document("d").set({"name": "Dev", "age": "unknown"})
+    yield client
+    client.close()
+
+
+def _ids(query):
+    return [snapshot.id for snapshot in query.stream()]
+
+
+def test_filters(store):
+    people = store.collection("people")
+    assert _ids(people.where("name", "==", "Bala")) == ["b"]
+    # Range filters only match values of the operand's type
+    assert _ids(people.where("age", ">=", 30)) == ["a", "c"]
+    assert _ids(people.where("name", "in", ["Asha", "Dev", "Nobody"])) == ["a", "d"]
+    assert _ids(people.where("tags", "array_contains", "lead")) == ["a", "c"]
+    assert _ids(people.where("tags", "array_contains", "dev").where("age", "<", 30)) == ["b"]
+    assert _ids(people.where("address.city", "==", "Pune")) == ["a"]
+
+
+def test_ordering_limit_and_cursors(store):
+    people = store.collection("people")
+    # Ordering by a field leaves out documents without a value of any type for it
+    assert _ids(people.order_by("address.city")) == ["b", "a"]
+    by_age = people.where("age", ">", 0).order_by("age", direction="DESCENDING")
+    assert _ids(by_age) == ["c", "a", "b"]
+
+    first_page = by_age.limit(2).get()
+    assert [snapshot.id for snapshot in first_page] == ["c", "a"]
+    assert _ids(by_age.start_after(first_page[-1]).limit(2)) == ["b"]
+
+
+def test_select_projects_fields(store):
+    snapshots = store.collection("people").where("name", "==", "Asha").select(["name", "address.city"]).get()
+    assert snapshots[0].to_dict() == {"name": "Asha", "address": {"city": "Pune"}}
+    assert store.collection("people").document("b").get(field_paths=["age"]).to_dict() == {"age": 25}
+    # An empty projection keeps the document IDs only
+    assert [snapshot.to_dict() for snapshot in store.collection("people").select(["__name__"]).limit(1).get()] == [{}]
+
+
+def test_document_writes(store):
+    people = store.collection("people")
+    with pytest.raises(AlreadyExists):
+        people.document("a").create({"name": "Someone else"})
+    with pytest.raises(NotFound):
+        people.document("missing").update({"name": "x"})
+
+    people.document("a").update({"address.zip": "411001", "age": 32})
+    people.document("b").set({"address": {"zip": "600001"}}, merge=True)
+    assert people.document("a").get().to_dict()["address"] == {"city": "Pune", "zip": "411001"}
+    assert people.document("b").get().to_dict()["address"] == {"city": "Chennai", "zip": "600001"}
+
+    people.document("d").delete()
+    assert not people.document("d").get().exists
+
+
+def test_batches_are_all_or_nothing(store):
+    people = store.collection("people")
+    batch = store.batch()
+    batch.set(people.document("e"), {"name": "Esha"})
+    batch.create(people.document("a"), {"name": "Duplicate"})
+    with pytest.raises(AlreadyExists):
+        batch.commit()
+    assert not people.document("e").get().exists
+    assert people.document("a").get().to_dict()["name"] == "Asha"
+
+
+def test_transactions_commit_on_return_and_discard_on_error(store):
+    people = store.collection("people")
+
+    @transactional
+    def move_age(transaction, source, target, fail=False):
+        age = people.document(source).get(transaction=transaction).to_dict()["age"]
+        transaction.update(people.document(target), {"age": age})
+        transaction.delete(people.document(source))
+        if fail:
+            raise RuntimeError("abort")
+
+    with pytest.raises(RuntimeError):
+        move_age(store.transaction(), "a", "b", fail=True)
+    assert people.document("a").get().exists and people.document("b").get().to_dict()["age"] == 25
+
+    move_age(store.transaction(), "a", "b")
+    assert not people.document("a").get().exists and people.document("b").get().to_dict()["age"] == 31
+
+
+def test_reads_return_independent_copies(store):
+    snapshot = store.collection("people").document("a").get()
+    snapshot.to_dict()["tags"].append("changed")
+    assert store.collection("people").document("a").get().to_dict()["tags"] == ["qa", "lead"]
+
+
+def test_sqlite_file_is_shared_between_clients_and_keeps_dates(tmp_path):
+    path = str(tmp_path / "shared.db")
+    writer, reader = create_local_client("sqlite", path), create_local_client("sqlite", path)
+    when = datetime.datetime(2024, 6, 1, 9, 30)
+    writer.collection("attendance").document("x").set({"clock_in": when, "day": when.date()})
+    assert reader.collection("attendance").document("x").get().to_dict() == {"clock_in": when, "day": when.date()}
+    writer.close()
+    reader.close()
+
+
+def test_unknown_backend_is_rejected():
+    with pytest.raises(ValueError, match="Unknown storage backend"):
+        create_local_client("postgres")
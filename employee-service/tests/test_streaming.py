@@ -0,0 +1,40 @@
+import json
+import pytest
+import api.service as service
+
+
+def _failing_after(count):
+    def iter_documents(collection, fields=None, filters=None):
+        for number in range(count):
+            yield {"id": f"EMP{number}", "name": f"Employee {number}"}
+        raise RuntimeError("stream reset")
+    return iter_documents
+
+
+def test_json_stream_matches_the_listing(client, register):
+    register()
+    listed = client.get("/api/employee/all").get_json()["data"]
+    streamed = client.get("/api/employee/all?stream=json")
+    assert streamed.status_code == 200
+    body = json.loads(streamed.data)
+    assert body["status"] == 200 and "error" not in body
+    assert [employee["id"] for employee in body["data"]] == [employee["id"] for employee in listed]
+    assert "ETag" not in streamed.headers
+
+
+@pytest.mark.parametrize("count", [0, 3])
+def test_json_stream_failure_closes_the_envelope_with_an_error(client, monkeypatch, count):
+    monkeypatch.setattr(service.db, "iter_documents", _failing_after(count))
+    response = client.get("/api/employee/all?stream=json")
+    body = json.loads(response.data)
+    assert len(body["data"]) == count
+    assert body["error"]["status"] == 500
+    assert "stream reset" in body["error"]["message"]
+
+
+def test_ndjson_stream_failure_ends_with_an_error_line(client, monkeypatch):
+    monkeypatch.setattr(service.db, "iter_documents", _failing_after(2))
+    response = client.get("/api/employee/all?stream=ndjson")
+    lines = [json.loads(line) for line in response.data.splitlines()]
+    assert [line.get("id") for line in lines[:2]] == ["EMP0", "EMP1"]
+    assert "stream reset" in lines[2]["error"]["message"]
@@ -0,0 +1,75 @@
+import threading
+import api.service as service
+from api.service import EMPLOYEE_COLLECTION
+from utils.write_behind import WriteBehindBuffer
+
+
+def _buffer(flush_fn, **kwargs):
+    options = {"flush_interval": 3600, "max_batch": 100}
+    options.update(kwargs)
+    return WriteBehindBuffer(flush_fn, **options)
+
+
+def test_updates_to_one_document_are_coalesced():
+    flushed = []
+    buffer = _buffer(flushed.append)
+    buffer.enqueue("employees", "a", {"last_login": "1", "x": 1})
+    buffer.enqueue("employees", "a", {"last_login": "2"})
+    buffer.enqueue("employees", "b", {"last_login": "3"})
+    assert buffer.queue_depth() == 2
+
+    assert buffer.flush() == 2
+    assert flushed == [{("employees", "a"): {"last_login": "2", "x": 1}, ("employees", "b"): {"last_login": "3"}}]
+    stats = buffer.stats()
+    assert stats["coalesced"] == 1 and stats["flushed"] == 2 and stats["queue_depth"] == 0
+    buffer.drain(0)
+
+
+def test_a_full_queue_is_flushed_without_waiting_for_the_interval():
+    done = threading.Event()
+    buffer = _buffer(lambda pending: done.set(), max_batch=2)
+    buffer.enqueue("employees", "a", {"v": 1})
+    assert not done.wait(0.1)
+    buffer.enqueue("employees", "b", {"v": 1})
+    assert done.wait(5)
+    buffer.drain(1)
+
+
+def test_failed_flush_requeues_under_newer_values():
+    attempts = []
+
+    def failing(pending):
+        attempts.append(dict(pending))
+        raise RuntimeError("storage unavailable")
+    buffer = _buffer(failing)
+    buffer.enqueue("employees", "a", {"last_login": "1", "x": 1})
+    assert buffer.flush() == 0
+    buffer.enqueue("employees", "a", {"last_login": "2"})
+    buffer.flush()
+    assert attempts[-1] == {("employees", "a"): {"last_login": "2", "x": 1}}
+    assert buffer.stats()["flush_failures"] == 2
+
+    # Draining gives up at the deadline and reports what is left
+    assert buffer.drain(0.2) == 1
+
+
+def test_login_defers_last_login_until_the_flush(client, register, other_worker):
+    employee = register()
+    login = client.post("/api/employee/login", json={"email": employee["email"],
+                                                      "password": employee["raw_password"]})
+    assert login.status_code == 200
+    # This worker serves the new value at once; storage gets it on the next flush
+    assert service.db.get_document(EMPLOYEE_COLLECTION, employee["id"]).get("last_login")
+    service.db.write_behind.flush()
+    assert service.db.get_document(EMPLOYEE_COLLECTION, employee["id"], cached=False).get("last_login")
+
+
+def test_flush_skips_documents_deleted_in_the_meantime(register):
+    kept, deleted = register(), register()
+    service.db.defer_update(EMPLOYEE_COLLECTION, kept["id"], {"last_login": "then"})
+    service.db.defer_update(EMPLOYEE_COLLECTION, deleted["id"], {"last_login": "then"})
+    service.db.delete_document(EMPLOYEE_COLLECTION, deleted["id"])
+
+    service.db.write_behind.flush()
+    assert service.db.get_document(EMPLOYEE_COLLECTION, kept["id"], cached=False)["last_login"] == "then"
+    assert service.db.get_document(EMPLOYEE_COLLECTION, deleted["id"], cached=False) is None
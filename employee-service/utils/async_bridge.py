@@ -0,0 +1,54 @@
+# Shared with the other service: edit common/utils/async_bridge.py and run tools/sync_common.py
+import asyncio
+import os
+import threading
+
+_loop = None
+_loop_pid = None
+_loop_lock = threading.Lock()
+
+
+def get_event_loop():
+    """
+    Return this process's background event loop, starting it on first use.
+
+    Flask handlers are synchronous, so async data access runs on one long-lived
+    loop in a daemon thread. The loop (and any async clients bound to it) is
+    recreated after a fork.
+    """
+    global _loop, _loop_pid
+    if _loop is not None and _loop_pid == os.getpid():
+        return _loop
+    with _loop_lock:
+        if _loop is None or _loop_pid != os.getpid():
+            loop = asyncio.new_event_loop()
+            thread = threading.Thread(target=loop.run_forever, name="async-bridge", daemon=True)
+            thread.start()
+            _loop, _loop_pid = loop, os.getpid()
+    return _loop
+
+
+def run_async(coro, timeout=None):
+    """
+    Run a coroutine on the background loop and wait for its result from synchronous code.
+
+    Raises:
+        concurrent.futures.TimeoutError: If timeout seconds pass first (the coroutine is cancelled)
+    """
+    future = asyncio.run_coroutine_threadsafe(coro, get_event_loop())
+    try:
+        return future.result(timeout)
+    except Exception:
+        future.cancel()
+        raise
+
+
+async def gather_limited(coros, limit=10):
+    """asyncio.gather with at most limit coroutines in flight, results in input order"""
+    semaphore = asyncio.Semaphore(max(1, int(limit)))
+
+    async def _run(coro):
+        async with semaphore:
+            return await coro
+
+    return await asyncio.gather(*(_run(coro) for coro in coros))
@@ -0,0 +1,96 @@
+import os
+import threading
+import uuid
+from datetime import datetime
+from storage import supports_listeners
+
+# Collection holding one version document per versioned collection
+VERSIONS_COLLECTION = "collection_versions"
+
+
+class CollectionVersion:
+    """
+    Version token of a collection, shared by every worker through a version document.
+
+    Every write made through FirestoreDB replaces the token, so any worker can tell
+    whether the collection changed without reading it. On Firestore the document is
+    followed with a listener and reading the version costs nothing; backends without
+    listeners read the document instead.
+
+    Args:
+        client: Firestore (or LocalClient) client
+        collection (str): Name of the versioned collection
+    """
+
+    def __init__(self, client, collection):
+        self.client = client
+        self.collection = collection
+        self._ref = client.collection(VERSIONS_COLLECTION).document(collection)
+        self._token = None
+        self._local_changes = 0
+        self._callbacks = []
+        self._lock = threading.Lock()
+        self._watch = None
+        self._pid = None
+
+    def subscribe(self, callback):
+        """Call callback() whenever a write made by another worker is observed"""
+        self._callbacks.append(callback)
+
+    def next_version(self):
+        """Start a new version locally and return the version document that publishes it"""
+        token = uuid.uuid4().hex
+        with self._lock:
+            self._token = token
+            self._local_changes = 0
+        return {"version": token, "updated_at": datetime.utcnow().isoformat()}
+
+    def bump(self):
+        """Record a write: replace the shared token (this worker sees it immediately)"""
+        self._ref.set(self.next_version())
+
+    def touch(self):
+        """Record a change only this worker serves so far (e.g. a write-behind update waiting to be flushed)"""
+        with self._lock:
+            self._local_changes += 1
+
+    def _observe(self, token):
+        with self._lock:
+            if token == self._token:
+                return
+            foreign = self._token is not None or token is not None
+            self._token = token
+            self._local_changes = 0
+        if foreign:
+            for callback in self._callbacks:
+                callback()
+
+    def _on_snapshot(self, snapshots, changes, read_time):
+        for snapshot in snapshots:
+            self._observe((snapshot.to_dict() or {}).get("version") if snapshot.exists else None)
+
+    def _listening(self):
+        # Started lazily (and restarted after a fork) so every worker process has its own listener
+        if self._pid != os.getpid():
+            self._pid = os.getpid()
+            self._watch = None
+            if supports_listeners(self.client):
+                try:
+                    self._watch = self._ref.on_snapshot(self._on_snapshot)
+                except Exception as e:
+                    print(f"Could not listen to the {self.collection} version, reading it instead: {str(e)}")
+        return self._watch is not None and getattr(self._watch, "is_active", True)
+
+    def current(self):
+        """
+        Return the current version as a string.
+
+        Returns:
+            tuple: (version, read) where read tells whether the version document had to be read
+        """
+        read = not self._listening()
+        if read:
+            snapshot = self._ref.get()
+            self._observe((snapshot.to_dict() or {}).get("version") if snapshot.exists else None)
+        with self._lock:
+            return f"{self._token or 'initial'}-{self._local_changes}", read
@@ -0,0 +1,93 @@
+import threading
+import time
+from collections import OrderedDict
+
+
+class DirectoryCache:
+    """
+    Thread-safe in-process cache with a bounded size, per-entry TTL and LRU eviction.
+
+    Args:
+        max_size (int): Maximum number of entries kept before the least recently used is evicted
+        ttl_seconds (float): How long an entry stays valid after it was stored
+    """
+
+    def __init__(self, max_size=10000, ttl_seconds=60):
+        self.max_size = max(1, int(max_size))
+        self.ttl_seconds = float(ttl_seconds)
+        self._entries = OrderedDict()  # key -> (expires_at, value)
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        # Bumped on every invalidation so readers can detect writes that raced their fetch
+        self.generation = 0
+
+    def get(self, key, default=None):
+        """Return the cached value for key, or default if it is missing or expired"""
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return default
+            expires_at, value = entry
+            if expires_at <= now:
+                del self._entries[key]
+                self.misses += 1
+                return default
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def put(self, key, value, generation=None):
+        """
+        Store value under key, evicting the least recently used entries if the cache is full.
+
+        If generation is given and an invalidation happened since it was read,
+        the value may already be stale and is not stored.
+        """
+        with self._lock:
+            if generation is not None and generation != self.generation:
+                return
+            self._entries[key] = (time.monotonic() + self.ttl_seconds, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def update(self, key, fields):
+        """Merge fields into a cached dict value, if one is cached; the TTL is left unchanged"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                expires_at, value = entry
+                merged = dict(value)
+                merged.update(fields)
+                self._entries[key] = (expires_at, merged)
+
+    def invalidate(self, key):
+        """Drop a single entry"""
+        with self._lock:
+            self._entries.pop(key, None)
+            self.generation += 1
+
+    def clear(self):
+        """Drop every entry"""
+        with self._lock:
+            self._entries.clear()
+            self.generation += 1
+
+    def stats(self):
+        """Return hit/miss counters and current occupancy"""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "size": len(self._entries),
+                "max_size": self.max_size,
+                "ttl_seconds": self.ttl_seconds,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "hit_ratio": round(self.hits / lookups, 4) if lookups else 0
+            }
@@ -0,0 +1,32 @@
+from functools import wraps
+from flask import current_app, request
+
+
+def conditional_get(current_version):
+    """
+    Decorate a view returning a response_wrapper tuple with ETag / If-None-Match handling.
+
+    The ETag is the collection version, which every worker shares, so a matching
+    If-None-Match is answered with 304 before the view runs: no employee data is
+    read and nothing is serialized. Successful, non-streamed responses carry the ETag.
+
+    Args:
+        current_version (callable): Returns the version of the collection the view reads
+    """
+    def decorator(view):
+        @wraps(view)
+        def wrapper(*args, **kwargs):
+            etag = current_version()
+            # Weak comparison, so tags a compressing proxy marked weak still revalidate
+            if request.if_none_match.contains_weak(etag):
+                not_modified = current_app.response_class(status=304)
+                not_modified.set_etag(etag)
+                return not_modified
+
+            response, status_code = view(*args, **kwargs)
+            # A stream can still fail part way, so it is never marked as a representation to reuse
+            if status_code == 200 and not response.is_streamed:
+                response.set_etag(etag)
+            return response, status_code
+        return wrapper
+    return decorator
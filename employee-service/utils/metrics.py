@@ -0,0 +1,403 @@
+# Shared with the other service: edit common/utils/metrics.py and run tools/sync_common.py
+import bisect
+import glob
+import inspect
+import json
+import logging
+import os
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from functools import wraps
+from flask import Response, g, has_request_context, request
+from utils.query_trace import current_trace
+
+# Latency histogram bucket upper bounds, in seconds
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+COUNTER, GAUGE, HISTOGRAM = "counter", "gauge", "histogram"
+
+# Route label for storage calls made outside a request (background flushes, replicas)
+BACKGROUND_ROUTE = "<background>"
+UNMATCHED_ROUTE = "<unmatched>"
+
+HTTP_REQUESTS = "http_requests_total"
+HTTP_DURATION = "http_request_duration_seconds"
+HTTP_IN_FLIGHT = "http_requests_in_flight"
+STORAGE_OPERATIONS = "firestore_operations_total"
+STORAGE_DOCUMENTS_READ = "firestore_documents_read_total"
+STORAGE_DURATION = "firestore_operation_duration_seconds"
+
+
+class Registry:
+    """
+    Counters, gauges and histograms kept in this process.
+
+    Values are plain floats (histograms: bucket counts, sum and count) keyed by
+    metric name and label values, so recording is one dict update under a lock.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._definitions = {}  # name -> (type, help, label names)
+        self._values = {}  # (name, label values) -> float, or [bucket counts, sum, count] for histograms
+
+    def define(self, name, kind, help_text, labelnames):
+        self._definitions[name] = (kind, help_text, tuple(labelnames))
+
+    def inc(self, name, labels, amount=1):
+        key = (name, labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def observe(self, name, labels, value):
+        key = (name, labels)
+        index = bisect.bisect_left(LATENCY_BUCKETS, value)
+        with self._lock:
+            histogram = self._values.get(key)
+            if histogram is None:
+                histogram = self._values[key] = [[0] * (len(LATENCY_BUCKETS) + 1), 0.0, 0]
+            histogram[0][index] += 1
+            histogram[1] += value
+            histogram[2] += 1
+
+    def snapshot(self):
+        """[name, label values, value] for every series, safe to serialize"""
+        with self._lock:
+            return [[name, list(labels), [list(value[0]), value[1], value[2]] if isinstance(value, list) else value]
+                    for (name, labels), value in self._values.items()]
+
+    def render(self, snapshots):
+        """Prometheus text exposition of the summed snapshots"""
+        merged = {}
+        for snapshot, include_gauges in snapshots:
+            for name, labels, value in snapshot:
+                definition = self._definitions.get(name)
+                if definition is None or (definition[0] == GAUGE and not include_gauges):
+                    continue
+                key = (name, tuple(labels))
+                if definition[0] == HISTOGRAM:
+                    current = merged.setdefault(key, [[0] * (len(LATENCY_BUCKETS) + 1), 0.0, 0])
+                    current[0] = [a + b for a, b in zip(current[0], value[0])]
+                    current[1] += value[1]
+                    current[2] += value[2]
+                else:
+                    merged[key] = merged.get(key, 0) + value
+
+        lines = []
+        for name, (kind, help_text, labelnames) in sorted(self._definitions.items()):
+            series = sorted((labels, value) for (series_name, labels), value in merged.items() if series_name == name)
+            lines.append(f"# HELP {name} {help_text}")
+            lines.append(f"# TYPE {name} {kind}")
+            for labels, value in series:
+                pairs = list(zip(labelnames, labels))
+                if kind == HISTOGRAM:
+                    cumulative = 0
+                    for bound, count in zip(LATENCY_BUCKETS + (float("inf"),), value[0]):
+                        cumulative += count
+                        le = "+Inf" if bound == float("inf") else repr(bound)
+                        lines.append(f"{name}_bucket{_format_labels(pairs + [('le', le)])} {cumulative}")
+                    lines.append(f"{name}_sum{_format_labels(pairs)} {value[1]!r}")
+                    lines.append(f"{name}_count{_format_labels(pairs)} {value[2]}")
+                else:
+                    lines.append(f"{name}{_format_labels(pairs)} {_format_value(value)}")
+        return "\n".join(lines) + "\n"
+
+
+def _escape(value):
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _format_labels(pairs):
+    if not pairs:
+        return ""
+    return "{" + ",".join(f'{key}="{_escape(value)}"' for key, value in pairs) + "}"
+
+
+def _format_value(value):
+    return str(int(value)) if float(value).is_integer() else repr(float(value))
+
+
+registry = Registry()
+registry.define(HTTP_REQUESTS, COUNTER, "HTTP requests by route, method and status code", ("route", "method", "status"))
+registry.define(HTTP_DURATION, HISTOGRAM, "HTTP request latency in seconds", ("route", "method"))
+registry.define(HTTP_IN_FLIGHT, GAUGE, "HTTP requests currently being served", ("route", "method"))
+registry.define(STORAGE_OPERATIONS, COUNTER, "FirestoreDB calls by calling route, operation and source",
+                ("route", "operation", "source"))
+registry.define(STORAGE_DOCUMENTS_READ, COUNTER, "Documents returned by FirestoreDB reads",
+                ("route", "operation", "source"))
+registry.define(STORAGE_DURATION, HISTOGRAM, "FirestoreDB call latency in seconds by calling route and kind",
+                ("route", "kind"))
+
+
+class _ProcessExporter:
+    """
+    Shares this process's metrics with the other gunicorn workers.
+
+    Each worker writes its snapshot to metrics_dir every flush_seconds (and on
+    exit); /metrics sums the live registry of the worker that serves the scrape
+    with the files of every other worker. Counters of workers that have exited
+    are kept, so totals never go backwards; their gauges are dropped.
+    """
+
+    def __init__(self):
+        self.metrics_dir = None
+        self.flush_seconds = 5
+        self._pid = None
+        self._lock = threading.Lock()
+
+    def _path(self, pid):
+        return os.path.join(self.metrics_dir, f"metrics-{pid}.json")
+
+    def start(self):
+        """Start the flush thread in this process (again after a fork)"""
+        if not self.metrics_dir or self._pid == os.getpid():
+            return
+        with self._lock:
+            if self._pid == os.getpid():
+                return
+            self._pid = os.getpid()
+            os.makedirs(self.metrics_dir, exist_ok=True)
+            threading.Thread(target=self._flush_loop, name="metrics-flush", daemon=True).start()
+
+    def _flush_loop(self):
+        while True:
+            time.sleep(self.flush_seconds)
+            try:
+                self.flush()
+            except OSError as e:
+                logging.error(f"Error writing metrics snapshot: {str(e)}")
+
+    def flush(self):
+        if not self.metrics_dir or self._pid != os.getpid():
+            return
+        path = self._path(self._pid)
+        temporary = f"{path}.tmp"
+        with open(temporary, "w") as snapshot_file:
+            json.dump({"pid": self._pid, "metrics": registry.snapshot()}, snapshot_file)
+        os.replace(temporary, path)
+
+    def collect(self):
+        """(snapshot, include_gauges) for this process and every other worker's last flush"""
+        snapshots = [(registry.snapshot(), True)]
+        if not self.metrics_dir:
+            return snapshots
+        for path in glob.glob(os.path.join(self.metrics_dir, "metrics-*.json")):
+            try:
+                with open(path) as snapshot_file:
+                    data = json.load(snapshot_file)
+            except (OSError, ValueError):
+                continue  # Being replaced or removed
+            if data["pid"] != os.getpid():
+                snapshots.append((data["metrics"], _pid_alive(data["pid"])))
+        return snapshots
+
+
+def clear_snapshots(metrics_dir):
+    """Remove worker snapshots left in metrics_dir by a previous server run"""
+    for path in glob.glob(os.path.join(metrics_dir, "metrics-*.json*")):
+        os.remove(path)
+
+
+def _pid_alive(pid):
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        pass
+    return True
+
+
+exporter = _ProcessExporter()
+
+
+def current_route():
+    """URL rule of the request being served, used as the route label"""
+    if not has_request_context():
+        return BACKGROUND_ROUTE
+    rule = request.url_rule
+    return rule.rule if rule is not None else UNMATCHED_ROUTE
+
+
+def _before_request():
+    exporter.start()
+    labels = (current_route(), request.method)
+    g.metrics_request = (labels, time.perf_counter())
+    registry.inc(HTTP_IN_FLIGHT, labels)
+
+
+def _after_request(response):
+    g.metrics_status = response.status_code
+    return response
+
+
+def _teardown_request(exc):
+    started = g.pop("metrics_request", None)
+    if started is None:
+        return
+    labels, started_at = started
+    status = 500 if exc is not None else g.pop("metrics_status", 500)
+    registry.inc(HTTP_IN_FLIGHT, labels, -1)
+    registry.observe(HTTP_DURATION, labels, time.perf_counter() - started_at)
+    registry.inc(HTTP_REQUESTS, labels + (str(status),))
+
+
+def _metrics_view():
+    return Response(registry.render(exporter.collect()), mimetype="text/plain; version=0.0.4")
+
+
+def init_metrics(app, metrics_dir=None, flush_seconds=5, path="/metrics"):
+    """
+    Record request count, latency and in-flight gauges per route, and serve them on path.
+
+    Args:
+        app (Flask): Application to instrument
+        metrics_dir (str, optional): Directory shared by the workers of one server; per-process metrics when omitted
+        flush_seconds (float): How often each worker publishes its metrics to metrics_dir
+        path (str): URL of the Prometheus endpoint
+    """
+    exporter.metrics_dir = metrics_dir or None
+    exporter.flush_seconds = flush_seconds
+    app.before_request(_before_request)
+    app.after_request(_after_request)
+    app.teardown_request(_teardown_request)
+    app.add_url_rule(path, "metrics", _metrics_view)
+
+
+class _StorageCall:
+    """One FirestoreDB operation being counted: what it was, when it started and what it returned"""
+    __slots__ = ("operation", "kind", "shape", "arguments", "started_at", "documents", "cached")
+
+    def __init__(self, operation, kind, shape, arguments=None):
+        self.operation = operation
+        self.kind = kind
+        self.shape = shape
+        self.arguments = arguments
+        self.started_at = time.perf_counter()
+        self.documents = 0
+        self.cached = False
+
+
+# The instrumented FirestoreDB call in progress; nested calls are counted once, by the outermost one
+_storage_call = ContextVar("storage_call", default=None)
+
+
+def mark_cached():
+    """Note that the FirestoreDB call in progress was answered from a local cache"""
+    call = _storage_call.get()
+    if call is not None:
+        call.cached = True
+
+
+def _default_document_count(result):
+    if result is None:
+        return 0
+    if isinstance(result, (list, set, frozenset)):
+        return len(result)
+    return 1
+
+
+def _record_storage_call(call):
+    elapsed = time.perf_counter() - call.started_at
+    route = current_route()
+    source = "cache" if call.cached else "firestore"
+    registry.inc(STORAGE_OPERATIONS, (route, call.operation, source))
+    registry.observe(STORAGE_DURATION, (route, call.kind), elapsed)
+    if call.kind == "read":
+        registry.inc(STORAGE_DOCUMENTS_READ, (route, call.operation, source), call.documents)
+    trace = current_trace()
+    if trace is not None:
+        trace.record(call.operation, call.kind, call.shape, call.arguments, call.documents, elapsed, call.cached)
+
+
+@contextmanager
+def storage_operation(operation, kind, shape=None):
+    """
+    Count and time a block of raw client calls like a decorated FirestoreDB method.
+
+    Set documents on the yielded object to the number of documents the block read.
+    """
+    if _storage_call.get() is not None:
+        yield _StorageCall(operation, kind, shape)  # Part of an outer operation, which is what gets counted
+        return
+    call = _StorageCall(operation, kind, shape or operation)
+    token = _storage_call.set(call)
+    try:
+        yield call
+    finally:
+        _storage_call.reset(token)
+        _record_storage_call(call)
+
+
+def _shape_parameter(fn):
+    """Index in the call's args of the collection argument that distinguishes query shapes, if any"""
+    parameters = list(inspect.signature(fn).parameters)
+    for name in ("collection", "key_collection"):
+        if name in parameters:
+            return parameters.index(name)
+    return None
+
+
+def track_storage(kind, documents=_default_document_count):
+    """
+    Decorator for FirestoreDB methods: counts calls and documents read, and times them, per route.
+
+    Args:
+        kind (str): "read" or "write"
+        documents (callable): Number of documents in the method's return value (reads only);
+            generator methods count the items they yield
+    """
+    def decorator(fn):
+        operation = fn.__name__
+        shape_index = _shape_parameter(fn)
+
+        def start_call(args, kwargs):
+            shape = operation
+            if shape_index is not None and len(args) > shape_index:
+                shape = f"{operation}:{args[shape_index]}"
+            # Arguments are only kept while a query trace is collecting them (to spot identical repeats)
+            arguments = (args[1:], kwargs) if current_trace() is not None else None
+            return _StorageCall(operation, kind, shape, arguments)
+
+        if inspect.isgeneratorfunction(fn):
+            @wraps(fn)
+            def generator_wrapper(*args, **kwargs):
+                if _storage_call.get() is not None:
+                    yield from fn(*args, **kwargs)
+                    return
+                call = start_call(args, kwargs)
+                iterator = fn(*args, **kwargs)
+                try:
+                    while True:
+                        # Only mark the call active while the generator body runs, not while the caller does
+                        token = _storage_call.set(call)
+                        try:
+                            item = next(iterator)
+                        except StopIteration:
+                            return
+                        finally:
+                            _storage_call.reset(token)
+                        call.documents += 1
+                        yield item
+                finally:
+                    _record_storage_call(call)
+            return generator_wrapper
+
+        @wraps(fn)
+        def wrapper(*args, **kwargs):
+            if _storage_call.get() is not None:
+                return fn(*args, **kwargs)
+            call = start_call(args, kwargs)
+            token = _storage_call.set(call)
+            try:
+                result = fn(*args, **kwargs)
+                if kind == "read":
+                    call.documents = documents(result)
+                return result
+            finally:
+                _storage_call.reset(token)
+                _record_storage_call(call)
+        return wrapper
+    return decorator
@@ -0,0 +1,190 @@
+# Shared with the other service: edit common/utils/query_trace.py and run tools/sync_common.py
+import logging
+import threading
+from collections import Counter
+from flask import g, has_request_context, jsonify, request
+
+TRACE_HEADER = "X-Query-Trace"
+TRACE_OPERATIONS_HEADER = "X-Query-Trace-Operations"
+# Operations listed in the operations header; the summary header always covers all of them
+MAX_HEADER_OPERATIONS = 40
+# Per-request totals kept for each route in the budget report
+BUDGET_METRICS = ("operations", "documents", "storage_ms")
+
+_settings = {"enabled": False, "repeat_threshold": 3}
+_report_lock = threading.Lock()
+_route_reports = {}  # route -> accumulated per-request totals
+
+
+class QueryTrace:
+    """Every storage operation made while serving one request"""
+
+    def __init__(self, route):
+        self.route = route
+        self.operations = []  # (operation, kind, shape, arguments, documents, elapsed seconds, cached)
+
+    def record(self, operation, kind, shape, arguments, documents, elapsed, cached):
+        self.operations.append((operation, kind, shape, arguments, documents, elapsed, cached))
+
+    def summary(self, repeat_threshold):
+        """
+        Totals for the request, plus the query shapes that look like N+1 patterns.
+
+        repeated: shapes (operation and collection) issued at least repeat_threshold times.
+        duplicates: shapes issued more than once with exactly the same arguments.
+        """
+        shapes = Counter(shape for _, _, shape, _, _, _, _ in self.operations)
+        identical = Counter((shape, repr(arguments)) for _, _, shape, arguments, _, _, _ in self.operations
+                            if arguments is not None)
+        duplicates = Counter()
+        for (shape, _), count in identical.items():
+            if count > 1:
+                duplicates[shape] += count - 1
+        return {
+            "operations": len(self.operations),
+            "reads": sum(1 for operation in self.operations if operation[1] == "read"),
+            "writes": sum(1 for operation in self.operations if operation[1] == "write"),
+            "cache_hits": sum(1 for operation in self.operations if operation[6]),
+            "documents": sum(operation[4] for operation in self.operations),
+            "storage_ms": round(sum(operation[5] for operation in self.operations) * 1000, 2),
+            "repeated": {shape: count for shape, count in shapes.items() if count >= repeat_threshold},
+            "duplicates": dict(duplicates)
+        }
+
+
+def current_trace():
+    """Trace of the request being served, or None when tracing is off or outside a request"""
+    if not _settings["enabled"] or not has_request_context():
+        return None
+    return g.get("query_trace")
+
+
+def _route():
+    """Budget report key: method and URL rule, such as PUT /api/employee/<employee_id>"""
+    rule = request.url_rule
+    return f"{request.method} {rule.rule if rule is not None else '<unmatched>'}"
+
+
+def _format_summary(summary):
+    parts = [f"ops={summary['operations']}", f"reads={summary['reads']}", f"writes={summary['writes']}",
+             f"cache_hits={summary['cache_hits']}", f"docs={summary['documents']}",
+             f"storage_ms={summary['storage_ms']}"]
+    if summary["repeated"]:
+        parts.append("repeated=" + ",".join(f"{shape}*{count}" for shape, count in summary["repeated"].items()))
+    if summary["duplicates"]:
+        parts.append("duplicates=" + ",".join(f"{shape}*{count}" for shape, count in summary["duplicates"].items()))
+    return "; ".join(parts)
+
+
+def _start_trace():
+    g.query_trace = QueryTrace(_route())
+
+
+def _finish_trace(response):
+    # Reads made while a streamed body is sent happen after this point and are not included
+    trace = g.get("query_trace")
+    if trace is None:
+        return response
+    summary = trace.summary(_settings["repeat_threshold"])
+    _add_to_report(trace.route, summary)
+    response.headers[TRACE_HEADER] = _format_summary(summary)
+    operations = [f"{shape}={documents}/{elapsed * 1000:.1f}ms" + ("(cache)" if cached else "")
+                  for _, _, shape, _, documents, elapsed, cached in trace.operations[:MAX_HEADER_OPERATIONS]]
+    if operations:
+        response.headers[TRACE_OPERATIONS_HEADER] = ", ".join(operations)
+    if summary["repeated"] or summary["duplicates"]:
+        logging.warning(f"Possible N+1 queries in {trace.route}: {_format_summary(summary)}")
+    return response
+
+
+def _add_to_report(route, summary):
+    with _report_lock:
+        report = _route_reports.get(route)
+        if report is None:
+            report = _route_reports[route] = {
+                "requests": 0, "repeated": Counter(), "duplicates": Counter(),
+                **{metric: {"max": 0, "total": 0} for metric in BUDGET_METRICS}
+            }
+        report["requests"] += 1
+        for metric in BUDGET_METRICS:
+            report[metric]["max"] = max(report[metric]["max"], summary[metric])
+            report[metric]["total"] += summary[metric]
+        # Number of requests in which each shape was flagged
+        report["repeated"].update(summary["repeated"].keys())
+        report["duplicates"].update(summary["duplicates"].keys())
+
+
+def budget_report():
+    """
+    Per-route storage cost of the requests traced by this process.
+
+    Returns:
+        dict: {route: {requests, operations/documents/storage_ms as {max, mean}, repeated, duplicates}}
+            where repeated/duplicates count the requests in which each query shape was flagged
+    """
+    with _report_lock:
+        return {route: {
+            "requests": report["requests"],
+            **{metric: {"max": report[metric]["max"], "mean": round(report[metric]["total"] / report["requests"], 2)}
+               for metric in BUDGET_METRICS},
+            "repeated": dict(report["repeated"]),
+            "duplicates": dict(report["duplicates"])
+        } for route, report in sorted(_route_reports.items())}
+
+
+def check_budgets(budgets):
+    """
+    Compare the traced requests with per-route budgets.
+
+    Args:
+        budgets (dict): {"METHOD /rule": {"operations": max per request, "documents": max per request,
+            "repeated": allow repeated shapes (default False)}}
+
+    Returns:
+        list: Human readable violations; empty when every traced route is within budget
+    """
+    violations = []
+    for route, report in budget_report().items():
+        budget = budgets.get(route)
+        if budget is None:
+            continue
+        for metric in ("operations", "documents"):
+            if metric in budget and report[metric]["max"] > budget[metric]:
+                violations.append(f"{route}: {report[metric]['max']} {metric} per request exceeds the budget of {budget[metric]}")
+        if not budget.get("repeated", False) and (report["repeated"] or report["duplicates"]):
+            shapes = sorted(set(report["repeated"]) | set(report["duplicates"]))
+            violations.append(f"{route}: repeated queries {', '.join(shapes)}")
+    return violations
+
+
+def reset_budget_report():
+    with _report_lock:
+        _route_reports.clear()
+
+
+def _budget_report_view():
+    return jsonify(budget_report())
+
+
+def init_query_trace(app, enabled=False, repeat_threshold=3, path="/debug/query-budget"):
+    """
+    Trace the storage operations of every request when enabled.
+
+    Each response gets an X-Query-Trace summary header (operations, documents,
+    storage time and any repeated or duplicate query shapes) and an
+    X-Query-Trace-Operations header listing the operations in order. The
+    per-route budget report is served on path.
+
+    Args:
+        app (Flask): Application to instrument
+        enabled (bool): Tracing is off (and costs nothing) unless enabled
+        repeat_threshold (int): Same-shape queries in one request that count as an N+1 pattern
+        path (str): URL of the budget report
+    """
+    _settings["enabled"] = enabled
+    _settings["repeat_threshold"] = repeat_threshold
+    if not enabled:
+        return
+    app.before_request(_start_trace)
+    app.after_request(_finish_trace)
+    app.add_url_rule(path, "query_budget", _budget_report_view)
@@ -1,4 +1,12 @@
-from flask import jsonify
+from flask import Response, stream_with_context
+from config import JSON_ENCODER
+from utils.json_codec import get_encoder
+
+# Serializer for every response body (orjson when installed, see JSON_ENCODER)
+dumps = get_encoder(JSON_ENCODER)
+
+# Serialized records are grouped into chunks of roughly this size before being sent
+STREAM_CHUNK_BYTES = 64 * 1024
 
 def response_wrapper(status_code, message, data):
     """
@@ -18,4 +26,62 @@ def response_wrapper(status_code, message, data):
         "data": data
     }
     
-    return jsonify(response), status_code
\ No newline at end of file
+    return Response(dumps(response), status=status_code, mimetype="application/json"), status_code
+
+
+def stream_response_wrapper(status_code, message, items, ndjson=False):
+    """
+    Streaming variant of response_wrapper for large listings.
+
+    Records are serialized one at a time as the items iterable is consumed, so
+    memory stays flat and the first bytes go out before the last record is read.
+
+    The status line is sent before the first record is read, so a failure part
+    way through cannot change it. The body is closed with an error instead: an
+    "error" field after "data" in the JSON envelope, or a final {"error": ...}
+    line in NDJSON. Clients must check for it before trusting the records.
+
+    Args:
+        status_code (int): HTTP status code
+        message (str): Response message
+        items (iterable): Records to emit, typically a Firestore stream generator
+        ndjson (bool): Emit one JSON record per line instead of the status/message/data envelope
+
+    Returns:
+        Chunked response with either the usual JSON envelope or NDJSON
+    """
+    def generate():
+        buffer = []
+        size = 0
+        if not ndjson:
+            buffer.append(b'{"status":%d,"message":%s,"data":[' % (status_code, dumps(message)))
+        separator = b"\n" if ndjson else b","
+        first = True
+        error = None
+        try:
+            for item in items:
+                encoded = dumps(item)
+                if ndjson:
+                    buffer.append(encoded + separator)
+                else:
+                    buffer.append(encoded if first else separator + encoded)
+                first = False
+                size += len(encoded)
+                if size >= STREAM_CHUNK_BYTES:
+                    yield b"".join(buffer)
+                    buffer, size = [], 0
+        except Exception as e:
+            error = {"status": 500, "message": f"Response truncated: {str(e)}"}
+            print(f"Error streaming response: {str(e)}")
+        if ndjson:
+            if error is not None:
+                buffer.append(dumps({"error": error}) + separator)
+        elif error is not None:
+            buffer.append(b'],"error":%s}' % dumps(error))
+        else:
+            buffer.append(b"]}")
+        if buffer:
+            yield b"".join(buffer)
+
+    mimetype = "application/x-ndjson" if ndjson else "application/json"
+    return Response(stream_with_context(generate()), status=status_code, mimetype=mimetype), status_code
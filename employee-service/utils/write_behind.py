@@ -0,0 +1,127 @@
+import os
+import threading
+import time
+
+
+class WriteBehindBuffer:
+    """
+    Background queue for non-critical field updates (e.g. last_login).
+
+    Updates to the same document are coalesced, so a document written many times
+    between flushes costs a single write. A daemon thread flushes the queue every
+    flush_interval seconds, or as soon as max_batch documents are waiting.
+
+    Args:
+        flush_fn (callable): Takes {(collection, doc_id): fields} and writes it; may raise to retry later
+        flush_interval (float): Seconds between periodic flushes
+        max_batch (int): Queue depth that triggers an immediate flush
+    """
+
+    def __init__(self, flush_fn, flush_interval=2.0, max_batch=500):
+        self.flush_fn = flush_fn
+        self.flush_interval = flush_interval
+        self.max_batch = max(1, int(max_batch))
+        self._pending = {}  # (collection, doc_id) -> fields
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._wakeup = threading.Event()
+        self._stopped = False
+        self._thread = None
+        self._pid = None
+        self.enqueued = 0
+        self.coalesced = 0
+        self.flushed = 0
+        self.flush_count = 0
+        self.flush_failures = 0
+        self.last_flush_ms = 0.0
+        self.max_flush_ms = 0.0
+        self._total_flush_ms = 0.0
+
+    def _ensure_thread(self):
+        # Started lazily (and restarted after a fork) so only live worker processes run a flusher
+        if self._thread is None or self._pid != os.getpid():
+            self._pid = os.getpid()
+            self._thread = threading.Thread(target=self._run, name="write-behind", daemon=True)
+            self._thread.start()
+
+    def enqueue(self, collection, doc_id, fields):
+        """Queue fields to be merged into a document on the next flush"""
+        with self._lock:
+            key = (collection, doc_id)
+            if key in self._pending:
+                self._pending[key].update(fields)
+                self.coalesced += 1
+            else:
+                self._pending[key] = dict(fields)
+            self.enqueued += 1
+            depth = len(self._pending)
+            if not self._stopped:
+                self._ensure_thread()
+        if depth >= self.max_batch:
+            self._wakeup.set()
+
+    def _run(self):
+        while not self._stopped:
+            self._wakeup.wait(self.flush_interval)
+            self._wakeup.clear()
+            self.flush()
+
+    def flush(self):
+        """Write everything queued so far; failed updates are re-queued under any newer values"""
+        with self._flush_lock:
+            with self._lock:
+                pending, self._pending = self._pending, {}
+            if not pending:
+                return 0
+
+            started = time.perf_counter()
+            try:
+                self.flush_fn(pending)
+            except Exception as e:
+                print(f"Error flushing write-behind buffer: {str(e)}")
+                self.flush_failures += 1
+                with self._lock:
+                    for key, fields in pending.items():
+                        newer = self._pending.get(key)
+                        self._pending[key] = {**fields, **newer} if newer else fields
+                return 0
+
+            elapsed_ms = (time.perf_counter() - started) * 1000
+            self.flushed += len(pending)
+            self.flush_count += 1
+            self.last_flush_ms = elapsed_ms
+            self.max_flush_ms = max(self.max_flush_ms, elapsed_ms)
+            self._total_flush_ms += elapsed_ms
+            return len(pending)
+
+    def drain(self, timeout=5.0):
+        """Stop the flusher and write out the queue, giving up after timeout seconds"""
+        self._stopped = True
+        self._wakeup.set()
+        deadline = time.monotonic() + timeout
+        while self.queue_depth() and time.monotonic() < deadline:
+            if not self.flush():
+                time.sleep(0.1)
+        remaining = self.queue_depth()
+        if remaining:
+            print(f"Write-behind buffer drained with {remaining} updates still pending")
+        return remaining
+
+    def queue_depth(self):
+        """Number of documents waiting to be written"""
+        with self._lock:
+            return len(self._pending)
+
+    def stats(self):
+        """Queue depth, throughput and flush latency"""
+        return {
+            "queue_depth": self.queue_depth(),
+            "enqueued": self.enqueued,
+            "coalesced": self.coalesced,
+            "flushed": self.flushed,
+            "flush_count": self.flush_count,
+            "flush_failures": self.flush_failures,
+            "last_flush_ms": round(self.last_flush_ms, 2),
+            "max_flush_ms": round(self.max_flush_ms, 2),
+            "avg_flush_ms": round(self._total_flush_ms / self.flush_count, 2) if self.flush_count else 0
+        }
@@ -0,0 +1,14 @@
+"""
+Concurrent load generator and latency benchmark for the employee and attendance services.
+
+Against running services:
+
+    python -m loadtest --scenario clock_in_storm --concurrency 50 --rps 200 --duration 60 \
+        --employee-url http://localhost:5002 --attendance-url http://localhost:5003 --seed-employees 500
+
+Against local copies of both services on a temporary SQLite store:
+
+    python -m loadtest --local --scenario mixed --seed-employees 200 --report report.json
+
+Scenarios: clock_in_storm, dashboard_polling, login_burst, mixed.
+"""
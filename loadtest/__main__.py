@@ -0,0 +1,69 @@
+import argparse
+import json
+import sys
+from loadtest.local import LocalServices
+from loadtest.runner import Context, run
+from loadtest.scenarios import SCENARIOS
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m loadtest",
+                                     description="Load test the employee and attendance services")
+    parser.add_argument("--scenario", choices=sorted(SCENARIOS), default="mixed")
+    parser.add_argument("--concurrency", type=int, default=10, help="Worker threads / maximum requests in flight")
+    parser.add_argument("--rps", type=float, default=0,
+                        help="Target requests per second across all workers (0 sends as fast as possible)")
+    parser.add_argument("--duration", type=float, default=30, help="Measured seconds")
+    parser.add_argument("--warmup", type=float, default=5, help="Seconds of unrecorded traffic before measuring")
+    parser.add_argument("--seed", type=int, help="Random seed for a reproducible request mix")
+    parser.add_argument("--seed-employees", type=int, default=0,
+                        help="Register this many synthetic employees first (otherwise use the existing ones)")
+    parser.add_argument("--employee-url", default="http://localhost:5002")
+    parser.add_argument("--attendance-url", default="http://localhost:5003")
+    parser.add_argument("--local", action="store_true",
+                        help="Start both services on a temporary SQLite store instead of using the URLs")
+    parser.add_argument("--workers", type=int, default=2, help="Gunicorn workers per service with --local")
+    parser.add_argument("--report", help="Write the JSON report to this file instead of stdout")
+    return parser.parse_args(argv)
+
+
+def execute(args, employee_url, attendance_url):
+    context = Context(employee_url, attendance_url)
+    if args.seed_employees:
+        print(f"Seeding {args.seed_employees} employees...", file=sys.stderr)
+        context.seed_employees(args.seed_employees, args.seed)
+    else:
+        context.load_employees()
+
+    print(f"Running {args.scenario} for {args.warmup}s warmup + {args.duration}s "
+          f"with {args.concurrency} workers" + (f" at {args.rps} rps" if args.rps else ""), file=sys.stderr)
+    report = run(context, SCENARIOS[args.scenario], concurrency=args.concurrency, rps=args.rps,
+                 duration=args.duration, warmup=args.warmup, seed=args.seed)
+    report["config"].update({"scenario": args.scenario, "local": args.local,
+                             "employee_url": employee_url, "attendance_url": attendance_url})
+    return report
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    if args.local:
+        with LocalServices(workers=args.workers, threads=max(8, args.concurrency // args.workers)) as services:
+            report = execute(args, services.employee_url, services.attendance_url)
+    else:
+        report = execute(args, args.employee_url, args.attendance_url)
+
+    output = json.dumps(report, indent=2)
+    if args.report:
+        with open(args.report, "w") as report_file:
+            report_file.write(output + "\n")
+        overall = report["overall"]
+        print(f"{overall['requests']} requests, {overall['throughput_rps']} rps, "
+              f"p95 {overall['latency_ms'].get('p95')} ms, error rate {overall['error_rate']}; "
+              f"report written to {args.report}", file=sys.stderr)
+    else:
+        print(output)
+    return 1 if report["overall"]["errors"] else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,77 @@
+"""Synthetic employees and clock-in locations for load tests"""
+import math
+import random
+from datetime import datetime
+
+FIRST_NAMES = [
+    "John", "Jane", "Michael", "Emily", "David", "Sarah", "Robert", "Lisa",
+    "William", "Emma", "James", "Olivia", "Benjamin", "Sophia", "Daniel",
+    "Ava", "Matthew", "Isabella", "Joseph", "Mia", "Andrew", "Charlotte",
+    "Raj", "Priya", "Amit", "Neha", "Wei", "Li", "Hiroshi", "Yuki"
+]
+
+LAST_NAMES = [
+    "Smith", "Johnson", "Williams", "Jones", "Brown", "Davis", "Miller",
+    "Wilson", "Moore", "Taylor", "Anderson", "Thomas", "Jackson", "White",
+    "Harris", "Martin", "Thompson", "Garcia", "Martinez", "Robinson",
+    "Patel", "Kumar", "Singh", "Shah", "Wang", "Chen", "Zhang", "Li",
+    "Tanaka", "Suzuki", "Sato", "Kim"
+]
+
+DESIGNATIONS = [
+    "Software Engineer", "Senior Software Engineer", "Lead Developer",
+    "Full Stack Developer", "Frontend Developer", "Backend Developer",
+    "DevOps Engineer", "QA Engineer", "UI/UX Designer", "Product Manager",
+    "Project Manager", "Data Scientist", "Data Analyst", "Machine Learning Engineer",
+    "Database Administrator", "Network Engineer", "System Administrator",
+    "Technical Support", "IT Manager", "CTO", "HR Manager", "Finance Manager"
+]
+
+BLOOD_TYPES = ["A+", "A-", "B+", "B-", "AB+", "AB-", "O+", "O-"]
+
+SHIFT_HOURS = ["9:00 AM - 6:00 PM", "10:00 AM - 7:00 PM", "8:00 AM - 5:00 PM", "7:00 AM - 4:00 PM"]
+
+ADDRESSES = [
+    "123 Main St, New York, NY", "456 Oak Ave, Los Angeles, CA", "789 Pine Rd, Chicago, IL",
+    "101 Maple Dr, Houston, TX", "202 Cedar Ln, Phoenix, AZ", "303 Elm Blvd, San Antonio, TX"
+]
+
+# Office coordinates and radius used by the attendance service's default geofence
+OFFICE_LOCATION = (12.956203, 80.195962)
+ALLOWED_RADIUS_KM = 0.1
+KM_PER_DEGREE = 111.32
+
+
+def employee_record(rng, number, run_id):
+    """Registration payload for one synthetic employee; run_id keeps emails unique across runs"""
+    first_name, last_name = rng.choice(FIRST_NAMES), rng.choice(LAST_NAMES)
+    age = rng.randint(22, 60)
+    return {
+        "name": f"{first_name} {last_name}",
+        "age": age,
+        "date_of_birth": f"{datetime.now().year - age}-{rng.randint(1, 12):02d}-{rng.randint(1, 28):02d}",
+        "email": f"{first_name.lower()}.{last_name.lower()}.{run_id}.{number}@loadtest.example.com",
+        "address": rng.choice(ADDRESSES),
+        "blood_type": rng.choice(BLOOD_TYPES),
+        "phone_number": f"+1-{rng.randint(100, 999)}-{rng.randint(100, 999)}-{rng.randint(1000, 9999)}",
+        "designation": rng.choice(DESIGNATIONS),
+        "ctc": rng.randint(50000, 150000),
+        "employee_shift_hours": rng.choice(SHIFT_HOURS)
+    }
+
+
+def location(rng, inside=True):
+    """A point inside (up to 80% of the radius) or outside (1.2x to 5x the radius) the office geofence"""
+    if inside:
+        distance_km = ALLOWED_RADIUS_KM * 0.8 * math.sqrt(rng.random())
+    else:
+        distance_km = ALLOWED_RADIUS_KM * rng.uniform(1.2, 5)
+    bearing = rng.uniform(0, 2 * math.pi)
+    latitude = OFFICE_LOCATION[0] + distance_km * math.cos(bearing) / KM_PER_DEGREE
+    longitude = OFFICE_LOCATION[1] + distance_km * math.sin(bearing) / (
+        KM_PER_DEGREE * math.cos(math.radians(OFFICE_LOCATION[0])))
+    return {"latitude": latitude, "longitude": longitude}
+
+
+def new_rng(seed=None):
+    return random.Random(seed)
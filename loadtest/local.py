@@ -0,0 +1,101 @@
+"""Run both services locally on a shared SQLite store for load tests without Firestore"""
+import os
+import shutil
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+import requests
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+STARTUP_TIMEOUT_SECONDS = 30
+
+
+def _free_port():
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+class LocalServices:
+    """
+    Start the employee and attendance services under gunicorn, as in production,
+    with STORAGE_BACKEND=sqlite pointing both at one temporary database.
+
+    Use as a context manager; the processes and database are removed on exit.
+
+    Args:
+        workers (int): Gunicorn workers per service
+        threads (int): Threads per worker
+        log_dir (str, optional): Directory for the service logs; a temporary one when omitted
+    """
+
+    def __init__(self, workers=2, threads=8, log_dir=None):
+        self.workers = workers
+        self.threads = threads
+        self._data_dir = tempfile.mkdtemp(prefix="people-pilot-loadtest-")
+        self.log_dir = log_dir or self._data_dir
+        self.employee_url = None
+        self.attendance_url = None
+        self._processes = []
+        self._logs = []
+
+    def _start(self, service, port, extra_env):
+        env = dict(os.environ,
+                   PORT=str(port),
+                   STORAGE_BACKEND="sqlite",
+                   STORAGE_SQLITE_PATH=os.path.join(self._data_dir, "people-pilot.db"),
+                   WEB_WORKERS=str(self.workers),
+                   WEB_THREADS=str(self.threads),
+                   **extra_env)
+        log = open(os.path.join(self.log_dir, f"{service}.log"), "ab")
+        self._logs.append(log)
+        self._processes.append(subprocess.Popen(
+            [sys.executable, "-m", "gunicorn", "-c", "gunicorn.conf.py", "--bind", f"127.0.0.1:{port}",
+             "--access-logfile", os.devnull, "app:app"],
+            cwd=os.path.join(ROOT, service), env=env, stdout=log, stderr=subprocess.STDOUT))
+        return f"http://127.0.0.1:{port}"
+
+    def _wait_until_ready(self, url, path):
+        deadline = time.monotonic() + STARTUP_TIMEOUT_SECONDS
+        while time.monotonic() < deadline:
+            if any(process.poll() is not None for process in self._processes):
+                raise RuntimeError(f"A service exited during startup; see the logs in {self.log_dir}")
+            try:
+                requests.get(url + path, timeout=2)
+                return
+            except requests.RequestException:
+                time.sleep(0.2)
+        raise RuntimeError(f"{url} did not start within {STARTUP_TIMEOUT_SECONDS}s; see the logs in {self.log_dir}")
+
+    def __enter__(self):
+        try:
+            self.employee_url = self._start("employee-service", _free_port(), {})
+            self.attendance_url = self._start("attendance-service", _free_port(), {
+                "EMPLOYEE_SERVICE_URL": self.employee_url,
+                # Local stores have no listeners; poll often so newly seeded employees show up quickly
+                "EMPLOYEE_REPLICA_MODE": "poll",
+                "EMPLOYEE_REPLICA_POLL_SECONDS": "2",
+            })
+            self._wait_until_ready(self.employee_url, "/api/employee/stats")
+            self._wait_until_ready(self.attendance_url, "/api/config")
+        except BaseException:
+            self.__exit__(*sys.exc_info())
+            raise
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        for process in self._processes:
+            process.terminate()
+        for process in self._processes:
+            try:
+                process.wait(timeout=15)
+            except subprocess.TimeoutExpired:
+                process.kill()
+        for log in self._logs:
+            log.close()
+        # Keep the temporary directory after a failure so the service logs can be read
+        if exc_type is None or self.log_dir != self._data_dir:
+            shutil.rmtree(self._data_dir, ignore_errors=True)
+        return False
@@ -0,0 +1,145 @@
+"""Concurrent request scheduling, employee seeding and timing"""
+import itertools
+import json
+import threading
+import time
+import uuid
+import requests
+from loadtest.data import employee_record, new_rng
+from loadtest.scenarios import pick
+from loadtest.stats import Recorder
+
+REQUEST_TIMEOUT_SECONDS = 30
+SEED_CHUNK_SIZE = 500
+
+
+class Context:
+    """
+    Service URLs and the employees requests are made for.
+
+    Args:
+        employee_url (str): Base URL of the employee service
+        attendance_url (str): Base URL of the attendance service
+    """
+
+    def __init__(self, employee_url, attendance_url):
+        self.urls = {"employee": employee_url.rstrip("/"), "attendance": attendance_url.rstrip("/")}
+        self.employees = []  # dicts with id, email and (for seeded employees) password
+
+    def random_employee(self, rng):
+        return rng.choice(self.employees)
+
+    def seed_employees(self, count, seed=None):
+        """
+        Register count synthetic employees through the bulk import endpoint.
+
+        The generated passwords come back in the import results, so seeded
+        employees can log in successfully during the run.
+        """
+        rng = new_rng(seed)
+        run_id = uuid.uuid4().hex[:8]
+        session = requests.Session()
+        for start in range(0, count, SEED_CHUNK_SIZE):
+            rows = [employee_record(rng, number, run_id) for number in range(start, min(count, start + SEED_CHUNK_SIZE))]
+            response = session.post(f"{self.urls['employee']}/api/employee/register/bulk",
+                                    data="\n".join(json.dumps(row) for row in rows),
+                                    headers={"Content-Type": "application/x-ndjson"},
+                                    timeout=REQUEST_TIMEOUT_SECONDS * 10)
+            if response.status_code not in (200, 201):
+                raise RuntimeError(f"Seeding failed with {response.status_code}: {response.text[:200]}")
+            for result in response.json()["data"]["results"]:
+                if result["status"] == "created":
+                    self.employees.append({"id": result["id"], "email": result["email"],
+                                           "password": result["raw_password"]})
+
+    def load_employees(self):
+        """Use the employees already registered in the service (logins will only exercise the failure path)"""
+        response = requests.get(f"{self.urls['employee']}/api/employee/all",
+                                params={"fields": "id,email"}, timeout=REQUEST_TIMEOUT_SECONDS * 10)
+        response.raise_for_status()
+        self.employees.extend({"id": employee["id"], "email": employee.get("email", "")}
+                              for employee in response.json()["data"])
+
+
+def _error_text(response):
+    try:
+        message = response.json().get("message")
+    except ValueError:
+        message = response.text
+    return f"{response.status_code}: {str(message)[:200]}"
+
+
+def run(context, operations, concurrency=10, rps=0, duration=30, warmup=5, seed=None):
+    """
+    Drive the services with a scenario and return the report.
+
+    With rps set, request start times follow a fixed schedule (open loop):
+    slow responses do not slow down arrivals, they pile up as schedule lag,
+    which is how real clients behave. With rps=0 every worker sends its next
+    request as soon as the previous one returns (closed loop).
+
+    Requests started during the warmup period are sent but not recorded.
+
+    Args:
+        context (Context): Service URLs and employees
+        operations (list): Weighted operations of the scenario
+        concurrency (int): Number of worker threads (maximum requests in flight)
+        rps (float): Target request rate; 0 for as fast as the workers go
+        duration (float): Measured seconds, after warmup
+        warmup (float): Seconds of unrecorded traffic before measuring
+        seed (int, optional): Seed for reproducible request mixes
+
+    Returns:
+        dict: Report with per-endpoint latency percentiles, throughput and error rates
+    """
+    if not context.employees:
+        raise ValueError("No employees to generate requests for; seed some or point at a populated service")
+
+    recorder = Recorder()
+    slots = itertools.count()
+    started = time.perf_counter()
+    measure_from = started + warmup
+    stop_at = measure_from + duration
+
+    def worker(index):
+        rng = new_rng(None if seed is None else seed + index)
+        session = requests.Session()
+        while True:
+            if rps:
+                scheduled = started + next(slots) / rps
+                if scheduled >= stop_at:
+                    return
+                delay = scheduled - time.perf_counter()
+                if delay > 0:
+                    time.sleep(delay)
+            else:
+                scheduled = time.perf_counter()
+                if scheduled >= stop_at:
+                    return
+
+            operation = pick(operations, rng)
+            service, method, path, kwargs, expected = operation.build(context, rng)
+            request_started = time.perf_counter()
+            try:
+                response = session.request(method, context.urls[service] + path,
+                                            timeout=REQUEST_TIMEOUT_SECONDS, **kwargs)
+                status = response.status_code
+                error = None if status in expected else _error_text(response)
+            except requests.RequestException as e:
+                status, error = "exception", f"{type(e).__name__}: {str(e)[:200]}"
+            finished = time.perf_counter()
+
+            if scheduled >= measure_from:
+                recorder.record(operation.name, (finished - request_started) * 1000, status, error,
+                                lag_ms=max(0.0, request_started - scheduled) * 1000)
+
+    threads = [threading.Thread(target=worker, args=(index,), daemon=True) for index in range(concurrency)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    report = recorder.report(duration)
+    report["config"] = {"concurrency": concurrency, "target_rps": rps, "duration_seconds": duration,
+                        "warmup_seconds": warmup, "employees": len(context.employees), "seed": seed}
+    return report
@@ -0,0 +1,125 @@
+"""
+Scenario mixes for the load generator.
+
+A scenario is a weighted list of operations. Each operation builds one HTTP
+request for a randomly chosen seeded employee and names the status codes that
+count as success, so expected rejections (an out-of-range clock-in, a wrong
+password) are not reported as errors.
+"""
+from datetime import datetime, timedelta
+from loadtest.data import location
+
+# Share of clock-ins sent from inside the geofence; the rest should be rejected with 403
+VALID_LOCATION_RATIO = 0.9
+
+
+class Operation:
+    """
+    One kind of request in a scenario.
+
+    Args:
+        name (str): Endpoint label used in the report
+        weight (float): Relative frequency within the scenario
+        build (callable): (context, rng) -> (service, method, path, kwargs, expected_statuses)
+    """
+
+    def __init__(self, name, weight, build):
+        self.name = name
+        self.weight = weight
+        self.build = build
+
+
+def _today():
+    return datetime.utcnow().date()
+
+
+def clock_in(context, rng):
+    employee = context.random_employee(rng)
+    inside = rng.random() < VALID_LOCATION_RATIO
+    body = {"employee_id": employee["id"], "clock_in": True, **location(rng, inside)}
+    return "attendance", "POST", "/api/attendance", {"json": body}, (200,) if inside else (403,)
+
+
+def clock_out(context, rng):
+    employee = context.random_employee(rng)
+    body = {"employee_id": employee["id"], "clock_in": False, **location(rng, True)}
+    # 400 when the employee has no open clock-in today
+    return "attendance", "POST", "/api/attendance", {"json": body}, (200, 400)
+
+
+def employee_status(context, rng):
+    employee = context.random_employee(rng)
+    return "attendance", "GET", "/api/attendance/status", {"params": {"employee_id": employee["id"]}}, (200,)
+
+
+def dashboard(context, rng):
+    return "attendance", "GET", "/api/dashboard", {}, (200,)
+
+
+def daily_summary(context, rng):
+    return "attendance", "GET", "/api/attendance/summary", {"params": {"date": _today().isoformat()}}, (200,)
+
+
+def attendance_range(context, rng):
+    end_date = _today()
+    params = {"start_date": (end_date - timedelta(days=6)).isoformat(), "end_date": end_date.isoformat()}
+    return "attendance", "GET", "/api/attendance/range", {"params": params}, (200,)
+
+
+def login(context, rng):
+    employee = context.random_employee(rng)
+    if employee.get("password"):
+        return ("employee", "POST", "/api/employee/login",
+                {"json": {"email": employee["email"], "password": employee["password"]}}, (200,))
+    # Credentials are unknown for employees that were not seeded by this run
+    return login_wrong_password(context, rng, employee)
+
+
+def login_wrong_password(context, rng, employee=None):
+    employee = employee or context.random_employee(rng)
+    body = {"email": employee["email"], "password": "not-the-password"}
+    return "employee", "POST", "/api/employee/login", {"json": body}, (401,)
+
+
+def fetch_employee(context, rng):
+    employee = context.random_employee(rng)
+    return "employee", "GET", f"/api/employee/{employee['id']}", {}, (200,)
+
+
+SCENARIOS = {
+    # Everyone arrives at once: mostly clock-ins, with people checking their status and managers watching the dashboard
+    "clock_in_storm": [
+        Operation("clock_in", 70, clock_in),
+        Operation("attendance_status", 20, employee_status),
+        Operation("dashboard", 5, dashboard),
+        Operation("clock_out", 5, clock_out),
+    ],
+    # Dashboards left open and refreshing all day
+    "dashboard_polling": [
+        Operation("dashboard", 60, dashboard),
+        Operation("attendance_summary", 25, daily_summary),
+        Operation("attendance_range", 15, attendance_range),
+    ],
+    # The mobile app opening for the whole shift
+    "login_burst": [
+        Operation("login", 70, login),
+        Operation("login_wrong_password", 10, login_wrong_password),
+        Operation("employee_profile", 20, fetch_employee),
+    ],
+    # A steady blend of all of the above
+    "mixed": [
+        Operation("clock_in", 25, clock_in),
+        Operation("clock_out", 10, clock_out),
+        Operation("attendance_status", 15, employee_status),
+        Operation("dashboard", 15, dashboard),
+        Operation("attendance_summary", 5, daily_summary),
+        Operation("attendance_range", 5, attendance_range),
+        Operation("login", 15, login),
+        Operation("employee_profile", 10, fetch_employee),
+    ],
+}
+
+
+def pick(operations, rng):
+    """Choose an operation according to the scenario weights"""
+    return rng.choices(operations, weights=[operation.weight for operation in operations])[0]
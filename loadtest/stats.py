@@ -0,0 +1,84 @@
+"""Latency and outcome recording for load test runs"""
+import math
+import threading
+from collections import Counter, defaultdict
+
+PERCENTILES = (50, 90, 95, 99)
+
+
+def percentile(sorted_values, pct):
+    """Nearest-rank percentile of an already sorted list"""
+    if not sorted_values:
+        return None
+    rank = max(1, math.ceil(pct * len(sorted_values) / 100.0))
+    return sorted_values[min(rank, len(sorted_values)) - 1]
+
+
+def summarize(values):
+    """Latency summary in milliseconds"""
+    values = sorted(values)
+    if not values:
+        return {}
+    summary = {f"p{pct}": round(percentile(values, pct), 2) for pct in PERCENTILES}
+    summary["min"] = round(values[0], 2)
+    summary["max"] = round(values[-1], 2)
+    summary["mean"] = round(sum(values) / len(values), 2)
+    return summary
+
+
+class Recorder:
+    """
+    Collects one sample per request: endpoint label, latency, status and whether it counts as an error.
+
+    Schedule lag (how late a request started relative to its slot in the
+    target rate) is kept separately; a growing lag means the generator or the
+    service could not keep up with the requested RPS.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._latencies = defaultdict(list)
+        self._statuses = defaultdict(Counter)
+        self._errors = Counter()
+        self._error_samples = defaultdict(list)
+        self._lag = []
+
+    def record(self, endpoint, latency_ms, status, error=None, lag_ms=0.0):
+        with self._lock:
+            self._latencies[endpoint].append(latency_ms)
+            self._statuses[endpoint][str(status)] += 1
+            self._lag.append(lag_ms)
+            if error:
+                self._errors[endpoint] += 1
+                if len(self._error_samples[endpoint]) < 5:
+                    self._error_samples[endpoint].append(error)
+
+    def report(self, elapsed_seconds):
+        """Per-endpoint and overall latency percentiles, throughput and error rates"""
+        with self._lock:
+            endpoints = {}
+            all_latencies = []
+            for endpoint in sorted(self._latencies):
+                latencies = self._latencies[endpoint]
+                all_latencies.extend(latencies)
+                count = len(latencies)
+                endpoints[endpoint] = {
+                    "requests": count,
+                    "errors": self._errors[endpoint],
+                    "error_rate": round(self._errors[endpoint] / count, 4) if count else 0,
+                    "throughput_rps": round(count / elapsed_seconds, 2) if elapsed_seconds else 0,
+                    "latency_ms": summarize(latencies),
+                    "statuses": dict(self._statuses[endpoint]),
+                    "error_samples": self._error_samples[endpoint]
+                }
+            total = len(all_latencies)
+            errors = sum(self._errors.values())
+            overall = {
+                "requests": total,
+                "errors": errors,
+                "error_rate": round(errors / total, 4) if total else 0,
+                "throughput_rps": round(total / elapsed_seconds, 2) if elapsed_seconds else 0,
+                "latency_ms": summarize(all_latencies),
+                "schedule_lag_ms": summarize(self._lag)
+            }
+            return {"elapsed_seconds": round(elapsed_seconds, 2), "overall": overall, "endpoints": endpoints}
@@ -0,0 +1,18 @@
+import json
+import os
+import subprocess
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def test_attendance_aggregation_benchmark_runs_every_scenario(tmp_path):
+    report_path = tmp_path / "report.json"
+    subprocess.run([sys.executable, os.path.join(ROOT, "benchmarks", "attendance_aggregation.py"),
+                    "--employees", "20,40", "--days", "2,7", "--repeat", "1", "--json", str(report_path)],
+                   capture_output=True, text=True, check=True)
+    results = json.loads(report_path.read_text())["results"]
+    scenarios = ["summary", "dashboard", "stats_by_date", "range_2d", "range_7d"]
+    assert [(result["employees"], result["scenario"]) for result in results] == \
+        [(count, name) for count in (20, 40) for name in scenarios]
+    assert all(0 < result["records_per_day"] <= result["employees"] for result in results)
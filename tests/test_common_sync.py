@@ -0,0 +1,11 @@
+import os
+import subprocess
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def test_vendored_modules_match_common():
+    result = subprocess.run([sys.executable, os.path.join(ROOT, "tools", "sync_common.py"), "--check"],
+                            capture_output=True, text=True)
+    assert result.returncode == 0, result.stderr
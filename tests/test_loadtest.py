@@ -0,0 +1,76 @@
+import math
+import threading
+from werkzeug.serving import make_server
+from werkzeug.wrappers import Response
+from loadtest.data import ALLOWED_RADIUS_KM, OFFICE_LOCATION, location, new_rng
+from loadtest.runner import Context, run
+from loadtest.scenarios import SCENARIOS, Operation
+from loadtest.stats import Recorder, percentile, summarize
+
+
+def _distance_km(point):
+    lat1, lon1 = map(math.radians, OFFICE_LOCATION)
+    lat2, lon2 = math.radians(point["latitude"]), math.radians(point["longitude"])
+    a = math.sin((lat2 - lat1) / 2) ** 2 + math.cos(lat1) * math.cos(lat2) * math.sin((lon2 - lon1) / 2) ** 2
+    return 2 * 6371 * math.asin(math.sqrt(a))
+
+
+def test_percentiles_use_nearest_rank():
+    values = list(range(1, 101))
+    assert [percentile(values, pct) for pct in (50, 90, 99)] == [50, 90, 99]
+    assert percentile([], 50) is None
+    assert summarize([3.0, 1.0, 2.0]) == {"p50": 2.0, "p90": 3.0, "p95": 3.0, "p99": 3.0,
+                                          "min": 1.0, "max": 3.0, "mean": 2.0}
+
+
+def test_report_counts_errors_per_endpoint():
+    recorder = Recorder()
+    recorder.record("login", 10, 200)
+    recorder.record("login", 30, 500, error="500: boom")
+    recorder.record("dashboard", 20, 200)
+    report = recorder.report(2)
+    assert report["endpoints"]["login"]["error_rate"] == 0.5
+    assert report["endpoints"]["login"]["statuses"] == {"200": 1, "500": 1}
+    assert report["endpoints"]["login"]["error_samples"] == ["500: boom"]
+    assert report["overall"]["requests"] == 3 and report["overall"]["throughput_rps"] == 1.5
+
+
+def test_generated_locations_fall_on_the_intended_side_of_the_geofence():
+    rng = new_rng(7)
+    assert all(_distance_km(location(rng, True)) < ALLOWED_RADIUS_KM for _ in range(200))
+    assert all(_distance_km(location(rng, False)) > ALLOWED_RADIUS_KM for _ in range(200))
+
+
+def test_every_scenario_operation_builds_a_request():
+    context = Context("http://employee", "http://attendance")
+    context.employees = [{"id": "EMP001", "email": "a@example.com", "password": "secret"}, {"id": "EMP002", "email": "b@example.com"}]
+    rng = new_rng(1)
+    for operations in SCENARIOS.values():
+        for operation in operations:
+            service, method, path, kwargs, expected = operation.build(context, rng)
+            assert service in context.urls and method in ("GET", "POST") and path.startswith("/api/")
+            assert expected
+
+
+def test_run_records_only_unexpected_statuses_as_errors():
+    def app(environ, start_response):
+        status = 200 if environ["PATH_INFO"] == "/ok" else 404
+        return Response("{}", status=status, content_type="application/json")(environ, start_response)
+    server = make_server("127.0.0.1", 0, app, threaded=True)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    try:
+        url = f"http://127.0.0.1:{server.server_port}"
+        context = Context(url, url)
+        context.employees = [{"id": "EMP001", "email": "a@example.com"}]
+        operations = [Operation("ok", 1, lambda context, rng: ("employee", "GET", "/ok", {}, (200,))),
+                      Operation("missing", 1, lambda context, rng: ("attendance", "GET", "/missing", {}, (404,))),
+                      Operation("broken", 1, lambda context, rng: ("attendance", "GET", "/broken", {}, (200,)))]
+        report = run(context, operations, concurrency=2, rps=60, duration=1, warmup=0.2, seed=3)
+    finally:
+        server.shutdown()
+
+    endpoints = report["endpoints"]
+    assert endpoints["ok"]["errors"] == 0 and endpoints["missing"]["errors"] == 0
+    assert endpoints["broken"]["errors"] == endpoints["broken"]["requests"] > 0
+    # The open-loop schedule caps the measured requests at rps * duration
+    assert report["overall"]["requests"] <= 60
@@ -0,0 +1,82 @@
+"""
+Copy the modules in common/ into both services, or check that the copies still match.
+
+Each service is built from its own directory (see docker-compose.yml), so the
+modules they share (storage backends, metrics, query tracing, profiling,
+response compression, JSON encoding and the async bridge) are vendored into
+each of them. common/ holds the copy to edit; the vendored files must not be
+changed by hand.
+
+Usage:
+    python tools/sync_common.py          # copy common/ into the services
+    python tools/sync_common.py --check  # exit 1 if a vendored copy differs from common/
+"""
+import argparse
+import os
+import shutil
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+COMMON_DIR = os.path.join(ROOT, "common")
+SERVICES = ("employee-service", "attendance-service")
+
+
+def shared_files():
+    """Paths of the shared modules, relative to common/"""
+    paths = []
+    for directory, subdirectories, files in os.walk(COMMON_DIR):
+        subdirectories[:] = sorted(name for name in subdirectories if name != "__pycache__")
+        for name in sorted(files):
+            if name.endswith(".py"):
+                paths.append(os.path.relpath(os.path.join(directory, name), COMMON_DIR))
+    return paths
+
+
+def _read(path):
+    with open(path, "rb") as source:
+        return source.read()
+
+
+def _stale_copies():
+    """(relative path, vendored path) for every vendored copy that is missing or differs from common/"""
+    stale = []
+    for relative in shared_files():
+        expected = _read(os.path.join(COMMON_DIR, relative))
+        for service in SERVICES:
+            target = os.path.join(ROOT, service, relative)
+            if not os.path.exists(target) or _read(target) != expected:
+                stale.append((relative, target))
+    return stale
+
+
+def out_of_sync():
+    """Vendored copies, relative to the repository root, that are missing or differ from common/"""
+    return [os.path.relpath(target, ROOT) for _, target in _stale_copies()]
+
+
+def sync():
+    """Copy every shared module into both services; returns the files that changed"""
+    stale = _stale_copies()
+    for relative, target in stale:
+        os.makedirs(os.path.dirname(target), exist_ok=True)
+        shutil.copyfile(os.path.join(COMMON_DIR, relative), target)
+    return [os.path.relpath(target, ROOT) for _, target in stale]
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--check", action="store_true", help="Only report vendored copies that differ")
+    args = parser.parse_args(argv)
+
+    if args.check:
+        stale = out_of_sync()
+        for path in stale:
+            print(f"{path} differs from common/ (edit common/ and run tools/sync_common.py)", file=sys.stderr)
+        return 1 if stale else 0
+    for path in sync():
+        print(f"Updated {path}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())